@@ -104,6 +104,140 @@ Some functionalities and metyhods are too long they could have been optimized fr
 """
 
 
+# In[ ]:
+
+
+import logging
+import sys
+
+# Console output of the loaders and save routines goes through this logger,
+# so batch and service runs are not slowed down by per-record terminal writes
+log = logging.getLogger("pythonia")
+# Progress lines belong on the console only, not in the root handlers' daily log file
+log.propagate = False
+
+OUTPUT_MODES = {
+    'quiet': logging.WARNING,   # Warnings and errors only
+    'normal': logging.INFO,     # Progress and summaries
+    'verbose': logging.DEBUG,   # Per-record detail
+}
+
+
+class ConsoleHandler(logging.StreamHandler):
+    """Write log messages as plain lines to the current sys.stdout"""
+
+    def __init__(self):
+        super().__init__()
+        self.set_name("pythonia-console")
+        self.setFormatter(logging.Formatter('%(message)s'))
+
+    @property
+    def stream(self):
+        return sys.stdout
+
+    @stream.setter
+    def stream(self, value):
+        pass
+
+
+def set_output_mode(mode):
+    """
+    Set how much the loaders and save routines print.
+
+    Args:
+        mode (str): 'quiet', 'normal' or 'verbose'
+
+    Raises:
+        ValueError: If the mode is not known
+    """
+    if mode not in OUTPUT_MODES:
+        raise ValueError(f"Unknown output mode: {mode}")
+    log.setLevel(OUTPUT_MODES[mode])
+
+
+# Re-running this cell defines a new ConsoleHandler class, so match by name
+if not any(handler.get_name() == "pythonia-console" for handler in log.handlers):
+    log.addHandler(ConsoleHandler())
+set_output_mode('normal')
+
+
+# In[ ]:
+
+
+# Product must be defined before the product classes that extend it
+class Product:
+    __slots__ = ('product_id', 'name', 'price')
+
+    def __init__(self, product_id, name, price):
+        self.product_id = product_id
+        self.name = name
+        self.price = price
+
+    def get_id(self):
+        return self.product_id
+
+    def get_name(self):
+        return self.name
+
+    def get_price(self):
+        return self.price
+    
+    # New setter methods
+    def set_id(self, new_id):
+        """
+        Set new product ID with validation
+        """
+        try:
+            if not isinstance(new_id, str):
+                raise ValueError("Product ID must be a string")
+            if not new_id:
+                raise ValueError("Product ID cannot be empty")
+            self.product_id = new_id
+            return True
+        except Exception as e:
+            print(f"Error setting product ID: {e}")
+            return False
+
+    def set_name(self, new_name):
+        """
+        Set new product name with validation
+        """
+        try:
+            if not isinstance(new_name, str):
+                raise ValueError("Product name must be a string")
+            if not new_name.strip():
+                raise ValueError("Product name cannot be empty")
+            self.name = new_name.strip()
+            return True
+        except Exception as e:
+            print(f"Error setting product name: {e}")
+            return False
+
+    def set_price(self, new_price):
+        """
+        Set new product price with validation
+        """
+        try:
+            new_price = float(new_price)  # Convert to float if string
+            if new_price < 0:
+                raise ValueError("Price cannot be negative")
+            self.price = new_price
+            return True
+        except ValueError as e:
+            print(f"Error setting price: {e}")
+            return False
+        except Exception as e:
+            print(f"Unexpected error setting price: {e}")
+            return False
+
+    def display_info(self):
+        """Base display method to be overridden by subclasses"""
+        return f"Product ID: {self._product_id}, Name: {self._name}, Price: ${self._price:.2f}"
+
+
+# In[ ]:
+
+
 # Rest of code follows...
 # from records import Records
 
@@ -118,6 +252,7 @@ Some functionalities and metyhods are too long they could have been optimized fr
 # U16swan, Unit 16 Swan Building, 195.00, 3
 # U23goose, Unit 23 Goose Building, 180.00, 2
 class apartment(Product):
+    __slots__ = ('capacity',)
     
     availaible_apartments = {}
     
@@ -135,7 +270,7 @@ class apartment(Product):
             new_capacity = int(new_capacity)
             if not 1 <= new_capacity <= 4:
                 raise ValueError("Capacity must be between 1 and 4")
-            self._capacity = new_capacity
+            self.capacity = new_capacity
             return True
         except ValueError as e:
             print(f"Error setting capacity: {e}")
@@ -285,7 +420,7 @@ class apartment(Product):
                     removed_apt = cls.availaible_apartments.pop(apartment_id)
 
                     # Save changes to CSV
-                    cls.save_apartments_to_csv()
+                    cls.save_apartments_to_csv(changed_ids=[apartment_id])
 
                     print(f"\nApartment {apartment_id} ({removed_apt.get_name()}) has been removed successfully.")
                     return True
@@ -306,12 +441,15 @@ class apartment(Product):
         Expected format: U12swan, Unit 12 Swan Building, 200.00, 3
         """
         try:
-            print("\nLoading Apartments")
-            print("=" * 60)
+            log.info("\nLoading Apartments")
+            log.info("=" * 60)
+
+            # Fold pending catalogue edits into the file before reading it
+            CatalogueDelta.compact(filename, background=False)
 
             if not os.path.exists(filename):
-                print(f"⚠️  Warning: {filename} not found")
-                print("ℹ️  Starting with empty apartment list")
+                log.warning(f"⚠️  Warning: {filename} not found")
+                log.info("ℹ️  Starting with empty apartment list")
                 cls.availaible_apartments = {}
                 return False
 
@@ -320,7 +458,7 @@ class apartment(Product):
             apartments_processed = 0
             apartments_skipped = 0
 
-            print(f"\nReading from {filename}...")
+            log.info(f"\nReading from {filename}...")
             with open(filename, 'r') as file:
                 for line_number, line in enumerate(file, 1):
                     try:
@@ -335,7 +473,7 @@ class apartment(Product):
                         if parts[0].startswith('U'):
                             # Validate number of parts
                             if len(parts) != 4:
-                                print(f"⚠️  Line {line_number}: Invalid format - expected 4 fields, got {len(parts)}")
+                                log.warning(f"⚠️  Line {line_number}: Invalid format - expected 4 fields, got {len(parts)}")
                                 apartments_skipped += 1
                                 continue
 
@@ -345,7 +483,7 @@ class apartment(Product):
                             # Validate apartment data
                             is_valid, error_message = cls.validate_apartment(apartment_id, name, rate, capacity)
                             if not is_valid:
-                                print(f"⚠️  Line {line_number}: {error_message}")
+                                log.warning(f"⚠️  Line {line_number}: {error_message}")
                                 apartments_skipped += 1
                                 continue
 
@@ -360,42 +498,67 @@ class apartment(Product):
                                 apartments_processed += 1
 
                             except ValueError as e:
-                                print(f"⚠️  Line {line_number}: Invalid numeric value - {str(e)}")
+                                log.warning(f"⚠️  Line {line_number}: Invalid numeric value - {str(e)}")
                                 apartments_skipped += 1
                                 continue
 
                     except Exception as e:
-                        print(f"⚠️  Line {line_number}: Error processing line - {str(e)}")
+                        log.warning(f"⚠️  Line {line_number}: Error processing line - {str(e)}")
                         apartments_skipped += 1
                         continue
 
+            AvailabilityIndex.invalidate_catalogue()
+            # Apartment rates may have changed, so bundles recalculate on next use
+            Bundle.price_cache.clear()
+
             # Display loading summary
-            print("\nLoading Summary")
-            print("-" * 60)
-            print(f"✅ Successfully loaded: {apartments_processed} apartments")
+            log.info("\nLoading Summary")
+            log.info("-" * 60)
+            log.info(f"✅ Successfully loaded: {apartments_processed} apartments")
             if apartments_skipped > 0:
-                print(f"⚠️  Skipped entries: {apartments_skipped}")
+                log.warning(f"⚠️  Skipped entries: {apartments_skipped}")
 
             if apartments_processed > 0:
-                print("\nLoaded Apartments:")
-                cls.display_apartments()
+                if log.isEnabledFor(logging.DEBUG):
+                    log.debug("\nLoaded Apartments:")
+                    cls.display_apartments()
             else:
-                print("\nℹ️  No valid apartments were loaded")
+                log.info("\nℹ️  No valid apartments were loaded")
 
             return True
 
         except Exception as e:
-            print(f"\n❌ Error loading apartments: {str(e)}")
-            print("ℹ️  Starting with empty apartment list")
+            log.error(f"\n❌ Error loading apartments: {str(e)}")
+            log.info("ℹ️  Starting with empty apartment list")
             cls.availaible_apartments = {}
             return False
 
     @classmethod
-    def save_apartments_to_csv(cls, filename="products.csv"):
-        """Save apartments to CSV file with enhanced error handling and backup"""
+    def save_apartments_to_csv(cls, filename="products.csv", changed_ids=None):
+        """
+        Save apartments to CSV file with enhanced error handling and backup.
+
+        When changed_ids is given only those apartments are written, as
+        records in the catalogue delta, instead of rewriting products.csv.
+        """
         try:
-            print("\nSaving Apartments")
-            print("=" * 60)
+            AvailabilityIndex.invalidate_catalogue()
+
+            log.info("\nSaving Apartments")
+            log.info("=" * 60)
+
+            if changed_ids is not None:
+                saved = CatalogueDelta.record_changes(
+                    cls.availaible_apartments, changed_ids,
+                    lambda apt: [apt.get_id(), apt.get_name(), f"{apt.get_price():.2f}", str(apt.get_capacity())],
+                    filename)
+                if not saved and changed_ids:
+                    return False
+                log.info(f"✅ Saved {saved} apartment change(s) to {CatalogueDelta.journal_path(filename)}")
+                return True
+
+            # A full rewrite starts from the catalogue with pending edits applied
+            CatalogueDelta.compact(filename, background=False)
 
             # Create backup of existing file
             if os.path.exists(filename):
@@ -403,26 +566,26 @@ class apartment(Product):
                 try:
                     import shutil
                     shutil.copy2(filename, backup_filename)
-                    print(f"✅ Created backup: {backup_filename}")
+                    log.info(f"✅ Created backup: {backup_filename}")
                 except Exception as e:
-                    print(f"⚠️  Warning: Could not create backup - {str(e)}")
+                    log.warning(f"⚠️  Warning: Could not create backup - {str(e)}")
 
             # Read existing non-apartment entries
             non_apartment_entries = []
             try:
                 if os.path.exists(filename):
-                    print("\nℹ️  Reading existing file...")
+                    log.info("\nℹ️  Reading existing file...")
                     with open(filename, 'r') as file:
                         for line in file:
                             line = line.strip()
                             if line and not line.startswith('U'):
                                 non_apartment_entries.append(line)
-                    print(f"✅ Found {len(non_apartment_entries)} non-apartment entries")
+                    log.info(f"✅ Found {len(non_apartment_entries)} non-apartment entries")
             except Exception as e:
-                print(f"⚠️  Warning: Could not read existing file - {str(e)}")
+                log.warning(f"⚠️  Warning: Could not read existing file - {str(e)}")
 
             # Write to file
-            print("\nℹ️  Writing apartments to file...")
+            log.info("\nℹ️  Writing apartments to file...")
             try:
                 with open(filename, 'w') as file:
                     # Write apartments first
@@ -433,7 +596,7 @@ class apartment(Product):
                                      f"{apt_info.get_price()}, {apt_info.get_capacity()}\n")
                             apartments_saved += 1
                         except Exception as e:
-                            print(f"⚠️  Warning: Could not save apartment {apt_id} - {str(e)}")
+                            log.warning(f"⚠️  Warning: Could not save apartment {apt_id} - {str(e)}")
 
                     # Write other entries
                     other_entries_saved = 0
@@ -442,32 +605,32 @@ class apartment(Product):
                             file.write(f"{entry}\n")
                             other_entries_saved += 1
                         except Exception as e:
-                            print(f"⚠️  Warning: Could not save entry - {str(e)}")
+                            log.warning(f"⚠️  Warning: Could not save entry - {str(e)}")
 
                 # Display save summary
-                print("\nSave Summary")
-                print("-" * 60)
-                print(f"✅ Apartments saved: {apartments_saved}")
-                print(f"✅ Other entries preserved: {other_entries_saved}")
-                print(f"✅ Total lines written: {apartments_saved + other_entries_saved}")
-                print(f"✅ File saved successfully: {filename}")
+                log.info("\nSave Summary")
+                log.info("-" * 60)
+                log.info(f"✅ Apartments saved: {apartments_saved}")
+                log.info(f"✅ Other entries preserved: {other_entries_saved}")
+                log.info(f"✅ Total lines written: {apartments_saved + other_entries_saved}")
+                log.info(f"✅ File saved successfully: {filename}")
 
                 return True
 
             except Exception as e:
-                print(f"\n❌ Error writing to file: {str(e)}")
+                log.error(f"\n❌ Error writing to file: {str(e)}")
                 # Try to restore from backup
                 if os.path.exists(backup_filename):
-                    print("\nℹ️  Attempting to restore from backup...")
+                    log.info("\nℹ️  Attempting to restore from backup...")
                     try:
                         shutil.copy2(backup_filename, filename)
-                        print("✅ Successfully restored from backup")
+                        log.info("✅ Successfully restored from backup")
                     except Exception as backup_error:
-                        print(f"❌ Error restoring from backup: {str(backup_error)}")
+                        log.error(f"❌ Error restoring from backup: {str(backup_error)}")
                 return False
 
         except Exception as e:
-            print(f"\n❌ Error in save operation: {str(e)}")
+            log.error(f"\n❌ Error in save operation: {str(e)}")
             return False
 
             
@@ -511,6 +674,7 @@ class apartment(Product):
                         elif apartment_rate_per_unit > 0:
                             cls.availaible_apartments[apartment_id].set_price(apartment_rate_per_unit)
                             print(f"Price of {apartment_id} is updated to ${apartment_rate_per_unit:.2f}")
+                            Bundle.reprice_bundles_for(apartment_id)
                         else:
                             raise ValueError("Rate per night must be positive")
                     except ValueError as e:
@@ -556,7 +720,7 @@ class apartment(Product):
 
             # Save changes to CSV
             try:
-                cls.save_apartments_to_csv()
+                cls.save_apartments_to_csv(changed_ids=[apartment_id])
             except Exception as e:
                 print(f"Error saving to CSV file: {e}")
                 print("Changes were made in memory but couldn't be saved to file.")
@@ -648,7 +812,7 @@ apartment.availaible_apartments = {
 
 # Display apartments to verify output
 for apt_id, apt_info in apartment.availaible_apartments.items():
-    print(apt_info)
+    log.debug(apt_info)
 
 
 # In[ ]:
@@ -668,15 +832,157 @@ for apt_id, apt_info in apartment.availaible_apartments.items():
 
 # from datetime import datetime
 # from records import Records
+import json
+import os
+import threading
+from collections.abc import MutableMapping
+
+
+class BookingIdAllocator:
+    """
+    Hands out booking sequence numbers that never repeat, across threads
+    and across restarts.
+
+    Numbers come from blocks of `block_size` reserved in booking_ids.json,
+    which records the high-water mark: the end of the last reserved block.
+    After a restart numbering resumes above every number handed out before
+    (leaving a gap of at most one block). Drawing a number is an increment
+    under a lock; only reserving the next block writes to disk.
+    """
+
+    state_file = "booking_ids.json"
+    block_size = 1000
+    separator = '-'         # Booking IDs end with '-' and the number
+    _lock = threading.Lock()
+    _next = 1
+    _limit = 1              # First number not reserved yet
+
+    @classmethod
+    def _read_high_water_mark(cls):
+        try:
+            with open(cls.state_file, 'r', encoding='utf-8') as file:
+                return int(json.load(file)['high_water_mark'])
+        except FileNotFoundError:
+            return 1
+        except (ValueError, KeyError, TypeError) as e:
+            log.warning(f"⚠️  Warning: Ignoring unreadable {cls.state_file} - {e}")
+            return 1
+
+    @classmethod
+    def _reserve(cls):
+        """Reserve the next block and persist the new high-water mark"""
+        start = max(cls._next, cls._read_high_water_mark())
+        limit = start + cls.block_size
+        temp_name = f"{cls.state_file}.tmp"
+        with open(temp_name, 'w', encoding='utf-8') as file:
+            json.dump({'high_water_mark': limit}, file)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temp_name, cls.state_file)
+        cls._next, cls._limit = start, limit
+
+    @classmethod
+    def allocate(cls):
+        """
+        Return the next booking sequence number.
+
+        Raises:
+            OSError: If a new block could not be reserved
+        """
+        with cls._lock:
+            if cls._next >= cls._limit:
+                cls._reserve()
+            number = cls._next
+            cls._next += 1
+            return number
+
+    @classmethod
+    def observe(cls, booking_id):
+        """Make sure numbers are never reissued after loading an existing booking ID"""
+        prefix, separator, suffix = booking_id.rpartition(cls.separator)
+        if separator and prefix.startswith('BK') and suffix.isdigit():
+            with cls._lock:
+                cls._next = max(cls._next, int(suffix) + 1)
+
+    @classmethod
+    def reset(cls):
+        """Forget the numbers drawn so far; the next one is read from the state file"""
+        with cls._lock:
+            cls._next = cls._limit = 1
+
+
+class LineItem(MutableMapping):
+    """
+    Compact line item that still reads like the dict it replaces.
+
+    Each subclass lists its fields in __slots__, so the field names live on
+    the class instead of being repeated as keys in every booking. Fields that
+    were never set behave like missing keys.
+    """
+    __slots__ = ()
+
+    def __init__(self, **fields):
+        for key, value in fields.items():
+            self[key] = value
+
+    def __getitem__(self, key):
+        if key not in self.__slots__:
+            raise KeyError(key)
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key) from None
+
+    def __setitem__(self, key, value):
+        if key not in self.__slots__:
+            raise KeyError(f"{type(self).__name__} has no field {key!r}")
+        setattr(self, key, value)
+
+    def __delitem__(self, key):
+        if key not in self:
+            raise KeyError(key)
+        delattr(self, key)
+
+    def __iter__(self):
+        return (key for key in self.__slots__ if hasattr(self, key))
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __repr__(self):
+        return f"{type(self).__name__}({dict(self)!r})"
+
+
+class ApartmentLineItem(LineItem):
+    """An apartment stay held by a booking"""
+    __slots__ = ('booking_date', 'number_of_guests', 'check_in_date', 'check_out_date',
+                 'length_of_stay', 'rate_per_night', 'total_cost')
+
+
+class SupplementaryLineItem(LineItem):
+    """A supplementary item ordered with a booking"""
+    __slots__ = ('name', 'quantity', 'price_per_unit', 'total_price')
 
 
 class Booking:
+    # Optional attributes (bundle_info, total_cost, ...) are only set by some
+    # booking paths; unset slots still read as missing through hasattr/getattr.
+    __slots__ = ('guest', 'current_booking_date', 'number_of_guests', 'check_in_date',
+                 'check_out_date', 'nights', 'apartment_id', 'reward_points', 'booking_id',
+                 'booking_discount', '_supplementary_items', '_booked_apartments',
+                 '_booking_of_guest', 'guest_id', 'bundle_info', 'total_cost',
+                 'total_cost_for_apartments', 'total_supplementary_cost',
+                 'reward_points_earned', 'discount_applied', 'points_redeemed', 'stored_total')
     
     bookings = {}
-    booking_counter = 0
+    # Guards the bookings registry, which confirm paths on worker threads update
+    registry_lock = threading.RLock()
+    # Append new orders to an fsync'd journal instead of copying orders.csv
+    use_order_journal = True
     # guest_bookings = {}
    
-    def __init__(self, guest, check_in_date, check_out_date, current_booking_date, number_of_guests, nights, apartment_id):
+    def __init__(self, guest, check_in_date, check_out_date, current_booking_date, number_of_guests, nights, apartment_id,
+                 booking_id=None):
         
         self.guest = guest  # Store guest ID instead of Guest instance
         self.current_booking_date = current_booking_date
@@ -691,10 +997,15 @@ class Booking:
         # self.total_supplementary_cost = 0
         # self.total_cost = 0
         self.reward_points = 0
-        self.supplementary_items_for_current_booking = {}
-        self.booked_apartments_for_current_booking = {}
-        self.booking_id = self.generate_booking_id()
-        self.booking_of_guest = {}
+        # Line item containers are created on first write
+        self._supplementary_items = None
+        self._booked_apartments = None
+        self._booking_of_guest = None
+        if booking_id is None:
+            booking_id = self.generate_booking_id()
+        else:
+            BookingIdAllocator.observe(booking_id)
+        self.booking_id = booking_id
         self.booking_discount = 0
         # self.guest_data = {}
         # self.booking_list = {}
@@ -705,8 +1016,86 @@ class Booking:
 #   def calculate_reward_points_for_current_booking(self):
         # return round(self.total_cost)
     def get_booking_id(self):
-        booking_id = self.generate_booking_id()
-        return booking_id
+        return self.booking_id
+
+    @property
+    def supplementary_items_for_current_booking(self):
+        """Supplementary line items keyed by item ID"""
+        if self._supplementary_items is None:
+            self._supplementary_items = {}
+        return self._supplementary_items
+
+    @supplementary_items_for_current_booking.setter
+    def supplementary_items_for_current_booking(self, items):
+        self._supplementary_items = items
+
+    @property
+    def booked_apartments_for_current_booking(self):
+        """Apartment line items keyed by apartment ID"""
+        if self._booked_apartments is None:
+            self._booked_apartments = {}
+        return self._booked_apartments
+
+    @booked_apartments_for_current_booking.setter
+    def booked_apartments_for_current_booking(self, apartments):
+        self._booked_apartments = apartments
+
+    @property
+    def booking_of_guest(self):
+        if self._booking_of_guest is None:
+            self._booking_of_guest = {}
+        return self._booking_of_guest
+
+    @booking_of_guest.setter
+    def booking_of_guest(self, bookings):
+        self._booking_of_guest = bookings
+
+    def add_apartment_line(self, apartment_id, rate_per_night=None):
+        """
+        Record an apartment stay for this booking as a compact line item.
+
+        Args:
+            apartment_id (str): Apartment being booked
+            rate_per_night (float): Nightly rate, looked up in the catalogue if omitted
+
+        Returns:
+            ApartmentLineItem: The stored line item
+        """
+        if rate_per_night is None:
+            rate_per_night = apartment.availaible_apartments[apartment_id].get_price()
+        line = ApartmentLineItem(
+            booking_date=self.current_booking_date,
+            number_of_guests=self.number_of_guests,
+            check_in_date=self.check_in_date,
+            check_out_date=self.check_out_date,
+            length_of_stay=self.nights,
+            rate_per_night=rate_per_night,
+            total_cost=rate_per_night * self.nights
+        )
+        self.booked_apartments_for_current_booking[apartment_id] = line
+        return line
+
+    def add_supplementary_line(self, item_id, quantity, price_per_unit=None):
+        """
+        Record a supplementary item for this booking as a compact line item.
+
+        Args:
+            item_id (str): Supplementary item ordered
+            quantity (int): Number of units
+            price_per_unit (float): Unit price, looked up in the catalogue if omitted
+
+        Returns:
+            SupplementaryLineItem: The stored line item
+        """
+        if price_per_unit is None:
+            price_per_unit = supplementary_items.available_supplementary_items[item_id].get_price()
+        line = SupplementaryLineItem(
+            quantity=quantity,
+            price_per_unit=price_per_unit,
+            total_price=quantity * price_per_unit
+        )
+        self.supplementary_items_for_current_booking[item_id] = line
+        return line
 
     # def get_rate_per_night(self):
     #     return apartment.availaible_apartments[self.apartment_id]['rate_per_night']
@@ -724,14 +1113,14 @@ class Booking:
         
     def get_total_apartment_booking_cost(self):
         total = 0
-        for apartment_details in self.booked_apartments_for_current_booking.values():
+        for apartment_details in (self._booked_apartments or {}).values():
             total += apartment_details['total_cost']
         return total
     
     def get_total_supplementary_item_booking_cost(self):
         """Calculate total cost for all supplementary items"""
         total = 0
-        for item_details in self.supplementary_items_for_current_booking.values():
+        for item_details in (self._supplementary_items or {}).values():
             total += item_details['total_price']
         return total
     
@@ -792,6 +1181,18 @@ class Booking:
     def get_total_cost(self):
         """Calculate total cost including apartments and supplementary items"""
         return self.get_total_apartment_booking_cost() + self.get_total_supplementary_item_booking_cost()
+
+    def get_final_cost(self):
+        """
+        Amount paid: the total cost less the reward points discount.
+
+        A booking loaded from the orders file keeps the total it was sold
+        for, so later catalogue price changes do not rewrite past revenue.
+        """
+        stored_total = getattr(self, 'stored_total', None)
+        if stored_total is not None:
+            return stored_total
+        return self.get_total_cost() - self.booking_discount
         
         
     def get_apartment_booked_info(self):
@@ -805,6 +1206,51 @@ class Booking:
     
     def get_apartment_id(self):
         return self.apartment_id
+
+    def get_booked_apartment_ids(self):
+        """Return the IDs of every apartment held by this booking"""
+        apartment_ids = list(self.booked_apartments_for_current_booking)
+        if self.apartment_id and self.apartment_id not in apartment_ids:
+            apartment_ids.append(self.apartment_id)
+        return apartment_ids
+
+    @classmethod
+    def register_booking(cls, booking):
+        """
+        Store a confirmed booking and index the apartments it occupies.
+
+        Args:
+            booking (Booking): Confirmed booking
+
+        Returns:
+            bool: True if the booking was indexed without clashing
+        """
+        cls.add_to_registry(booking)
+        return AvailabilityIndex.add_booking(booking)
+
+    @classmethod
+    def add_to_registry(cls, booking):
+        """Store a booking in the registry without indexing it"""
+        with cls.registry_lock:
+            cls.bookings[booking.booking_id] = booking
+
+    @classmethod
+    def remove_from_registry(cls, booking_id):
+        """Drop a booking from the registry; returns it, or None if unknown"""
+        with cls.registry_lock:
+            return cls.bookings.pop(booking_id, None)
+
+    @classmethod
+    def get_registered_booking(cls, booking_id):
+        """Look up a registered booking by ID"""
+        with cls.registry_lock:
+            return cls.bookings.get(booking_id)
+
+    @classmethod
+    def registered_bookings(cls):
+        """Snapshot of the registered bookings, safe to iterate while others are added"""
+        with cls.registry_lock:
+            return list(cls.bookings.values())
     
     
 #     def guest_info(self):
@@ -842,8 +1288,6 @@ class Booking:
         
     def generate_booking_id(self):
         
-        Booking.booking_counter += 1
-        
         # Extract parts from dates
         check_in_month = self.check_in_date[3:5]
         check_in_day = self.check_in_date[:2]
@@ -854,7 +1298,7 @@ class Booking:
         apt_prefix = apartment_id[:3]
         
         # Combine parts to create a unique ID
-        booking_id = f"BK{apt_prefix}{check_in_month}{self.number_of_guests:02d}{self.get_length_of_stay():02d}{check_in_day}{current_day}{Booking.booking_counter:04d}"
+        booking_id = f"BK{apt_prefix}{check_in_month}{self.number_of_guests:02d}{self.get_length_of_stay():02d}{check_in_day}{current_day}{BookingIdAllocator.separator}{BookingIdAllocator.allocate():04d}"
 
         
         return booking_id
@@ -867,55 +1311,29 @@ class Booking:
     
     
     @classmethod
-    def generate_key_statistics(cls):
+    def generate_key_statistics(cls, top_k=3, orders_file=None):
         """
         Generate key business statistics including:
-        - Top 3 most valuable guests
-        - Top 3 most popular products
+        - Top K most valuable guests
+        - Top K most popular products
+
+        Args:
+            top_k (int): Number of guests and products to report
+            orders_file (str, optional): Aggregate the columnar store of this
+                                         file instead of the loaded bookings
         """
         try:
-            stats = {
-                'guest_totals': defaultdict(float),
-                'product_quantities': defaultdict(int)
-            }
-
-            # Process all bookings
-            for booking in cls.bookings.values():
-                # Guest totals
-                guest_id = booking.guest.guest_id
-                stats['guest_totals'][guest_id] += booking.get_total_cost()
-
-                # Product quantities
-                if hasattr(booking, 'bundle_info'):
-                    # Count bundle as one product
-                    bundle_id = booking.bundle_info['bundle_id']
-                    stats['product_quantities'][bundle_id] += 1
-                else:
-                    # Count individual products
-                    for apt_id in booking.booked_apartments_for_current_booking:
-                        stats['product_quantities'][apt_id] += booking.length_of_stay
-
-                    for item_id, item_info in booking.supplementary_items_for_current_booking.items():
-                        stats['product_quantities'][item_id] += item_info['quantity']
-
-            # Get top 3 guests
-            top_guests = sorted(
-                stats['guest_totals'].items(),
-                key=lambda x: x[1],
-                reverse=True
-            )[:3]
-
-            # Get top 3 products
-            top_products = sorted(
-                stats['product_quantities'].items(),
-                key=lambda x: x[1],
-                reverse=True
-            )[:3]
+            if orders_file:
+                stats = ColumnarOrderStore.load(orders_file).summarise(top_k)
+            else:
+                stats = OrderStatistics.summarise(OrderStatistics.iter_bookings(cls.registered_bookings()), top_k)
+            top_guests = stats['top_guests']
+            top_products = stats['top_products']
 
             # Save to stats.txt
             with open('stats.txt', 'w') as f:
                 # Write top guests
-                f.write("Top 3 Most Valuable Guests\n")
+                f.write(f"Top {top_k} Most Valuable Guests\n")
                 f.write("=" * 50 + "\n")
                 for guest_id, total in top_guests:
                     guest = Guest.guest_data.get(guest_id)
@@ -924,7 +1342,7 @@ class Booking:
                 f.write("\n")
 
                 # Write top products
-                f.write("Top 3 Most Popular Products\n")
+                f.write(f"Top {top_k} Most Popular Products\n")
                 f.write("=" * 50 + "\n")
                 for product_id, quantity in top_products:
                     if product_id.startswith('B'):
@@ -947,10 +1365,60 @@ class Booking:
             return None
 
     
+    def get_order_products(self):
+        """
+        Format the booked products as "quantity x product_id" entries.
+
+        Raises:
+            ValueError: If the booking has no products
+        """
+        products = []
+        if hasattr(self, 'bundle_info') and self.bundle_info:
+            # Bundle booking
+            bundle_id = self.bundle_info.get('bundle_id')
+            if not bundle_id:
+                raise ValueError("Invalid bundle information")
+            products.append(f"1 x {bundle_id}")
+        else:
+            # Regular booking
+            # Add apartments
+            if not self.booked_apartments_for_current_booking:
+                raise ValueError("No apartments booked")
+
+            for apt_id, details in self.booked_apartments_for_current_booking.items():
+                quantity = details.get('length_of_stay', 1)  # Default to 1 if not found
+                products.append(f"{quantity} x {apt_id}")
+
+            # Add supplementary items
+            for item_id, details in self.supplementary_items_for_current_booking.items():
+                quantity = details.get('quantity', 1)  # Default to 1 if not found
+                products.append(f"{quantity} x {item_id}")
+        return products
+
+    def to_order_row(self, products=None):
+        """Build the orders.csv row for this booking (the format read by from_order_row)"""
+        if products is None:
+            products = self.get_order_products()
+        return [
+            self.booking_id,                             # Booking ID
+            self.current_booking_date,                    # Booking date
+            self.guest.get_guest_id(),                   # Guest ID
+            self.check_in_date,                          # Check-in date
+            self.check_out_date,                         # Check-out date
+            str(self.nights),                            # Length of stay
+            str(self.number_of_guests),                  # Number of guests
+            *products,                                   # All products (apartments and items)
+            f"{self.get_final_cost():.2f}",             # Total cost
+            str(self.get_reward_points_for_this_booking()) # Reward points
+        ]
+
     def save_to_csv(self, filename="orders.csv"):
         """
         Save booking to CSV file with error handling and backup functionality.
 
+        In journal mode (the default) the row is appended to the order journal
+        and fsync'd, so the cost of a save does not grow with orders.csv.
+
         Args:
             filename (str): Name of the file to save to
 
@@ -958,202 +1426,238 @@ class Booking:
             bool: True if successful, False otherwise
         """
         try:
-            print("\nSaving Booking Data")
-            print("=" * 60)
+            log.info("\nSaving Booking Data")
+            log.info("=" * 60)
 
             # Create backup if file exists
-            if os.path.exists(filename):
-                backup_name = f"{filename}.bak"
+            backup_name = f"{filename}.bak"
+            if not self.use_order_journal and os.path.exists(filename):
                 try:
-                    import shutil
                     shutil.copy2(filename, backup_name)
-                    print(f"✅ Created backup: {backup_name}")
+                    log.info(f"✅ Created backup: {backup_name}")
                 except Exception as e:
-                    print(f"⚠️  Warning: Could not create backup - {str(e)}")
+                    log.warning(f"⚠️  Warning: Could not create backup - {str(e)}")
 
             # Validate guest data
             if not self.guest:
                 raise ValueError("No guest information found")
 
             # Validate and format product information
-            products = []
             try:
-                if hasattr(self, 'bundle_info') and self.bundle_info:
-                    # Bundle booking
-                    bundle_id = self.bundle_info.get('bundle_id')
-                    if not bundle_id:
-                        raise ValueError("Invalid bundle information")
-                    products.append(f"1 x {bundle_id}")
-                    print(f"ℹ️  Processing bundle booking: {bundle_id}")
-                else:
-                    # Regular booking
-                    # Add apartments
-                    if not self.booked_apartments_for_current_booking:
-                        raise ValueError("No apartments booked")
-
-                    for apt_id, details in self.booked_apartments_for_current_booking.items():
-                        quantity = details.get('length_of_stay', 1)  # Default to 1 if not found
-                        products.append(f"{quantity} x {apt_id}")
-                        print(f"ℹ️  Processing apartment: {apt_id}")
-
-                    # Add supplementary items
-                    for item_id, details in self.supplementary_items_for_current_booking.items():
-                        quantity = details.get('quantity', 1)  # Default to 1 if not found
-                        products.append(f"{quantity} x {item_id}")
-                        print(f"ℹ️  Processing item: {item_id}")
-
+                products = self.get_order_products()
+                for product in products:
+                    log.debug(f"ℹ️  Processing: {product}")
             except Exception as e:
-                print(f"❌ Error processing products: {str(e)}")
+                log.error(f"❌ Error processing products: {str(e)}")
                 return False
 
             # Validate dates and numbers
             try:
-                # Create row with all booking details
-                row = [
-                    self.current_booking_date,                    # Booking date
-                    self.guest.get_guest_id(),                   # Guest ID (fixed the .get to get_guest_id())
-                    self.check_in_date,                          # Check-in date
-                    self.check_out_date,                         # Check-out date
-                    str(self.length_of_stay),                    # Length of stay
-                    str(self.number_of_guests),                  # Number of guests
-                    *products,                                   # All products (apartments and items)
-                    f"{self.get_total_cost():.2f}",             # Total cost
-                    str(self.get_reward_points_for_this_booking()) # Reward points
-                ]
+                row = self.to_order_row(products)
             except Exception as e:
-                print(f"❌ Error preparing row data: {str(e)}")
+                log.error(f"❌ Error preparing row data: {str(e)}")
                 return False
 
             # Save to file
             try:
-                mode = 'a' if os.path.exists(filename) else 'w'
-                with open(filename, mode, newline='') as file:
-                    writer = csv.writer(file)
-                    writer.writerow(row)
-                print(f"✅ Booking saved to {filename}")
+                rows = OrderRows.header_for(filename) + [row]
+                if self.use_order_journal:
+                    if OrderJournal.append_many(rows, filename) != len(rows):
+                        return False
+                else:
+                    mode = 'a' if os.path.exists(filename) else 'w'
+                    with open(filename, mode, newline='') as file:
+                        writer = csv.writer(file)
+                        writer.writerows(rows)
+                log.info(f"✅ Booking saved to {filename}")
 
                 # Print save summary
-                print("\nSave Summary:")
-                print("-" * 60)
-                print(f"Guest: {self.guest.get_guest_id()}")
+                log.debug("\nSave Summary:")
+                log.debug("-" * 60)
+                log.debug(f"Guest: {self.guest.get_guest_id()}")
                 if hasattr(self, 'bundle_info') and self.bundle_info:
-                    print(f"Bundle: {self.bundle_info['bundle_id']}")
-                print(f"Total Products: {len(products)}")
-                print(f"Total Cost: ${self.get_total_cost():.2f}")
-                print(f"Reward Points: {self.get_reward_points_for_this_booking()}")
-                print("-" * 60)
+                    log.debug(f"Bundle: {self.bundle_info['bundle_id']}")
+                log.debug(f"Total Products: {len(products)}")
+                log.debug(f"Total Cost: ${self.get_final_cost():.2f}")
+                log.debug(f"Reward Points: {self.get_reward_points_for_this_booking()}")
+                log.debug("-" * 60)
 
                 return True
 
             except Exception as e:
-                print(f"❌ Error writing to file: {str(e)}")
+                log.error(f"❌ Error writing to file: {str(e)}")
                 # Try to restore from backup
-                if os.path.exists(backup_name):
+                if not self.use_order_journal and os.path.exists(backup_name):
                     try:
                         shutil.copy2(backup_name, filename)
-                        print("✅ Successfully restored from backup")
+                        log.info("✅ Successfully restored from backup")
                     except Exception as backup_error:
-                        print(f"❌ Error restoring from backup: {str(backup_error)}")
+                        log.error(f"❌ Error restoring from backup: {str(backup_error)}")
                 return False
 
         except Exception as e:
-            print(f"❌ Unexpected error: {str(e)}")
+            log.error(f"❌ Unexpected error: {str(e)}")
             return False
 
+    @staticmethod
+    def is_order_row(row):
+        """Check whether a CSV row (without its booking ID) uses the format written by save_to_csv"""
+        return len(row) >= 9 and ' x ' in row[6]
+
     @classmethod
-    def load_from_csv(cls, filename="orders.csv"):
-        """
-        Enhanced order loading from CSV with proper validation and error handling
+    def from_order_row(cls, row, booking_id=None):
         """
-        try:
-            if not os.path.exists(filename):
-                print(f"Note: {filename} not found. Starting with empty booking history.")
-                return False
+        Rebuild a booking from a row written by save_to_csv.
 
-            successes = 0
-            failures = 0
+        Format: booking_date, guest_id, check_in, check_out, nights,
+                number_of_guests, "qty x PRODUCT"..., total_cost, reward_points
+        (in orders.csv the booking ID comes first below an OrderRows.HEADER row;
+        OrderRows separates it)
 
-            with open(filename, 'r') as file:
-                reader = csv.reader(file)
-                for row_num, row in enumerate(file, 1):
-                    try:
-                        # Validate row format
-                        if len(row) < 7:  # Minimum required fields
-                            raise ValueError(f"Invalid row format at line {row_num}")
+        Args:
+            row (list): The orders.csv row without its booking ID
+            booking_id (str, optional): The booking ID; a new one is allocated if omitted
 
-                        # Parse basic booking data
-                        booking_date = row[0]
-                        guest_id = row[1]
-                        check_in_date = row[2]
-                        check_out_date = row[3]
-                        length_of_stay = int(row[4])
-                        number_of_guests = int(row[5])
-
-                        # Find guest
-                        guest = Guest.guest_data.get(guest_id)
-                        if not guest:
-                            raise ValueError(f"Guest {guest_id} not found")
-
-                        # Parse products (everything between guest data and totals)
-                        products_data = row[6:-2]
-                        total_cost = float(row[-2])
-                        reward_points = int(row[-1])
+        Raises:
+            ValueError: If the row or any product in it is invalid
+        """
+        return cls.from_parsed_order(cls.parse_order_row(row, booking_id))
 
-                        # Create new booking instance
-                        booking = cls(
-                            guest=guest,
-                            check_in_date=check_in_date,
-                            check_out_date=check_out_date,
-                            current_booking_date=booking_date,
-                            number_of_guests=number_of_guests,
-                            nights=length_of_stay,
-                            apartment_id=None  # Will be set from products
-                        )
+    @classmethod
+    def parse_order_row(cls, row, booking_id=None):
+        """
+        Parse a row written by save_to_csv without looking anything up.
 
-                        # Process products
-                        for product in products_data:
-                            quantity, product_id = product.strip().split(' x ')
-                            quantity = int(quantity)
-
-                            if product_id.startswith('B'):
-                                # Handle bundle
-                                bundle = Bundle.available_bundles.get(product_id)
-                                if bundle:
-                                    booking.process_bundle_booking(bundle, guest_id)
-                            elif product_id.startswith('U'):
-                                # Handle apartment
-                                booking.apartment_id = product_id
-                                booking.add_apartment_for_current_booking()
-                            elif product_id.startswith('SI'):
-                                # Handle supplementary item
-                                booking.supplementary_items_for_current_booking[product_id] = {
-                                    'quantity': quantity,
-                                    'price_per_unit': supplementary_items.available_supplementary_items[product_id].get_price(),
-                                    'total_price': quantity * supplementary_items.available_supplementary_items[product_id].get_price()
-                                }
-
-                        # Update guest's reward points
-                        guest.update_reward_points(reward_points)
-
-                        # Store booking
-                        cls.bookings[booking.booking_id] = booking
-                        successes += 1
+        Args:
+            row (list): The orders.csv row without its booking ID
+            booking_id (str, optional): The booking ID
 
-                    except Exception as e:
-                        print(f"Error processing order at line {row_num}: {e}")
-                        failures += 1
+        Returns:
+            tuple: (booking_id or None, booking_date, guest_id, check_in_date,
+                    check_out_date, nights, number_of_guests,
+                    [(quantity, product_id), ...], total_cost, reward_points)
+
+        Raises:
+            ValueError: If the row or any product in it is invalid
+        """
+        # Validate row format
+        if len(row) < 9:  # Minimum required fields
+            raise ValueError("Invalid row format")
+
+        # Parse products (everything between guest data and totals)
+        products_data = []
+        for product in row[6:-2]:
+            quantity, product_id = product.strip().split(' x ')
+            products_data.append((int(quantity), product_id.strip()))
+
+        return (booking_id, row[0], row[1], row[2], row[3], int(row[4]), int(row[5]),
+                products_data, float(row[-2]), int(row[-1]))
+
+    @classmethod
+    def from_parsed_order(cls, order, booking_id=None):
+        """
+        Build a booking from the output of parse_order_row.
+
+        Args:
+            order (tuple): Parsed order row
+            booking_id (str, optional): ID to use if the row has no stored booking ID
+
+        Raises:
+            ValueError: If the guest or the apartment is unknown
+        """
+        (stored_id, booking_date, guest_id, check_in_date, check_out_date, length_of_stay,
+         number_of_guests, products_data, total_cost, reward_points) = order
+        booking_id = stored_id or booking_id
+
+        # Find guest
+        guest = Guest.guest_data.get(guest_id)
+        if not guest:
+            raise ValueError(f"Guest {guest_id} not found")
+
+        # The booking ID is derived from the apartment, so find it first
+        apartment_id = next((product_id for _, product_id in products_data
+                             if product_id.startswith('U')), None)
+        if apartment_id is None:
+            bundle = next((Bundle.available_bundles.get(product_id) for _, product_id in products_data
+                           if product_id.startswith('B')), None)
+            if bundle is None:
+                raise ValueError("Order row has no apartment")
+            apartment_id = bundle.apartment_id
+
+        # Create new booking instance
+        booking = cls(
+            guest=guest,
+            check_in_date=check_in_date,
+            check_out_date=check_out_date,
+            current_booking_date=booking_date,
+            number_of_guests=number_of_guests,
+            nights=length_of_stay,
+            apartment_id=apartment_id,
+            booking_id=booking_id
+        )
+        booking.reward_points = reward_points
+
+        # Process products
+        for quantity, product_id in products_data:
+            if product_id.startswith('B'):
+                # Handle bundle
+                bundle = Bundle.available_bundles.get(product_id)
+                if bundle:
+                    booking.process_bundle_booking(bundle, guest_id)
+            elif product_id.startswith('U'):
+                # Handle apartment
+                booking.apartment_id = product_id
+                booking.add_apartment_line(product_id)
+            elif product_id.startswith('SI'):
+                # Handle supplementary item
+                booking.add_supplementary_line(product_id, quantity)
+
+        # The lines are priced from the current catalogue; the order keeps its recorded total
+        booking.stored_total = total_cost
+        return booking
+
+    @classmethod
+    def load_from_csv(cls, filename="orders.csv"):
+        """
+        Enhanced order loading from CSV with proper validation and error handling.
+        Rows still in the order journal are replayed after the snapshot.
+        """
+        try:
+            if not os.path.exists(filename) and not os.path.exists(OrderJournal.journal_path(filename)):
+                log.info(f"Note: {filename} not found. Starting with empty booking history.")
+                return False
+
+            successes = 0
+            failures = 0
+
+            for row_num, kind, booking_id, row in OrderRows.read(filename):
+                try:
+                    if kind != 'order':
                         continue
+                    booking = cls.from_order_row(row, booking_id)
+
+                    # Reward balances come from the reward ledger, so
+                    # historical bookings are not credited again here
+
+                    # Store booking
+                    cls.register_booking(booking)
+                    successes += 1
+
+                except Exception as e:
+                    log.warning(f"Error processing order at line {row_num}: {e}")
+                    failures += 1
+                    continue
 
-            print(f"\nOrder Loading Summary:")
-            print(f"Successfully loaded: {successes} orders")
+            log.info(f"\nOrder Loading Summary:")
+            log.info(f"Successfully loaded: {successes} orders")
             if failures > 0:
-                print(f"Failed to load: {failures} orders")
+                log.info(f"Failed to load: {failures} orders")
 
             return True
 
         except Exception as e:
-            print("Cannot load the order file.")
-            print(f"Error: {e}")
+            log.error("Cannot load the order file.")
+            log.error(f"Error: {e}")
             return False
         
     def add_booking_info_of_guest_bookings(self):
@@ -1372,8 +1876,8 @@ class Booking:
         try:
             # Get apartment details
             apartment_info = apartment.availaible_apartments[self.apartment_id]
-            apartment_name = apartment_info['name']
-            apartment_rate = apartment_info['rate_per_night']
+            apartment_name = apartment_info.get_name()
+            apartment_rate = apartment_info.get_price()
             apartment_subtotal = self.get_total_apartment_booking_cost()
     
             print("\n" + "=" * 73)
@@ -1385,7 +1889,7 @@ class Booking:
             print(f"Apartment rate: $ {apartment_rate:.2f} (AUD)")
             print(f"Check-in date: {self.check_in_date}")
             print(f"Check-out date: {self.check_out_date}")
-            print(f"Length of stay: {self.length_of_stay} (nights)")
+            print(f"Length of stay: {self.nights} (nights)")
             print(f"Booking date: {self.current_booking_date}")
             print(f"Sub-total: $ {apartment_subtotal:.2f} (AUD)")
             
@@ -1400,7 +1904,7 @@ class Booking:
                     supplementary_item = supplementary_items.available_supplementary_items[item_id]
                     print("{:<10} {:<20} {:<8} {:<12.2f} {:<10.2f}".format(
                         item_id,
-                        supplementary_item['name'],
+                        supplementary_item.get_name(),
                         item_info['quantity'],
                         item_info['price_per_unit'],
                         item_info['total_price']
@@ -1480,12 +1984,75 @@ class Booking:
 # from product import Product
 # from Apartment import apartment
 # from Supplementary_items import supplementary_items
+import bisect
 from collections import defaultdict
+from datetime import date
+
+
+def normalise_name(name):
+    """Lower-case a name and collapse its whitespace for index lookups"""
+    return " ".join(str(name).lower().split())
+
+
+class BundleBookingHistory:
+    """
+    Bookings of a single bundle kept sorted by booking date.
+
+    Booking dates are parsed once, when a booking is added. The ordinals,
+    the booking records and their month keys (year * 12 + month - 1) are
+    parallel lists, so a date range is two bisects and a slice, and
+    monthly_totals holds the per-month booking counts for the full history.
+    """
+
+    def __init__(self):
+        self.ordinals = []
+        self.bookings = []
+        self.month_keys = []
+        self.monthly_totals = defaultdict(int)
+
+    def __len__(self):
+        return len(self.bookings)
+
+    def __iter__(self):
+        return iter(self.bookings)
+
+    def append(self, booking_info):
+        """Add a booking record, keeping the history in date order"""
+        ordinal = to_date_ordinal(booking_info['booking_date'])
+        booked_on = date.fromordinal(ordinal)
+        month_key = booked_on.year * 12 + booked_on.month - 1
+
+        position = bisect.bisect_right(self.ordinals, ordinal)
+        self.ordinals.insert(position, ordinal)
+        self.bookings.insert(position, booking_info)
+        self.month_keys.insert(position, month_key)
+        self.monthly_totals[month_key] += 1
+
+    def select(self, start=None, end=None):
+        """
+        Return the bookings made between two dates (inclusive).
+
+        Returns:
+            tuple: (booking records, month keys) for the range
+        """
+        low = bisect.bisect_left(self.ordinals, to_date_ordinal(start)) if start is not None else 0
+        high = bisect.bisect_right(self.ordinals, to_date_ordinal(end)) if end is not None else len(self.ordinals)
+        return self.bookings[low:high], self.month_keys[low:high]
+
+    @staticmethod
+    def month_label(month_key):
+        return date(month_key // 12, month_key % 12 + 1, 1).strftime("%B %Y")
+
 
 class Bundle(Product):
+    __slots__ = ('components', 'apartment_id', 'discount_rate')
     # Now populate the available_bundles dictionary after the class definition
     available_bundles = {}
-    bundle_bookings = defaultdict(list) 
+    bundle_bookings = defaultdict(BundleBookingHistory)
+    price_cache = {}                    # bundle_id -> calculated price
+    component_index = defaultdict(set)  # component_id -> IDs of bundles containing it
+    name_index = {}                     # normalised bundle name -> bundle_id
+    pending_orders_file = None          # Orders file whose bundle history loads on first use
     @classmethod
     def initialize_bundles(cls):
         """Initialize predefined bundles"""
@@ -1493,6 +2060,7 @@ class Bundle(Product):
             # Define available supplementary items
             available_si = supplementary_items.available_supplementary_items.keys()
 
+            cls.clear_indexes()
             cls.available_bundles = {
                 'B1': cls('B1', 'Romantic Getaway Package', 'U12swan', 
                          [item for item in ['SI2', 'SI2', 'SI1', 'SI4', 'SI16', 'SI20'] 
@@ -1568,17 +2136,12 @@ class Bundle(Product):
             }
             return True
         except Exception as e:
-            print(f"Error initializing bundles: {e}")
+            log.error(f"Error initializing bundles: {e}")
             return False
 
     def __init__(self, bundle_id: str, name: str, apartment_id: str, components: list, discount_rate: float = 0.8):
         """Initialize bundle with validation and components"""
         
-        print(f"Bundle init received:")
-        print(f"bundle_id: {bundle_id}")
-        print(f"name: {name}")
-        print(f"apartment_id: {apartment_id}")
-        print(f"components: {components}")
         # Validate bundle ID
         if not bundle_id.startswith('B'):
             raise ValueError("Bundle ID must start with 'B'")
@@ -1592,10 +2155,68 @@ class Bundle(Product):
         self.discount_rate = discount_rate
         
         # Calculate price before calling parent constructor
-        total_price = self.calculate_bundle_price(self.components)
+        total_price = self.calculate_bundle_price(self.components, discount_rate)
         
         # Initialize parent class
         Product.__init__(self, bundle_id, name, total_price)
+        self.price_cache[bundle_id] = total_price
+        self._index_components()
+        self.name_index[normalise_name(name)] = bundle_id
+
+    @classmethod
+    def clear_indexes(cls):
+        """Forget cached prices and lookups before the bundle registry is replaced"""
+        cls.price_cache.clear()
+        cls.component_index.clear()
+        cls.name_index.clear()
+
+    def _index_components(self):
+        """Register this bundle under each of its components"""
+        for component_id in self.components:
+            self.component_index[component_id].add(self.get_id())
+
+    def _unindex_components(self):
+        """Remove this bundle from the component index"""
+        for component_id in self.components:
+            bundle_ids = self.component_index.get(component_id)
+            if bundle_ids:
+                bundle_ids.discard(self.get_id())
+                if not bundle_ids:
+                    del self.component_index[component_id]
+
+    def get_price(self):
+        """Return the bundle price, recalculating it only after a component changed"""
+        bundle_id = self.get_id()
+        if bundle_id not in self.price_cache:
+            self.price = self.calculate_bundle_price(self.components, self.discount_rate)
+            self.price_cache[bundle_id] = self.price
+        return self.price_cache[bundle_id]
+
+    @classmethod
+    def reprice_bundles_for(cls, component_id):
+        """
+        Recalculate the price of every bundle containing a component.
+
+        Called after the price of an apartment or supplementary item changes;
+        bundles that do not contain the component keep their cached price.
+
+        Returns:
+            list: IDs of the bundles that were repriced
+        """
+        repriced = []
+        for bundle_id in sorted(cls.component_index.get(component_id, ())):
+            cls.price_cache.pop(bundle_id, None)
+            bundle = cls.available_bundles.get(bundle_id)
+            if bundle is None:
+                continue
+            try:
+                bundle.get_price()
+                repriced.append(bundle_id)
+            except ValueError as e:
+                print(f"⚠️  Could not reprice bundle {bundle_id}: {e}")
+        if repriced:
+            print(f"ℹ️  Repriced {len(repriced)} bundle(s) containing {component_id}")
+        return repriced
 
     def get_components(self):
         return self.components
@@ -1717,15 +2338,20 @@ class Bundle(Product):
                 bundle = cls.available_bundles[bundle_id]
 
                 # Update basic information
+                cls.name_index.pop(normalise_name(bundle.name), None)
                 bundle.name = bundle_data['name']
+                cls.name_index[normalise_name(bundle.name)] = bundle_id
                 bundle.apartment_id = bundle_data['apartment_id']
 
                 # Update components
                 full_components = [bundle_data['apartment_id']] + bundle_data['components']
+                bundle._unindex_components()
                 bundle.components = bundle._process_components(full_components)
+                bundle._index_components()
 
                 # Recalculate price
-                bundle.price = bundle.calculate_bundle_price(bundle.components)
+                cls.price_cache.pop(bundle_id, None)
+                bundle.get_price()
 
                 print(f"Bundle {bundle_id} updated successfully")
                 bundle.display_bundle_details()
@@ -1787,6 +2413,9 @@ class Bundle(Product):
             confirm = input("\nAre you sure you want to remove this bundle? (y/n): ").lower()
             if confirm == 'y':
                 del cls.available_bundles[bundle_id]
+                bundle._unindex_components()
+                cls.name_index.pop(normalise_name(bundle.get_name()), None)
+                cls.price_cache.pop(bundle_id, None)
                 print(f"\nBundle {bundle_id} removed successfully")
                 return True
             else:
@@ -1797,22 +2426,13 @@ class Bundle(Product):
             print(f"Error removing bundle: {e}")
             return False
     @staticmethod
-    def calculate_bundle_price(components):
-        """Calculate bundle price as 80% of total component prices"""
+    def calculate_bundle_price(components, discount_rate=0.8):
+        """Calculate bundle price as 80% (the discount rate) of total component prices"""
         try:
             total_price = 0
-            print("Detailed Available Apartments:")
-            for apt_id, apt_obj in apartment.availaible_apartments.items():
-                print(f"Apartment ID: {apt_id}, Price: {apt_obj.get_price()}")
-
-            print("Detailed Available Supplementary Items:")
-            for si_id, si_obj in supplementary_items.available_supplementary_items.items():
-                print(f"Supplementary Item ID: {si_id}, Price: {si_obj.get_price()}")
-
             for component_id, quantity in components.items():
                 try:
                     if component_id.startswith('U'):
-                        print(f"Checking apartment_id '{component_id}' in availaible_apartments.")
                         if component_id not in apartment.availaible_apartments:
                             raise ValueError(f"Apartment {component_id} not found")
                         price = apartment.availaible_apartments[component_id].get_price()
@@ -1825,8 +2445,6 @@ class Bundle(Product):
                     else:
                         raise ValueError(f"Invalid component ID: {component_id}")
 
-                    # Debugging output to trace calculation
-                    print(f"Adding component {component_id}: price {price}, quantity {quantity}")
                     total_price += price * quantity
 
                 except KeyError as e:
@@ -1834,9 +2452,7 @@ class Bundle(Product):
                 except Exception as e:
                     raise ValueError(f"Error processing component {component_id}: {e}")
 
-            final_price = total_price * 0.8
-            print(f"Total price before discount: {total_price}, after 20% discount: {final_price}")
-            return final_price
+            return total_price * discount_rate
 
         except Exception as e:
             raise ValueError(f"Error calculating bundle price: {e}")
@@ -1873,8 +2489,12 @@ class Bundle(Product):
         Create bundle from CSV line
         Format: B1, Bed and breakfast for two, U12swan, SI2, SI2, SI1, 220.48
         """
+        return cls.from_csv_parts([part.strip() for part in line.split(',')])
+
+    @classmethod
+    def from_csv_parts(cls, parts):
+        """Create bundle from an already split CSV row"""
         try:
-            parts = [part.strip() for part in line.split(',')]
             if len(parts) < 4:  # Need at least ID, name, apartment, one component
                 raise ValueError("Invalid bundle format")
 
@@ -1897,9 +2517,12 @@ class Bundle(Product):
     def load_bundles(cls, filename="products.csv"):
         """Load bundles from CSV file"""
         try:
+            cls.clear_indexes()
             cls.available_bundles = {}
+            # Fold pending catalogue edits into the file before reading it
+            CatalogueDelta.compact(filename, background=False)
             if not os.path.exists(filename):
-                print(f"Warning: {filename} not found. Starting with empty bundle items list.")
+                log.warning(f"Warning: {filename} not found. Starting with empty bundle items list.")
                 return
 
             with open(filename, 'r') as file:
@@ -1911,15 +2534,15 @@ class Bundle(Product):
                             if bundle:
                                 cls.available_bundles[bundle.get_id()] = bundle
                         except Exception as e:
-                            print(f"Error loading bundle at line {line_number}: {e}")
+                            log.warning(f"Error loading bundle at line {line_number}: {e}")
 
             bundle_count = len(cls.available_bundles)
-            print(f"Successfully loaded {bundle_count} bundles")
+            log.info(f"Successfully loaded {bundle_count} bundles")
             if bundle_count == 0:
-                print("Warning: No valid bundles were loaded")
+                log.warning("Warning: No valid bundles were loaded")
 
         except Exception as e:
-            print(f"Error loading bundles: {e}")
+            log.error(f"Error loading bundles: {e}")
             cls.available_bundles = {}
 
     @classmethod
@@ -1930,12 +2553,8 @@ class Bundle(Product):
             if search_value in cls.available_bundles:
                 return cls.available_bundles[search_value]
             
-            # Name lookup
-            for bundle in cls.available_bundles.values():
-                if search_value.lower() == bundle.get_name().lower():
-                    return bundle
-            
-            return None
+            # Name lookup through the name index
+            return cls.available_bundles.get(cls.name_index.get(normalise_name(search_value)))
             
         except Exception as e:
             print(f"Error finding bundle: {e}")
@@ -2023,6 +2642,18 @@ class Bundle(Product):
             raise BundleError(f"Bundle booking validation failed: {e}")
     
     
+    @classmethod
+    def defer_bundle_orders(cls, filename="orders.csv"):
+        """Load the bundle booking history from filename the first time it is needed"""
+        cls.pending_orders_file = filename
+
+    @classmethod
+    def ensure_bundle_orders_loaded(cls):
+        """Load a deferred bundle booking history, once"""
+        filename, cls.pending_orders_file = cls.pending_orders_file, None
+        if filename is not None:
+            cls.load_bundle_orders(filename)
+
     @classmethod
     def load_bundle_orders(cls, filename="orders.csv"):
         """
@@ -2036,43 +2667,52 @@ class Bundle(Product):
         """
         try:
             if not os.path.exists(filename):
-                print(f"Note: {filename} not found. Starting with empty booking history.")
+                log.info(f"Note: {filename} not found. Starting with empty booking history.")
                 return False
                 
             cls.bundle_bookings.clear()  # Reset booking history
             
-            with open(filename, 'r') as file:
-                reader = csv.reader(file)
-                for row in reader:
-                    try:
-                        # Parse row data
+            for _, kind, _, row in OrderRows.read(filename):
+                try:
+                    # Parse row data
+                    if kind == 'order':
+                        # Rows written by Booking.save_to_csv
+                        guest_id = row[1]
+                        products = row[6:-2]
+                        total_cost = float(row[-2])
+                        reward_points = int(row[-1])
+                        booking_date = row[0]
+                    elif kind == 'bundle':
+                        # Rows written by save_bundle_order
                         guest_id = row[0]
                         products = row[1:-3]  # Products are between guest_id and total_cost
                         total_cost = float(row[-3])
                         reward_points = int(row[-2])
                         booking_date = row[-1]
-                        
-                        # Look for bundle bookings
-                        for product in products:
-                            if product.strip().split(' x ')[1].startswith('B'):  # Bundle booking
-                                bundle_id = product.strip().split(' x ')[1]
-                                booking_info = {
-                                    'guest_id': guest_id,
-                                    'booking_date': booking_date,
-                                    'total_cost': total_cost,
-                                    'reward_points': reward_points
-                                }
-                                cls.bundle_bookings[bundle_id].append(booking_info)
-                                
-                    except Exception as e:
-                        print(f"Error processing order row: {e}")
-                        continue
-                        
-            print(f"Successfully loaded bundle booking history from {filename}")
+                    else:
+                        continue  # Not a bundle order row
+                    
+                    # Look for bundle bookings
+                    for product in products:
+                        bundle_id = product.strip().split(' x ')[1]
+                        if bundle_id.startswith('B'):  # Bundle booking
+                            booking_info = {
+                                'guest_id': guest_id,
+                                'booking_date': booking_date,
+                                'total_cost': total_cost,
+                                'reward_points': reward_points
+                            }
+                            cls.bundle_bookings[bundle_id].append(booking_info)
+                            
+                except Exception as e:
+                    log.warning(f"Error processing order row: {e}")
+                    continue
+                    
+            log.info(f"Successfully loaded bundle booking history from {filename}")
             return True
             
         except Exception as e:
-            print(f"Error loading bundle orders: {e}")
+            log.error(f"Error loading bundle orders: {e}")
             return False
 
     def save_bundle_order(self, booking, filename="orders.csv"):
@@ -2084,56 +2724,70 @@ class Bundle(Product):
             filename (str): Name of the orders file
         """
         try:
-            mode = 'a' if os.path.exists(filename) else 'w'
-            with open(filename, mode, newline='') as file:
-                writer = csv.writer(file)
-                
-                # Format row data
-                row = [
-                    booking.guest_id,
-                    f"1 x {self.get_id()}",  # Bundle booking
-                    f"{booking.get_total_cost():.2f}",
-                    str(booking.reward_points),
-                    booking.current_booking_date
-                ]
-                
-                writer.writerow(row)
-                print(f"Bundle booking saved to {filename}")
+            # Loading the history later would drop this booking from it
+            self.ensure_bundle_orders_loaded()
+            guest_id = getattr(booking.guest, 'guest_id', booking.guest)
+            # Format row data; the cost is the amount paid, as in Booking.to_order_row
+            row = [
+                guest_id,
+                f"1 x {self.get_id()}",  # Bundle booking
+                f"{booking.get_final_cost():.2f}",
+                str(booking.reward_points),
+                booking.current_booking_date
+            ]
+
+            if Booking.use_order_journal:
+                # Appending to orders.csv itself could race a journal compaction
+                if not OrderJournal.append(row, filename):
+                    return
+            else:
+                mode = 'a' if os.path.exists(filename) else 'w'
+                with open(filename, mode, newline='') as file:
+                    csv.writer(file).writerow(row)
+            log.info(f"Bundle booking saved to {filename}")
                 
             # Update statistics
             booking_info = {
-                'guest_id': booking.guest_id,
+                'guest_id': guest_id,
                 'booking_date': booking.current_booking_date,
-                'total_cost': booking.get_total_cost(),
+                'total_cost': float(row[2]),
                 'reward_points': booking.reward_points
             }
             self.bundle_bookings[self.get_id()].append(booking_info)
             
         except Exception as e:
-            print(f"Error saving bundle order: {e}")
+            log.error(f"Error saving bundle order: {e}")
 
-    def get_bundle_statistics(self, start_date=None, end_date=None):
+    def get_bundle_statistics(self, start_date=None, end_date=None, store=None):
         """
         Generate statistics for this bundle
         
         Args:
-            start_date (str, optional): Start date in dd/mm/yyyy format
-            end_date (str, optional): End date in dd/mm/yyyy format
+            start_date (str or int, optional): Start date in dd/mm/yyyy format or as an ordinal
+            end_date (str or int, optional): End date in dd/mm/yyyy format or as an ordinal
+            store (ColumnarOrderStore, optional): Read the bookings from this store
+                                                  instead of the loaded bundle history
             
         Returns:
             dict: Bundle statistics
         """
         try:
-            bookings = self.bundle_bookings[self.get_id()]
+            if store is not None:
+                stats = store.product_statistics(self.get_id(), start_date, end_date)
+                stats['monthly_distribution'] = {
+                    BundleBookingHistory.month_label(month_key): count
+                    for month_key, count in stats['monthly_distribution'].items()
+                }
+                return {'bundle_id': self.get_id(), 'bundle_name': self.get_name(), **stats}
+
+            self.ensure_bundle_orders_loaded()
+            history = self.bundle_bookings[self.get_id()]
             
             # Filter by date range if provided
             if start_date and end_date:
-                start = datetime.strptime(start_date, "%d/%m/%Y")
-                end = datetime.strptime(end_date, "%d/%m/%Y")
-                bookings = [
-                    b for b in bookings 
-                    if start <= datetime.strptime(b['booking_date'], "%d/%m/%Y") <= end
-                ]
+                bookings, month_keys = history.select(start_date, end_date)
+            else:
+                bookings, month_keys = history.bookings, None
             
             if not bookings:
                 return {
@@ -2142,7 +2796,9 @@ class Bundle(Product):
                     'total_bookings': 0,
                     'total_revenue': 0,
                     'average_revenue': 0,
-                    'total_reward_points': 0
+                    'total_reward_points': 0,
+                    'unique_guests': 0,
+                    'monthly_distribution': {}
                 }
             
             # Calculate statistics
@@ -2153,11 +2809,17 @@ class Bundle(Product):
             # Get unique guests
             unique_guests = len(set(b['guest_id'] for b in bookings))
             
-            # Get monthly booking distribution
-            monthly_distribution = defaultdict(int)
-            for booking in bookings:
-                month = datetime.strptime(booking['booking_date'], "%d/%m/%Y").strftime("%B %Y")
-                monthly_distribution[month] += 1
+            # Get monthly booking distribution from the precomputed month keys
+            if month_keys is None:
+                monthly_counts = history.monthly_totals
+            else:
+                monthly_counts = defaultdict(int)
+                for month_key in month_keys:
+                    monthly_counts[month_key] += 1
+            monthly_distribution = {
+                BundleBookingHistory.month_label(month_key): count
+                for month_key, count in sorted(monthly_counts.items())
+            }
             
             return {
                 'bundle_id': self.get_id(),
@@ -2167,7 +2829,7 @@ class Bundle(Product):
                 'average_revenue': total_revenue / total_bookings,
                 'total_reward_points': total_reward_points,
                 'unique_guests': unique_guests,
-                'monthly_distribution': dict(monthly_distribution)
+                'monthly_distribution': monthly_distribution
             }
             
         except Exception as e:
@@ -2175,13 +2837,15 @@ class Bundle(Product):
             return None
 
     @classmethod
-    def generate_bundle_report(cls, start_date=None, end_date=None):
+    def generate_bundle_report(cls, start_date=None, end_date=None, orders_file=None):
         """
         Generate comprehensive report for all bundles
         
         Args:
             start_date (str, optional): Start date in dd/mm/yyyy format
             end_date (str, optional): End date in dd/mm/yyyy format
+            orders_file (str, optional): Report from the columnar store of this
+                                         file instead of the loaded bundle history
         """
         try:
             print("\nBundle Performance Report")
@@ -2191,10 +2855,16 @@ class Bundle(Product):
                 print(f"Period: {start_date} to {end_date}")
             print("-" * 80)
             
+            # Parse the period once for every bundle
+            start = to_date_ordinal(start_date) if start_date and end_date else None
+            end = to_date_ordinal(end_date) if start_date and end_date else None
+
+            store = ColumnarOrderStore.load(orders_file) if orders_file else None
+
             # Sort bundles by total revenue
             bundle_stats = []
             for bundle in cls.available_bundles.values():
-                stats = bundle.get_bundle_statistics(start_date, end_date)
+                stats = bundle.get_bundle_statistics(start, end, store)
                 if stats:
                     bundle_stats.append(stats)
             
@@ -2262,10 +2932,10 @@ class Bundle(Product):
                 
                 file.write("\n" + "=" * 80 + "\n\n")
                 
-            print(f"\nReport saved to stats.txt")
+            log.info(f"\nReport saved to stats.txt")
             
         except Exception as e:
-            print(f"Error saving bundle report: {e}")
+            log.error(f"Error saving bundle report: {e}")
             
     def create_booking_from_bundle(self, guest, check_in_date, check_out_date, number_of_guests, 
                                  current_booking_date):
@@ -2314,15 +2984,15 @@ class Bundle(Product):
             }
             
             # Handle apartment booking
-            booking.booked_apartments_for_current_booking[self.apartment_id] = {
-                'booking_date': current_booking_date,
-                'number_of_guests': number_of_guests,
-                'check_in_date': check_in_date,
-                'check_out_date': check_out_date,
-                'length_of_stay': length_of_stay,
-                'rate_per_night': apartment.availaible_apartments[self.apartment_id]['rate_per_night'],
-                'total_cost': apartment.availaible_apartments[self.apartment_id]['rate_per_night'] * length_of_stay
-            }
+            booking.booked_apartments_for_current_booking[self.apartment_id] = ApartmentLineItem(
+                booking_date=current_booking_date,
+                number_of_guests=number_of_guests,
+                check_in_date=check_in_date,
+                check_out_date=check_out_date,
+                length_of_stay=length_of_stay,
+                rate_per_night=apartment.availaible_apartments[self.apartment_id]['rate_per_night'],
+                total_cost=apartment.availaible_apartments[self.apartment_id]['rate_per_night'] * length_of_stay
+            )
             
             # Add supplementary items from bundle
             for item_id, quantity in self.components.items():
@@ -2333,11 +3003,11 @@ class Bundle(Product):
                     item_info = supplementary_items.available_supplementary_items[item_id]
                     price_per_unit = item_info['price']
                     
-                    booking.supplementary_items_for_current_booking[item_id] = {
-                        'quantity': total_quantity,
-                        'price_per_unit': price_per_unit,
-                        'total_price': price_per_unit * total_quantity
-                    }
+                    booking.supplementary_items_for_current_booking[item_id] = SupplementaryLineItem(
+                        quantity=total_quantity,
+                        price_per_unit=price_per_unit,
+                        total_price=price_per_unit * total_quantity
+                    )
             
             # Set guest ID
             booking.guest_id = guest.guest_id
@@ -2418,22 +3088,119 @@ class Bundle(Product):
 
 
 # from records import Records
+import heapq
+from collections import defaultdict
 
 
 class Guest:
+    __slots__ = ('first_name', 'last_name', 'date_of_birth', 'opening_reward_points',
+                 'reward_rate', 'redeem_rate', 'guest_id', '_booking_history',
+                 'points_used_in_transaction')
     guest_data = {}
+    # Search indexes, maintained whenever a guest registers in guest_data
+    name_index = defaultdict(set)     # normalised full name -> guest IDs
+    trigram_index = defaultdict(set)  # name trigram -> guest IDs
     
     def __init__(self, first_name, last_name, date_of_birth, reward = 0, reward_rate = 100, redeem_rate = 1):
         self.first_name = first_name
         self.last_name = last_name
         self.date_of_birth = date_of_birth
-        self.total_reward_points_earned = reward
+        self.opening_reward_points = int(reward)  # balance before any reward ledger event
         self.reward_rate = reward_rate
         self.redeem_rate = redeem_rate
         self.guest_id = self.get_guest_id()
-        self.booking_history_of_guest = {}
+        self._booking_history = None  # created when the first booking is added
         # self.supplementary_items_history = []
+        previous = Guest.guest_data.get(self.guest_id)
+        if isinstance(previous, Guest):
+            previous._unindex()
         Guest.guest_data[self.guest_id] = self
+        self._index()
+
+    @property
+    def total_reward_points_earned(self):
+        """Current reward balance, an O(1) read of the reward ledger"""
+        return RewardLedger.balance(self.guest_id, self.opening_reward_points)
+
+    @total_reward_points_earned.setter
+    def total_reward_points_earned(self, points):
+        RewardLedger.record(self, 'adjust', points - self.total_reward_points_earned)
+
+    @property
+    def booking_history_of_guest(self):
+        if self._booking_history is None:
+            self._booking_history = {}
+        return self._booking_history
+
+    def get_full_name(self):
+        return f"{self.first_name} {self.last_name}"
+
+    @staticmethod
+    def trigrams(text):
+        """Padded character trigrams of a normalised name"""
+        padded = f"  {normalise_name(text)} "
+        return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+    def _index(self):
+        """Add this guest to the name and trigram indexes"""
+        full_name = self.get_full_name()
+        Guest.name_index[normalise_name(full_name)].add(self.guest_id)
+        for trigram in self.trigrams(full_name):
+            Guest.trigram_index[trigram].add(self.guest_id)
+
+    def _unindex(self):
+        """Remove this guest from the name and trigram indexes"""
+        full_name = self.get_full_name()
+        Guest.name_index[normalise_name(full_name)].discard(self.guest_id)
+        for trigram in self.trigrams(full_name):
+            Guest.trigram_index[trigram].discard(self.guest_id)
+
+    @classmethod
+    def find(cls, search_value):
+        """
+        Find a guest by exact ID or full name (case and spacing insensitive).
+
+        Returns:
+            Guest: The matching guest, or None
+        """
+        guest = cls.guest_data.get(search_value)
+        if isinstance(guest, Guest):
+            return guest
+        for guest_id in sorted(cls.name_index.get(normalise_name(search_value), ())):
+            guest = cls.guest_data.get(guest_id)
+            if isinstance(guest, Guest):
+                return guest
+        return None
+
+    @classmethod
+    def search(cls, query, limit=5, min_score=0.5, max_postings=4):
+        """
+        Find guests whose names partially or approximately match a query.
+
+        Candidates are gathered from the `max_postings` rarest non-empty
+        trigram postings of the query, so the work is bounded by the rarest
+        trigrams rather than the size of the guest base. Candidates are then
+        ranked by the share of the query's trigrams found in their name.
+
+        Returns:
+            list: (score, Guest) pairs, best match first
+        """
+        query_grams = cls.trigrams(query)
+        all_postings = [cls.trigram_index[gram] for gram in query_grams if cls.trigram_index.get(gram)]
+        all_postings.sort(key=len)
+        postings = all_postings[:max_postings]
+
+        candidates = set().union(*postings) if postings else set()
+        scored = []
+        for guest_id in candidates:
+            # Membership tests against the postings avoid re-deriving trigrams
+            score = sum(guest_id in posting for posting in all_postings) / len(query_grams)
+            if score >= min_score:
+                guest = cls.guest_data.get(guest_id)
+                if isinstance(guest, Guest):
+                    scored.append((score, guest_id, guest))
+        best = heapq.nlargest(limit, scored, key=lambda match: (match[0], match[1]))
+        return [(score, guest) for score, _, guest in best]
         
         
     def get_guest_id(self):
@@ -2486,13 +3253,26 @@ class Guest:
         self.redeem_rate = new_rate
         print(f"Redeem rate for {self.first_name} {self.last_name} updated to {new_rate}%")
 
-    # In Guest class
-    def use_reward_points(self, points_to_use):
+    def earn_reward_points(self, points, reference=""):
+        """
+        Add points earned on a booking to the guest's balance.
+
+        Args:
+            points (int): Points earned
+            reference (str): Booking ID the points were earned on
+
+        Returns:
+            int: New points balance
+        """
+        return RewardLedger.record(self, 'earn', points, reference)
+
+    def use_reward_points(self, points_to_use, reference=""):
         """
         Deduct used reward points from guest's balance.
         
         Args:
             points_to_use (int): Number of points to deduct
+            reference (str): Booking ID the points were redeemed on
             
         Returns:
             int: Remaining points balance
@@ -2508,32 +3288,24 @@ class Guest:
             if points_to_use < 0:
                 raise ValueError("Cannot use negative points")
                 
-            if points_to_use > self.reward:
-                raise ValueError("Not enough points available")
-                
             if points_to_use % 100 != 0:
                 raise ValueError("Points must be used in multiples of 100")
             
             # Store points info for receipt
             self.points_used_in_transaction = points_to_use
             
-            # Deduct points
-            self.reward -= points_to_use
+            # Deduct points (the ledger rejects redemptions above the balance)
+            remaining = RewardLedger.record(self, 'redeem', points_to_use, reference)
             
             print(f"\nPoints Redeemed:")
             print(f"Points Used: {points_to_use}")
-            print(f"Remaining Balance: {self.reward}")
+            print(f"Remaining Balance: {remaining}")
             
-            # return self.reward
+            return remaining
             
         except Exception as e:
             print(f"Error using reward points: {e}")
             raise
-    
-    def use_reward_points(self, points):
-        if points > self.total_reward_points_earned():
-            raise ValueError("Not enough points.")
-        self.total_reward_points_earned -= points
         
     def update_reward_points(self, total_cost):
         """
@@ -2541,13 +3313,14 @@ class Guest:
         Returns the discount amount and updated reward points.
         """
         
-        if self.total_reward_points_earned < 100:
-            return 0, self.total_reward_points_earned
+        balance = self.total_reward_points_earned
+        if balance < 100:
+            return 0, balance
 
-        max_convertible_points = (self.total_reward_points_earned // 100) * 100
+        max_convertible_points = (balance // 100) * 100
         max_discount = (max_convertible_points* self.redeem_rate)/100
 
-        print(f"You have {self.total_reward_points_earned} reward points.")
+        print(f"You have {balance} reward points.")
         print(f"You can convert up to {max_convertible_points} points for a ${max_discount: .2f} discount.")
         
         while True:
@@ -2558,22 +3331,16 @@ class Guest:
                     points_to_use = int(input(f"How many points do you want to use (multiples of 100, max {max_convertible_points})? "))
                     if points_to_use % 100 == 0 and 0 <= points_to_use <= max_convertible_points:
                         discount = (points_to_use * self.redeem_rate) / 100
-                        self.total_reward_points_earned -= points_to_use
-                        return discount, self.total_reward_points_earned
+                        return discount, RewardLedger.record(self, 'redeem', points_to_use)
                     else:
                         print("Invalid input. Please enter a valid number of points.")
             elif use_points == 'n':
-                return 0, self.total_reward_points_earned
+                return 0, balance
             else:
                 print("Invalid input. Please enter 'y' or 'n'.")
     
     def get_total_reward_points_earned(self):
-        # self.total_reward_points_earned = 0
-        
-        for booking_id in self.booking_history_of_guest:
-            if booking_id in Booking.bookings:
-                self.total_reward_points_earned = self.total_reward_points_earned +  (Booking.bookings[booking_id].get_reward_points_for_this_booking())*self.reward_rate
-        # self.total_reward_points_earned = total_points_earned
+        """Current reward balance, kept by the reward ledger"""
         return self.total_reward_points_earned
   
     def add_booking_to_history(self, booking):
@@ -2756,117 +3523,7 @@ class Guest:
 # In[ ]:
 
 
-class Product:
-    def __init__(self, product_id, name, price):
-        self.product_id = product_id
-        self.name = name
-        self.price = price
-
-    def get_id(self):
-        return self.product_id
-
-    def get_name(self):
-        return self.name
-
-    def get_price(self):
-        return self.price
-    
-    # New setter methods
-    def set_id(self, new_id):
-        """
-        Set new product ID with validation
-        """
-        try:
-            if not isinstance(new_id, str):
-                raise ValueError("Product ID must be a string")
-            if not new_id:
-                raise ValueError("Product ID cannot be empty")
-            self.product_id = new_id
-            return True
-        except Exception as e:
-            print(f"Error setting product ID: {e}")
-            return False
-
-    def set_name(self, new_name):
-        """
-        Set new product name with validation
-        """
-        try:
-            if not isinstance(new_name, str):
-                raise ValueError("Product name must be a string")
-            if not new_name.strip():
-                raise ValueError("Product name cannot be empty")
-            self.name = new_name.strip()
-            return True
-        except Exception as e:
-            print(f"Error setting product name: {e}")
-            return False
-
-    def set_price(self, new_price):
-        """
-        Set new product price with validation
-        """
-        try:
-            new_price = float(new_price)  # Convert to float if string
-            if new_price < 0:
-                raise ValueError("Price cannot be negative")
-            self.price = new_price
-            return True
-        except ValueError as e:
-            print(f"Error setting price: {e}")
-            return False
-        except Exception as e:
-            print(f"Unexpected error setting price: {e}")
-            return False
-
-    def display_info(self):
-        """Base display method to be overridden by subclasses"""
-        return f"Product ID: {self._product_id}, Name: {self._name}, Price: ${self._price:.2f}"
-
-class apartment(Product):
-    def __init__(self, apartment_id: str, name: str, 
-                 rate_per_night: float, capacity: int):
-        """Initialize apartment with validation"""
-        self._validate_apartment_params(apartment_id, capacity)
-        super().__init__(apartment_id, name, rate_per_night)
-        self.capacity = capacity
-
-    def _validate_apartment_params(self, apartment_id: str, capacity: int):
-        """Validate apartment-specific parameters"""
-        if not apartment_id.startswith('U'):
-            raise ValueError("Apartment ID must start with 'U'")
-        if not isinstance(capacity, int) or not 1 <= capacity <= 4:
-            raise ValueError("Capacity must be between 1 and 4")
-
-    def get_capacity(self):
-        return self.capacity
-
-    def display_info(self):
-        return f"Apartment ID: {self.product_id}, Name: {self.name}, Rate per Night: AUD {self.price:.2f}, Capacity: {self.capacity}"
-
-class supplementary_items(Product):
-    """Supplementary item product class"""
-    
-    def __init__(self, item_id: str, name: str, 
-                 price: float, description: str):
-        """Initialize supplementary item with validation"""
-        self._validate_supplementary_params(item_id, description)
-        super().__init__(item_id, name, price)
-        self.description = description
-
-    def _validate_supplementary_params(self, item_id: str, description: str):
-        """Validate supplementary item-specific parameters"""
-        if not item_id.startswith('SI'):
-            raise ValueError("Supplementary item ID must start with 'SI'")
-        if not description or not description.strip():
-            raise ValueError("Description cannot be empty")
-
-    def get_description(self):
-        return self.description
 
-    def display_info(self):
-        return f"{self.product_id}: {self.name} - AUD {self.price:.2f} - {self.description}"
-    
 
 
 # In[ ]:
@@ -2890,18 +3547,62 @@ class Records:
         self.products = {}     # Dictionary to store all products (key: product_id)
         self.bookings = {}     # Dictionary to store bookings (key: booking_id)
         self.statistics = {}   # Dictionary to store system statistics
-        
-    def read_guests(self, filename="guests.csv"):
-        """Load guests from CSV file"""
-        try:
-            print("\nLoading Guest Data")
-            print("=" * 50)
+        # guest_id -> ([booking date ordinals], [booking IDs]), oldest booking first
+        self.guest_booking_index = {}
+        # (filename, loader) of an order history not loaded yet, see defer_orders()
+        self.pending_orders = None
+        self.loading_orders = False
+        self.orders_lock = threading.RLock()
+
+    def defer_orders(self, filename="orders.csv", loader=None):
+        """
+        Load the order history the first time it is needed instead of now.
 
-            if not os.path.exists(filename):
-                raise FileNotFoundError(f"Guest file '{filename}' not found")
+        Args:
+            filename (str): Orders file
+            loader (callable, optional): Called with the filename to load the
+                                         history; defaults to load_orders
+        """
+        self.pending_orders = (filename, loader or self.load_orders)
 
-            self.guests.clear()
-            guests_loaded = 0
+    def ensure_orders_loaded(self):
+        """
+        Load a deferred order history and its statistics, once.
+
+        Called by everything that reads the bookings, the availability index
+        or the statistics. Calls made while the history is loading return
+        straight away on the loading thread and wait on any other thread.
+
+        Returns:
+            bool: False if loading the history failed
+        """
+        if self.pending_orders is None:
+            return True
+        with self.orders_lock:
+            if self.pending_orders is None or self.loading_orders:
+                return True
+            filename, loader = self.pending_orders
+            self.loading_orders = True
+            try:
+                loaded = loader(filename)
+                # Pick up the persisted statistics if they match the orders
+                OrderStatistics.load_state(filename)
+                return loaded
+            finally:
+                self.pending_orders = None
+                self.loading_orders = False
+        
+    def read_guests(self, filename="guests.csv"):
+        """Load guests from CSV file"""
+        try:
+            log.info("\nLoading Guest Data")
+            log.info("=" * 50)
+
+            if not os.path.exists(filename):
+                raise FileNotFoundError(f"Guest file '{filename}' not found")
+
+            self.guests.clear()
+            guests_loaded = 0
             guests_skipped = 0
 
             with open(filename, 'r') as file:
@@ -2933,18 +3634,18 @@ class Records:
                         guests_loaded += 1
 
                     except Exception as e:
-                        print(f"⚠️  Warning: Error processing guest at line {row_num}: {e}")
+                        log.warning(f"⚠️  Warning: Error processing guest at line {row_num}: {e}")
                         guests_skipped += 1
                         continue
 
-            print(f"\n✅ Successfully loaded {guests_loaded} guests")
+            log.info(f"\n✅ Successfully loaded {guests_loaded} guests")
             if guests_skipped > 0:
-                print(f"⚠️  Skipped {guests_skipped} invalid entries")
+                log.warning(f"⚠️  Skipped {guests_skipped} invalid entries")
 
             return True
 
         except Exception as e:
-            print(f"❌ Error loading guests: {e}")
+            log.error(f"❌ Error loading guests: {e}")
             return False
     def validate_apartment_format(self, parts):
         """Validate apartment data format"""
@@ -2993,56 +3694,241 @@ class Records:
     
     
     def load_orders(self, filename="orders.csv"):
-        """Load orders from CSV file and initialize bookings."""
+        """
+        Load orders from CSV file and initialize bookings.
+
+        Rows written by Booking.save_to_csv, including those still in the
+        order journal, are loaded alongside the header-based rows.
+        """
         try:
-            print("\nLoading Orders Data")
-            print("=" * 50)
+            log.info("\nLoading Orders Data")
+            log.info("=" * 50)
 
-            with open(filename, 'r', encoding='utf-8') as file:
-                reader = csv.DictReader(file)
-                for row in reader:
-                    # Parsing CSV data into Booking attributes
-                    booking_id = row['booking_id']
-                    guest_id = row['guest_id']
-                    apartment_id = row['apartment_id']
-                    check_in_date = datetime.strptime(row['check_in_date'], "%Y-%m-%d")
-                    check_out_date = datetime.strptime(row['check_out_date'], "%Y-%m-%d")
-                    number_of_guests = int(row['number_of_guests'])
-                    nights = int(row['nights'])
-                    total_cost = float(row['total_cost'])
-                    reward_points_earned = int(row['reward_points_earned'])
-                    supplementary_items = row['supplementary_items'].split(", ")
-
-                    # Create a Booking instance
-                    booking = Booking(
-                        
-                        guest=guest_id,
-                        check_in_date=check_in_date,
-                        check_out_date=check_out_date,
-                        current_booking_date=datetime.now(),
-                        number_of_guests=number_of_guests,
-                        nights=nights,
-                        apartment_id=apartment_id
-                    )
-                    booking_id = booking.get_booking_id()
-                    # Set additional attributes
-                    booking.total_cost = total_cost
-                    booking.reward_points_earned = reward_points_earned
-                    booking.supplementary_items_for_current_booking = supplementary_items
+            if not os.path.exists(filename) and not os.path.exists(OrderJournal.journal_path(filename)):
+                raise FileNotFoundError(filename)
+
+            for position, kind, booking_id, values in OrderRows.read(filename):
+                if kind == 'bundle':
+                    continue
+                if kind == 'unknown':
+                    raise ValueError("orders file has no header row")
 
-                    # Store booking in the records
-                    self.bookings[booking_id] = booking
-                    print(f"✅ Loaded booking: {booking_id}")
+                if kind == 'order':
+                    values = Booking.parse_order_row(values, booking_id)
+                booking_id = self._apply_order_record(kind, values, position)
+                log.debug(f"✅ Loaded booking: {booking_id}")
 
-            print(f"\n✅ Successfully loaded {len(self.bookings)} orders.")
+            log.info(f"\n✅ Successfully loaded {len(self.bookings)} orders.")
             return True
 
         except FileNotFoundError:
-            print(f"❌ Error: '{filename}' not found.")
+            log.error(f"❌ Error: '{filename}' not found.")
+            return False
+        except Exception as e:
+            log.error(f"❌ Error loading orders: {e}")
             return False
+
+    def _apply_order_record(self, kind, data, position):
+        """
+        Build the booking of one order record and add it to the records.
+
+        load_orders and ParallelOrderLoader.load both go through here, so
+        they build the same bookings under the same IDs.
+
+        Args:
+            kind (str): 'order' (data from Booking.parse_order_row) or
+                        'legacy' (data is a dict keyed by the legacy header)
+            data: The parsed record
+            position (int): Row number in the orders file, counting from 1;
+                            names an order row without a stored booking ID
+
+        Returns:
+            str: The booking ID
+
+        Raises:
+            ValueError: If the record cannot be turned into a booking
+        """
+        if kind == 'order':
+            booking = Booking.from_parsed_order(data, f"ORD{position:06d}")
+            booking_id = booking.booking_id
+        else:
+            booking_id, booking = self.booking_from_legacy_row(data)
+
+        self.bookings[booking_id] = booking
+        self.index_guest_booking(booking_id, booking)
+        AvailabilityIndex.add_booking(booking)
+        return booking_id
+
+    @staticmethod
+    def booking_from_legacy_row(row):
+        """
+        Rebuild a booking from a header-based orders.csv row.
+
+        Returns:
+            tuple: (booking_id, Booking)
+        """
+        # Parsing CSV data into Booking attributes
+        guest_id = row['guest_id']
+        apartment_id = row['apartment_id']
+        check_in_date = datetime.strptime(row['check_in_date'], "%Y-%m-%d")
+        check_out_date = datetime.strptime(row['check_out_date'], "%Y-%m-%d")
+        number_of_guests = int(row['number_of_guests'])
+        nights = int(row['nights'])
+        total_cost = float(row['total_cost'])
+        reward_points_earned = int(row['reward_points_earned'])
+        supplementary_items = row['supplementary_items'].split(", ")
+
+        # Create a Booking instance
+        booking = Booking(
+            guest=guest_id,
+            check_in_date=check_in_date.strftime("%d/%m/%Y"),
+            check_out_date=check_out_date.strftime("%d/%m/%Y"),
+            current_booking_date=datetime.now().strftime("%d/%m/%Y %H:%M"),
+            number_of_guests=number_of_guests,
+            nights=nights,
+            apartment_id=apartment_id,
+            booking_id=row['booking_id']
+        )
+        booking_id = booking.get_booking_id()
+        # Set additional attributes
+        booking.total_cost = total_cost
+        booking.stored_total = total_cost
+        booking.reward_points_earned = reward_points_earned
+        booking.supplementary_items_for_current_booking = supplementary_items
+        return booking_id, booking
+
+    def save_booking(self, booking, filename="orders.csv"):
+        """
+        Store a confirmed booking and persist it to the orders file.
+
+        Returns:
+            bool: True if successful, False otherwise
+        """
+        previous = self.bookings.get(booking.booking_id)
+        if previous is not None:
+            self.unindex_guest_booking(booking.booking_id, previous)
+        self.bookings[booking.booking_id] = booking
+        self.index_guest_booking(booking.booking_id, booking)
+        return booking.save_to_csv(filename)
+
+    def save_bookings(self, bookings, filename="orders.csv"):
+        """
+        Store a batch of confirmed bookings with one append to the orders file.
+
+        Returns:
+            int: Number of bookings saved (0 or all of them)
+        """
+        bookings = list(bookings)
+        if not bookings:
+            return 0
+        try:
+            rows = OrderRows.header_for(filename) + [booking.to_order_row() for booking in bookings]
+            if Booking.use_order_journal:
+                if OrderJournal.append_many(rows, filename) != len(rows):
+                    return 0
+            else:
+                with open(filename, 'a', newline='') as file:
+                    csv.writer(file).writerows(rows)
         except Exception as e:
-            print(f"❌ Error loading orders: {e}")
+            log.error(f"❌ Error saving bookings: {e}")
+            return 0
+
+        for booking in bookings:
+            previous = self.bookings.get(booking.booking_id)
+            if previous is not None:
+                self.unindex_guest_booking(booking.booking_id, previous)
+            self.bookings[booking.booking_id] = booking
+            self.index_guest_booking(booking.booking_id, booking)
+        return len(bookings)
+
+    def delete_booking(self, booking_id):
+        """
+        Remove a booking from the records and its guest's booking list.
+
+        Returns:
+            bool: True if the booking was held in the records
+        """
+        self.ensure_orders_loaded()
+        booking = self.bookings.pop(booking_id, None)
+        if booking is None:
             return False
+        self.unindex_guest_booking(booking_id, booking)
+        return True
+
+    def iter_statistics_records(self, filename="orders.csv"):
+        """Stream statistics records for the whole order history"""
+        return OrderStatistics.iter_orders_file(filename)
+
+    @staticmethod
+    def booking_index_key(booking):
+        """
+        Return the (guest_id, booking date ordinal) a booking is indexed under.
+
+        Legacy bookings hold the guest ID instead of a Guest; bookings with an
+        unreadable booking date sort first.
+        """
+        guest_id = getattr(booking.guest, 'guest_id', booking.guest)
+        try:
+            ordinal = to_date_ordinal(booking.current_booking_date)
+        except ValueError:
+            ordinal = 0
+        return guest_id, ordinal
+
+    def index_guest_booking(self, booking_id, booking):
+        """Add a booking to its guest's date-ordered booking list"""
+        guest_id, ordinal = self.booking_index_key(booking)
+        ordinals, booking_ids = self.guest_booking_index.setdefault(guest_id, ([], []))
+        position = bisect.bisect_right(ordinals, ordinal)
+        ordinals.insert(position, ordinal)
+        booking_ids.insert(position, booking_id)
+
+    def unindex_guest_booking(self, booking_id, booking):
+        """Remove a booking from its guest's booking list"""
+        guest_id, ordinal = self.booking_index_key(booking)
+        entry = self.guest_booking_index.get(guest_id)
+        if entry is None:
+            return False
+        ordinals, booking_ids = entry
+        for position in range(bisect.bisect_left(ordinals, ordinal), bisect.bisect_right(ordinals, ordinal)):
+            if booking_ids[position] == booking_id:
+                del ordinals[position]
+                del booking_ids[position]
+                return True
+        return False
+
+    def count_guest_bookings(self, guest_id):
+        """Number of bookings made by a guest"""
+        self.ensure_orders_loaded()
+        entry = self.guest_booking_index.get(guest_id)
+        return len(entry[1]) if entry else 0
+
+    def get_guest_booking_ids(self, guest_id, page=None, page_size=20):
+        """
+        Return a guest's booking IDs, oldest booking first.
+
+        Args:
+            guest_id (str): Guest to look up
+            page (int, optional): 1-based page to return; all bookings if omitted
+            page_size (int): Bookings per page
+
+        Returns:
+            list: Booking IDs
+        """
+        self.ensure_orders_loaded()
+        entry = self.guest_booking_index.get(guest_id)
+        if entry is None:
+            return []
+        if page is None:
+            return list(entry[1])
+        start = (max(page, 1) - 1) * page_size
+        return entry[1][start:start + page_size]
+
+    def get_guest_bookings(self, guest_id, page=None, page_size=20):
+        """Return the bookings made by a guest, oldest first, optionally one page at a time"""
+        return [self.bookings[booking_id]
+                for booking_id in self.get_guest_booking_ids(guest_id, page, page_size)
+                if booking_id in self.bookings]
+
     def validate_bundle_format(self, parts):
         """Validate bundle data format"""
         if len(parts) < 4:  # ID, name, at least one component, price
@@ -3124,7 +4010,7 @@ class Records:
                     ])
             return True
         except Exception as e:
-            print(f"❌ Error saving guests to file: {e}")
+            log.error(f"❌ Error saving guests to file: {e}")
             return False
         
    
@@ -3132,141 +4018,112 @@ class Records:
     def read_products(self, filename="products.csv"):
         """Load products from CSV file matching comma-separated format"""
         try:
-            print("\nLoading Product Data")
-            print("=" * 50)
-
             if not os.path.exists(filename):
                 raise FileNotFoundError(f"Product file '{filename}' not found")
 
-            self.products = {}
-            products_loaded = {'apartments': 0, 'items': 0, 'bundles': 0}
-            products_skipped = 0
-            bundle_lines = []
-
-            with open(filename, 'r', encoding='utf-8-sig') as file:
-                for line_num, line in enumerate(file, 1):
-                    try:
-                        # Skip empty lines
-                        line = line.strip()
-                        if not line:
-                            continue
+            self.load_catalogue(filename)
+            return len(self.products) > 0
 
-                        # Split by comma and clean up each part
-                        parts = [part.strip() for part in line.split(',')]
-                        product_id = parts[0]
+        except Exception as e:
+            log.error(f"❌ Error loading products: {str(e)}")
+            self.products = {}
+            return False
 
-                        if product_id.startswith('U'):  # Apartment
-                            # Format: U12swan,Unit 12 Swan Building,200.00,3
-                            try:
-                                if len(parts) != 4:
-                                    raise ValueError("Expected 4 fields for apartment")
-
-                                name = parts[1]
-                                rate = float(parts[2])  # Convert price string to float
-                                capacity = int(parts[3])  # Convert capacity string to int
-
-                                self.products[product_id] = apartment(
-                                    product_id,
-                                    name,
-                                    rate,
-                                    capacity
-                                )
-                                products_loaded['apartments'] += 1
-                                print(f"✅ Loaded apartment: {product_id}")
-
-                            except (ValueError, IndexError) as e:
-                                raise ValueError(f"Invalid apartment data: {str(e)}")
-
-                        elif product_id.startswith('SI'):  # Supplementary Item
-                            # Format: SI1,Car Park,25.00
-                            try:
-                                if len(parts) < 3:
-                                    raise ValueError("Expected at least 3 fields for supplementary item")
+    def load_catalogue(self, filename="products.csv", rows=None):
+        """
+        Load apartments, supplementary items and bundles in a single pass.
 
-                                name = parts[1]
-                                price = float(parts[2])
-                                description = parts[3] if len(parts) > 3 else ""
+        products.csv is read once and every row is dispatched by its ID
+        prefix into apartment.availaible_apartments,
+        supplementary_items.available_supplementary_items and
+        Bundle.available_bundles (and self.products). Bundle rows are
+        resolved after the pass so their components are always loaded first.
 
-                                self.products[product_id] = supplementary_items(
-                                    product_id,
-                                    name,
-                                    price,
-                                    description
-                                )
-                                products_loaded['items'] += 1
-                                print(f"✅ Loaded supplementary item: {product_id}")
+        Args:
+            filename (str): Name of the products file
+            rows (list, optional): Catalogue rows to load instead of reading the file
 
-                            except (ValueError, IndexError) as e:
-                                raise ValueError(f"Invalid supplementary item data: {str(e)}")
+        Returns:
+            dict: Rows loaded per product type and rows skipped
+        """
+        log.info("\nLoading Product Data")
+        log.info("=" * 50)
 
-                        elif product_id.startswith('B'):  # Bundle
-                            bundle_lines.append(parts)  # Save for later processing
+        counts = {'apartments': 0, 'items': 0, 'bundles': 0, 'skipped': 0}
+        if rows is None:
+            if not os.path.exists(filename) and not os.path.exists(CatalogueDelta.journal_path(filename)):
+                log.warning(f"⚠️  Warning: {filename} not found")
+                return counts
+            # Pending catalogue edits are merged over the file
+            rows = CatalogueDelta.read_catalogue_rows(filename)
 
-                    except Exception as e:
-                        print(f"Warning: Error processing line {line_num}: {str(e)}")
-                        print(f"Line content: {line}")
-                        products_skipped += 1
-                        continue
-                # Print self.products to confirm apartments are loaded
-                print("Available products (before processing bundles):")
-                for prod_id, prod in self.products.items():
-                    print(f"{prod_id}: {prod}")
-                # Process bundles after all products are loaded
-                for parts in bundle_lines:
-                    try:
-                        # Format: B1,Romantic Getaway Package,U12swan,SI2,SI2,SI1,SI4,SI16,SI20
-                        if len(parts) < 4:  # Need at least: ID, name, apartment, price
-                            raise ValueError("Invalid bundle format - insufficient fields")
-
-                        bundle_id = parts[0]
-                        bundle_name = parts[1]
-                        apartment_id = parts[2]
-                        supplementary_itemss = parts[3:-1]  # Supplementary items only
-                        price = float(parts[-1])
-
-                        # Verify apartment_id format
-                        if not apartment_id.startswith('U'):
-                            raise ValueError(f"Bundle {bundle_id} requires a valid apartment ID starting with 'U'")
-
-                        # Debug print to check what's being passed
-                        print(f"Creating bundle with:")
-                        print(f"ID: {bundle_id}")
-                        print(f"Name: {bundle_name}")
-                        print(f"Apartment: {apartment_id}")
-                        print(f"Supplementary Items: {supplementary_itemss}")
-
-                        # Create bundle object
-                        bundle = Bundle(
-                            bundle_id=bundle_id,
-                            name=bundle_name, 
-                            apartment_id=apartment_id,  
-                            components=supplementary_itemss,
-                            discount_rate=0.8
-                        )
+        apartments = {}
+        items = {}
+        bundle_rows = []
 
-                        self.products[bundle_id] = bundle
-                        products_loaded['bundles'] += 1
-                        print(f"✅ Loaded bundle: {bundle_id}")
+        for line_num, parts in enumerate(rows, 1):
+            product_id = parts[0]
 
-                    except Exception as e:
-                        print(f"Warning: Error processing bundle: {str(e)}")
-                        print(f"Line content: {parts}")  # Add this to see the problematic line
-                        products_skipped += 1
-
-            # Print loading summary
-            print("\nProduct Loading Summary:")
-            print(f"✅ Apartments loaded: {products_loaded['apartments']}")
-            print(f"✅ Supplementary items loaded: {products_loaded['items']}")
-            print(f"✅ Bundles loaded: {products_loaded['bundles']}")
-            if products_skipped > 0:
-                print(f"⚠️  Skipped {products_skipped} invalid entries")
+            try:
+                if product_id.startswith('U'):
+                    # Format: U12swan,Unit 12 Swan Building,200.00,3
+                    self.validate_apartment_format(parts)
+                    apartments[product_id] = apartment(
+                        product_id, parts[1], float(parts[2]), int(parts[3]))
+                    counts['apartments'] += 1
+
+                elif product_id.startswith('SI'):
+                    # Format: SI1,Car Park,25.00,Secure underground parking space per night
+                    # Unquoted descriptions may themselves contain commas
+                    self.validate_supplementary_format(parts)
+                    name, price = parts[1], parts[2]
+                    description = ", ".join(parts[3:])
+                    items[product_id] = supplementary_items(
+                        product_id, name, float(price), description)
+                    counts['items'] += 1
+
+                elif product_id.startswith('B'):
+                    bundle_rows.append((line_num, parts))
 
-            return len(self.products) > 0
+                else:
+                    raise ValueError(f"unknown product ID prefix: {product_id}")
 
-        except Exception as e:
-            print(f"❌ Error loading products: {str(e)}")
-            self.products = {}
-            return False
+            except Exception as e:
+                log.warning(f"⚠️  Line {line_num}: {e}")
+                counts['skipped'] += 1
+
+        # Bundles price their components, so publish the catalogue first
+        apartment.availaible_apartments = apartments
+        supplementary_items.available_supplementary_items = items
+        AvailabilityIndex.invalidate_catalogue()
+
+        # Bundles from a previous load must not keep answering price and name lookups
+        Bundle.clear_indexes()
+        bundles = {}
+        for line_num, parts in bundle_rows:
+            try:
+                bundle = Bundle.from_csv_parts(parts)
+                bundles[bundle.get_id()] = bundle
+                counts['bundles'] += 1
+            except Exception as e:
+                log.warning(f"⚠️  Line {line_num}: {e}")
+                counts['skipped'] += 1
+        Bundle.available_bundles = bundles
+
+        self.products = {}
+        self.products.update(apartments)
+        self.products.update(items)
+        self.products.update(bundles)
+
+        # Print loading summary
+        log.info("\nProduct Loading Summary:")
+        log.info(f"✅ Apartments loaded: {counts['apartments']}")
+        log.info(f"✅ Supplementary items loaded: {counts['items']}")
+        log.info(f"✅ Bundles loaded: {counts['bundles']}")
+        if counts['skipped'] > 0:
+            log.warning(f"⚠️  Skipped {counts['skipped']} invalid entries")
+
+        return counts
         
     def find_guest(self, search_value):
         """Find guest by ID or name"""
@@ -3275,10 +4132,10 @@ class Records:
             if search_value in self.guests:
                 return self.guests[search_value]
             
-            # Name lookup
-            for guest in self.guests.values():
-                if search_value.lower() == guest.name.lower():
-                    return guest
+            # Name lookup through the guest name index
+            guest = Guest.find(search_value)
+            if guest and guest.get_guest_id() in self.guests:
+                return guest
             
             return None
             
@@ -3304,33 +4161,27 @@ class Records:
             print(f"❌ Error finding product: {e}")
             return None
 
-    def generate_statistics(self):
-        """Generate key business statistics"""
+    def generate_statistics(self, top_k=3, orders_file=None):
+        """
+        Generate key business statistics
+
+        Args:
+            top_k (int): Number of guests and products to report
+            orders_file (str, optional): Aggregate the columnar store of this
+                                         file instead of the loaded bookings
+        """
         try:
             print("\nGenerating Business Statistics")
             print("=" * 50)
-            
-            # Calculate guest statistics
-            guest_totals = defaultdict(float)
-            for booking in self.bookings.values():
-                guest_id = booking.guest.guest_id
-                guest_totals[guest_id] += booking.get_total_cost()
-
-            # Calculate product statistics
-            product_quantities = defaultdict(int)
-            for booking in self.bookings.values():
-                if hasattr(booking, 'bundle_info'):
-                    bundle_id = booking.bundle_info['bundle_id']
-                    product_quantities[bundle_id] += 1
-                else:
-                    for apt_id in booking.booked_apartments_for_current_booking:
-                        product_quantities[apt_id] += booking.length_of_stay
-                    for item_id, item_info in booking.supplementary_items_for_current_booking.items():
-                        product_quantities[item_id] += item_info['quantity']
 
-            # Get top guests and products
-            top_guests = sorted(guest_totals.items(), key=lambda x: x[1], reverse=True)[:3]
-            top_products = sorted(product_quantities.items(), key=lambda x: x[1], reverse=True)[:3]
+            if orders_file:
+                stats = ColumnarOrderStore.load(orders_file).summarise(top_k)
+            else:
+                self.ensure_orders_loaded()
+                # Live totals are kept up to date as bookings are confirmed
+                stats = OrderStatistics.report(top_k, self.iter_statistics_records)
+            top_guests = stats['top_guests']
+            top_products = stats['top_products']
 
             # Save statistics
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
@@ -3338,15 +4189,15 @@ class Records:
                 f.write("Pythonia Service Apartments - Business Statistics\n")
                 f.write("=" * 50 + "\n\n")
                 
-                f.write("Top 3 Most Valuable Guests:\n")
+                f.write(f"Top {top_k} Most Valuable Guests:\n")
                 f.write("-" * 30 + "\n")
                 for guest_id, total in top_guests:
                     guest = self.guests.get(guest_id)
                     if guest:
-                        f.write(f"{guest.name}: ${total:.2f}\n")
+                        f.write(f"{guest.first_name} {guest.last_name}: ${total:.2f}\n")
                 f.write("\n")
                 
-                f.write("Top 3 Most Popular Products:\n")
+                f.write(f"Top {top_k} Most Popular Products:\n")
                 f.write("-" * 30 + "\n")
                 for product_id, quantity in top_products:
                     product = self.products.get(product_id)
@@ -3365,23 +4216,39 @@ class Records:
             print(f"❌ Error generating statistics: {e}")
             return False
 
-    def display_guest_order_history(self, guest_id):
-        """Display order history for a specific guest"""
+    def display_guest_order_history(self, guest_id, orders_file=None, page=None, page_size=20):
+        """
+        Display order history for a specific guest
+
+        Args:
+            guest_id (str): Guest to display
+            orders_file (str, optional): Read the history from the columnar store
+                                         of this file instead of the loaded bookings
+            page (int, optional): 1-based page of bookings to show; all if omitted
+            page_size (int): Bookings per page
+        """
         try:
             guest = self.find_guest(guest_id)
             if not guest:
                 print(f"❌ Guest not found: {guest_id}")
                 return False
 
-            guest_bookings = [b for b in self.bookings.values() if b.guest.guest_id == guest_id]
+            if orders_file:
+                return self.display_guest_order_summary(guest, ColumnarOrderStore.load(orders_file))
+
+            guest_bookings = self.get_guest_bookings(guest.guest_id, page, page_size)
             if not guest_bookings:
-                print(f"ℹ️  No bookings found for {guest.name}")
+                print(f"ℹ️  No bookings found for {guest.get_full_name()}")
                 return True
 
-            print(f"\nOrder History for {guest.name}")
+            print(f"\nOrder History for {guest.get_full_name()}")
+            if page is not None:
+                total = self.count_guest_bookings(guest.guest_id)
+                pages = (total + page_size - 1) // page_size
+                print(f"Page {page} of {pages} ({total} bookings)")
             print("=" * 80)
             
-            for booking in sorted(guest_bookings, key=lambda b: b.current_booking_date):
+            for booking in guest_bookings:
                 print(f"\nBooking ID: {booking.booking_id}")
                 print(f"Date: {booking.current_booking_date}")
                 print(f"Check-in: {booking.check_in_date}")
@@ -3406,6 +4273,65 @@ class Records:
             print(f"❌ Error displaying order history: {e}")
             return False
 
+    def display_guest_order_summary(self, guest, store):
+        """
+        Display a guest's orders straight from a columnar order store.
+
+        Args:
+            guest (Guest): Guest to display
+            store (ColumnarOrderStore): Order columns to read from
+
+        Returns:
+            bool: True if successful
+        """
+        positions = store.guest_orders(guest.guest_id)
+        if not positions:
+            print(f"ℹ️  No bookings found for {guest.get_full_name()}")
+            return True
+
+        print(f"\nOrder History for {guest.get_full_name()}")
+        print("=" * 80)
+        print(f"{'Booked':<12} {'Check-in':<12} {'Products Ordered':<32} {'Total Cost':<12} {'Points':<8}")
+        print("-" * 80)
+        for position in positions:
+            products = ", ".join(f"{quantity} x {product_id}"
+                                 for product_id, quantity in store.order_products(position))
+            if len(products) > 30:
+                products = products[:27] + "..."
+            booked_on = date.fromordinal(store.booked_on[position]).strftime("%d/%m/%Y")
+            check_in = date.fromordinal(store.check_in[position]).strftime("%d/%m/%Y")
+            print(f"{booked_on:<12} {check_in:<12} {products:<32} "
+                  f"${store.total_cost[position]:<11.2f} {store.reward_points[position]:<8}")
+        print("-" * 80)
+        print(f"Orders: {len(positions)}  "
+              f"Total spend: ${sum(store.total_cost[position] for position in positions):.2f}")
+        return True
+
+    def display_monthly_revenue(self, orders_file="orders.csv", start_date=None, end_date=None):
+        """
+        Display revenue per check-in month from the columnar order store.
+
+        Args:
+            orders_file (str): Orders file to report on
+            start_date (str, optional): First check-in date in dd/mm/yyyy format
+            end_date (str, optional): Last check-in date in dd/mm/yyyy format
+
+        Returns:
+            dict: {month key: revenue}, or None on error
+        """
+        try:
+            revenue = ColumnarOrderStore.load(orders_file).monthly_revenue(start_date, end_date)
+            print("\nMonthly Revenue")
+            print("=" * 40)
+            for month_key, total in revenue.items():
+                print(f"{BundleBookingHistory.month_label(month_key):<20} ${total:>12,.2f}")
+            print("-" * 40)
+            print(f"{'Total':<20} ${sum(revenue.values()):>12,.2f}")
+            return revenue
+        except Exception as e:
+            print(f"❌ Error generating monthly revenue: {e}")
+            return None
+
 
 # In[ ]:
 
@@ -3417,7 +4343,7 @@ class Records:
 
 
 class supplementary_items(Product):
-    
+    __slots__ = ('description',)
     
     available_supplementary_items = {}
     
@@ -3611,6 +4537,7 @@ class supplementary_items(Product):
                                 continue
                             existing_item.price = new_price
                             print(f"✅ Price updated successfully to ${new_price:.2f}")
+                            Bundle.reprice_bundles_for(item_id)
                     except ValueError:
                         print("❌ Error: Invalid price format")
                         continue
@@ -3677,9 +4604,13 @@ class supplementary_items(Product):
                         print(f"❌ Error adding item: {str(e)}")
                         continue
 
+                else:
+                    print("❌ Error: Invalid option, please choose 1-3")
+                    continue
+
                 # Try to save changes to file
                 try:
-                    cls.save_supplementary_items_to_csv()
+                    cls.save_supplementary_items_to_csv(changed_ids=[item_id])
                     print("\n✅ Changes saved to file successfully")
                 except Exception as e:
                     print(f"\n⚠️  Warning: Changes made but couldn't be saved to file")
@@ -3738,7 +4669,7 @@ class supplementary_items(Product):
             
             # Save changes
             try:
-                cls.save_supplementary_items_to_csv()
+                cls.save_supplementary_items_to_csv(changed_ids=[item_id])
                 print(f"\n✅ Item {item_id} removed successfully")
                 print("✅ Changes saved to file")
             except Exception as e:
@@ -3755,25 +4686,43 @@ class supplementary_items(Product):
             return False
         
     @classmethod
-    def save_supplementary_items_to_csv(cls, filename="products.csv"):
-        """Save supplementary items to CSV with enhanced messages"""
+    def save_supplementary_items_to_csv(cls, filename="products.csv", changed_ids=None):
+        """
+        Save supplementary items to CSV with enhanced messages.
+
+        When changed_ids is given only those items are written, as records
+        in the catalogue delta, instead of rewriting products.csv.
+        """
         try:
-            print("\nSaving Supplementary Items")
-            print("=" * 50)
+            log.info("\nSaving Supplementary Items")
+            log.info("=" * 50)
+
+            if changed_ids is not None:
+                saved = CatalogueDelta.record_changes(
+                    cls.available_supplementary_items, changed_ids,
+                    lambda item: [item.get_id(), item.get_name(), f"{item.get_price():.2f}", item.get_description()],
+                    filename)
+                if not saved and changed_ids:
+                    return False
+                log.info(f"✅ Saved {saved} item change(s) to {CatalogueDelta.journal_path(filename)}")
+                return True
+
+            # A full rewrite starts from the catalogue with pending edits applied
+            CatalogueDelta.compact(filename, background=False)
             
             # Read existing non-supplementary entries
             non_supplementary_entries = []
             try:
                 if os.path.exists(filename):
-                    print("ℹ️  Reading existing file...")
+                    log.info("ℹ️  Reading existing file...")
                     with open(filename, 'r') as file:
                         for line in file:
                             line = line.strip()
                             if line and not line.startswith('SI'):
                                 non_supplementary_entries.append(line)
-                    print(f"✅ Found {len(non_supplementary_entries)} non-supplementary entries")
+                    log.info(f"✅ Found {len(non_supplementary_entries)} non-supplementary entries")
             except Exception as e:
-                print(f"⚠️  Warning: Could not read existing file - {str(e)}")
+                log.warning(f"⚠️  Warning: Could not read existing file - {str(e)}")
 
             # Create backup
             if os.path.exists(filename):
@@ -3781,12 +4730,12 @@ class supplementary_items(Product):
                 try:
                     import shutil
                     shutil.copy2(filename, backup_name)
-                    print(f"✅ Backup created: {backup_name}")
+                    log.info(f"✅ Backup created: {backup_name}")
                 except Exception as e:
-                    print(f"⚠️  Warning: Could not create backup - {str(e)}")
+                    log.warning(f"⚠️  Warning: Could not create backup - {str(e)}")
 
             # Write to file
-            print("\nℹ️  Saving changes...")
+            log.info("\nℹ️  Saving changes...")
             with open(filename, 'w') as file:
                 # Write non-supplementary entries
                 for entry in non_supplementary_entries:
@@ -3800,37 +4749,40 @@ class supplementary_items(Product):
                                  f"{item_info.get_price()}, {item_info.get_description()}\n")
                         items_saved += 1
 
-            print("\nSave Summary:")
-            print("-" * 50)
-            print(f"✅ Supplementary items saved: {items_saved}")
-            print(f"✅ Other entries preserved: {len(non_supplementary_entries)}")
-            print(f"✅ Total lines written: {items_saved + len(non_supplementary_entries)}")
-            print(f"✅ File saved successfully: {filename}")
+            log.info("\nSave Summary:")
+            log.info("-" * 50)
+            log.info(f"✅ Supplementary items saved: {items_saved}")
+            log.info(f"✅ Other entries preserved: {len(non_supplementary_entries)}")
+            log.info(f"✅ Total lines written: {items_saved + len(non_supplementary_entries)}")
+            log.info(f"✅ File saved successfully: {filename}")
             
             return True
 
         except Exception as e:
-            print(f"\n❌ Error saving to file: {str(e)}")
+            log.error(f"\n❌ Error saving to file: {str(e)}")
             if os.path.exists(f"{filename}.bak"):
-                print("ℹ️  Attempting to restore from backup...")
+                log.info("ℹ️  Attempting to restore from backup...")
                 try:
                     import shutil
                     shutil.copy2(f"{filename}.bak", filename)
-                    print("✅ Backup restored successfully")
+                    log.info("✅ Backup restored successfully")
                 except Exception as backup_error:
-                    print(f"❌ Error restoring backup: {str(backup_error)}")
+                    log.error(f"❌ Error restoring backup: {str(backup_error)}")
             return False
     
     @classmethod
     def load_supplementary_items_from_csv(cls, filename="products.csv"):
         """Load supplementary items from CSV with enhanced messages"""
         try:
-            print("\nLoading Supplementary Items")
-            print("=" * 50)
+            log.info("\nLoading Supplementary Items")
+            log.info("=" * 50)
+
+            # Fold pending catalogue edits into the file before reading it
+            CatalogueDelta.compact(filename, background=False)
             
             if not os.path.exists(filename):
-                print(f"⚠️  Warning: {filename} not found")
-                print("Starting with empty supplementary items list")
+                log.warning(f"⚠️  Warning: {filename} not found")
+                log.info("Starting with empty supplementary items list")
                 cls.available_supplementary_items = {}
                 return False
 
@@ -3839,7 +4791,7 @@ class supplementary_items(Product):
             items_processed = 0
             items_skipped = 0
             
-            print(f"\nReading from {filename}...")
+            log.info(f"\nReading from {filename}...")
             with open(filename, 'r') as file:
                 for line_number, line in enumerate(file, 1):
                     try:
@@ -3847,7 +4799,7 @@ class supplementary_items(Product):
                         
                         if parts[0].startswith('SI'):
                             if len(parts) < 3:
-                                print(f"⚠️  Line {line_number}: Invalid format - skipping")
+                                log.warning(f"⚠️  Line {line_number}: Invalid format - skipping")
                                 items_skipped += 1
                                 continue
                                 
@@ -3857,11 +4809,11 @@ class supplementary_items(Product):
                             try:
                                 price = float(rate)
                                 if price < 0:
-                                    print(f"⚠️  Line {line_number}: Negative price - skipping")
+                                    log.warning(f"⚠️  Line {line_number}: Negative price - skipping")
                                     items_skipped += 1
                                     continue
                             except ValueError:
-                                print(f"⚠️  Line {line_number}: Invalid price format - skipping")
+                                log.warning(f"⚠️  Line {line_number}: Invalid price format - skipping")
                                 items_skipped += 1
                                 continue
                             
@@ -3874,32 +4826,36 @@ class supplementary_items(Product):
                                     item_id, name, price, description)
                                 items_processed += 1
                             else:
-                                print(f"⚠️  Line {line_number}: {error_message} - skipping")
+                                log.warning(f"⚠️  Line {line_number}: {error_message} - skipping")
                                 items_skipped += 1
                                 
                     except Exception as e:
-                        print(f"⚠️  Line {line_number}: Error processing line - {str(e)}")
+                        log.warning(f"⚠️  Line {line_number}: Error processing line - {str(e)}")
                         items_skipped += 1
                         continue
 
+            # Item prices may have changed, so bundles recalculate on next use
+            Bundle.price_cache.clear()
+
             # Summary
-            print("\nLoad Summary:")
-            print("-" * 50)
-            print(f"✅ Successfully loaded: {items_processed} items")
+            log.info("\nLoad Summary:")
+            log.info("-" * 50)
+            log.info(f"✅ Successfully loaded: {items_processed} items")
             if items_skipped > 0:
-                print(f"⚠️  Items skipped: {items_skipped}")
+                log.warning(f"⚠️  Items skipped: {items_skipped}")
             
             if items_processed > 0:
-                print("\nLoaded Items:")
-                cls.display_supplementary_items_list()
+                if log.isEnabledFor(logging.DEBUG):
+                    log.debug("\nLoaded Items:")
+                    cls.display_supplementary_items_list()
             else:
-                print("\nℹ️  No valid items were loaded")
+                log.info("\nℹ️  No valid items were loaded")
             
             return True
                 
         except Exception as e:
-            print(f"\n❌ Error loading supplementary items: {str(e)}")
-            print("Starting with empty supplementary items list")
+            log.error(f"\n❌ Error loading supplementary items: {str(e)}")
+            log.info("Starting with empty supplementary items list")
             cls.available_supplementary_items = {}
             return False
 
@@ -3930,58 +4886,3913 @@ class supplementary_items(Product):
             print(f"\n❌ Error displaying items: {str(e)}")
 
 
-    
-    def __str__(self):
-        return f"{self.get_id()}: {self.get_name()} - AUD {self.get_price():.2f} - {self.get_description()}"
+    
+    def __str__(self):
+        return f"{self.get_id()}: {self.get_name()} - AUD {self.get_price():.2f} - {self.get_description()}"
+
+    def display_info(self):
+        """Display item information with enhanced formatting"""
+        try:
+            return f"""
+Item Details:
+{'-' * 50}
+ID:          {self.get_id()}
+Name:        {self.get_name()}
+Price:       ${self.get_price():.2f}
+Description: {self.get_description()}
+{'-' * 50}"""
+        except Exception as e:
+            return f"❌ Error displaying item information: {str(e)}"
+
+supplementary_items.available_supplementary_items = { 
+    'SI1': supplementary_items('SI1', 'Car Park', 25.00, 'Secure underground parking space per night'),
+    'SI2': supplementary_items('SI2', 'Breakfast', 25.30, 'Continental breakfast with coffee/tea'),
+    'SI3': supplementary_items('SI3', 'Tooth Brush Kit', 10.00, 'Premium toothbrush with travel-size toothpaste'),
+    'SI4': supplementary_items('SI4', 'Bath Amenities Set', 15.50, 'Shampoo, conditioner, and body wash set'),
+    'SI5': supplementary_items('SI5', 'Extra Towel Set', 12.00, 'Set of bath, hand, and face towels'),
+    'SI6': supplementary_items('SI6', 'Double Extra Bed', 50.00, 'Comfortable double-size extra bed'),
+    'SI7': supplementary_items('SI7', 'Single Extra Bed', 35.00, 'Comfortable single-size extra bed'),
+    'SI8': supplementary_items('SI8', 'High Chair', 15.00, 'Child high chair for dining'),
+    'SI9': supplementary_items('SI9', 'Baby Cot', 30.00, 'Baby cot with bedding'),
+    'SI10': supplementary_items('SI10', 'WiFi Premium', 15.00, 'High-speed premium internet access per day'),
+    'SI11': supplementary_items('SI11', 'Late Check-out', 45.00, 'Extended check-out until 2 PM'),
+    'SI12': supplementary_items('SI12', 'Early Check-in', 45.00, 'Early check-in from 10 AM'),
+    'SI13': supplementary_items('SI13', 'Airport Transfer', 80.00, 'One-way airport transfer service'),
+    'SI14': supplementary_items('SI14', 'Laundry Service', 35.00, 'Per load of laundry washing and drying'),
+    'SI15': supplementary_items('SI15', 'Room Service', 20.00, 'In-room dining service charge'),
+    'SI16': supplementary_items('SI16', 'Mini Bar Package', 40.00, 'Selection of snacks and beverages'),
+    'SI17': supplementary_items('SI17', 'Dinner Package', 45.00, 'Set dinner menu with dessert'),
+    'SI18': supplementary_items('SI18', 'Business Kit', 25.00, 'Printing and office supplies package'),
+    'SI19': supplementary_items('SI19', 'Gym Access', 15.00, 'Daily access to fitness center'),
+    'SI20': supplementary_items('SI20', 'Spa Package', 120.00, '60-minute massage treatment')
+}  
+
+
+# In[ ]:
+
+
+
+
+
+# In[ ]:
+
+
+
+
+
+# In[ ]:
+
+
+import bisect
+from datetime import date, datetime
+
+
+def to_date_ordinal(value):
+    """
+    Convert a stay or booking date to a proleptic Gregorian ordinal.
+
+    Accepts date/datetime objects, ordinals, and the string formats used
+    across the system: 'dd/mm/yyyy', 'dd/mm/yyyy HH:MM' and 'yyyy-mm-dd'.
+
+    Raises:
+        ValueError: If the value is not a recognised date
+    """
+    if isinstance(value, date):
+        return value.toordinal()
+    if isinstance(value, int):
+        return value
+
+    text = str(value).strip()
+    try:
+        if len(text) >= 10 and text[2] == '/' and text[5] == '/':
+            return date(int(text[6:10]), int(text[3:5]), int(text[:2])).toordinal()
+        if len(text) >= 10 and text[4] == '-' and text[7] == '-':
+            return date(int(text[:4]), int(text[5:7]), int(text[8:10])).toordinal()
+    except ValueError:
+        pass
+    raise ValueError(f"Invalid date: {value!r}")
+
+
+class AvailabilityIndex:
+    """
+    Per-apartment index of booked stays.
+
+    Each apartment ID maps to a list of (check_in, check_out, booking_id)
+    tuples sorted by check-in ordinal. Stays in the same apartment never
+    overlap, so one bisect finds the only two neighbours that could clash
+    with a requested stay and an availability query is O(log n).
+
+    For portfolio-wide searches the index also keeps a per-night occupancy
+    map (night ordinal -> set of occupied apartment IDs) and a cached list
+    of apartments sorted by price.
+
+    The index is shared by the booking engine, the service workers and the
+    order loaders, so every read and update holds `_lock`.
+    """
+
+    booked_stays = {}
+    occupied_nights = {}
+    _catalogue_by_price = None
+    _lock = threading.RLock()
+
+    @classmethod
+    def clear(cls):
+        """Remove every indexed stay"""
+        with cls._lock:
+            cls.booked_stays = {}
+            cls.occupied_nights = {}
+
+    @classmethod
+    def invalidate_catalogue(cls):
+        """Drop the cached price-sorted catalogue after apartments change"""
+        cls._catalogue_by_price = None
+
+    @classmethod
+    def get_catalogue_by_price(cls):
+        """Return (price, capacity, apartment_id) tuples sorted by price"""
+        with cls._lock:
+            if cls._catalogue_by_price is None:
+                cls._catalogue_by_price = sorted(
+                    (apt.get_price(), apt.get_capacity(), apt_id)
+                    for apt_id, apt in apartment.availaible_apartments.items()
+                )
+            return cls._catalogue_by_price
+
+    @classmethod
+    def rebuild(cls, bookings):
+        """
+        Rebuild the index from scratch.
+
+        Args:
+            bookings (iterable): Booking objects to index
+
+        Returns:
+            int: Number of bookings indexed
+        """
+        with cls._lock:
+            cls.clear()
+            indexed = 0
+            for booking in bookings:
+                if cls.add_booking(booking):
+                    indexed += 1
+            return indexed
+
+    @staticmethod
+    def _find_clash(stays, position, start, end):
+        """Return the stay overlapping [start, end) around position, if any"""
+        if position > 0 and stays[position - 1][1] > start:
+            return stays[position - 1]
+        if position < len(stays) and stays[position][0] < end:
+            return stays[position]
+        return None
+
+    @classmethod
+    def add_stay(cls, apartment_id, check_in_date, check_out_date, booking_id):
+        """
+        Index a stay for an apartment.
+
+        Args:
+            apartment_id (str): Apartment unit ID
+            check_in_date: Check-in date (see to_date_ordinal)
+            check_out_date: Check-out date (see to_date_ordinal)
+            booking_id (str): Booking occupying the apartment
+
+        Returns:
+            bool: True if indexed, False if it clashes with another booking
+        """
+        start = to_date_ordinal(check_in_date)
+        end = to_date_ordinal(check_out_date)
+        if end <= start:
+            raise ValueError("Check-out date must be after check-in date")
+
+        with cls._lock:
+            stays = cls.booked_stays.setdefault(apartment_id, [])
+            position = bisect.bisect_left(stays, (start,))
+            clash = cls._find_clash(stays, position, start, end)
+            if clash:
+                # Re-indexing the same booking is not a clash
+                return clash == (start, end, booking_id)
+
+            stays.insert(position, (start, end, booking_id))
+            for night in range(start, end):
+                cls.occupied_nights.setdefault(night, set()).add(apartment_id)
+            return True
+
+    @classmethod
+    def add_booking(cls, booking):
+        """
+        Index every apartment held by a booking.
+
+        Returns:
+            bool: True if all apartments were indexed without a clash
+        """
+        try:
+            indexed = True
+            with cls._lock:
+                for apartment_id in booking.get_booked_apartment_ids():
+                    if not cls.add_stay(apartment_id, booking.check_in_date,
+                                        booking.check_out_date, booking.booking_id):
+                        print(f"⚠️  Booking {booking.booking_id} overlaps an existing stay in {apartment_id}")
+                        indexed = False
+            return indexed
+        except Exception as e:
+            print(f"⚠️  Could not index booking {getattr(booking, 'booking_id', '?')}: {e}")
+            return False
+
+    @classmethod
+    def remove_stay(cls, apartment_id, check_in_date, check_out_date, booking_id):
+        """
+        Remove a stay from an apartment, freeing its nights.
+
+        Returns:
+            bool: True if the stay was indexed
+        """
+        start = to_date_ordinal(check_in_date)
+        end = to_date_ordinal(check_out_date)
+        with cls._lock:
+            stays = cls.booked_stays.get(apartment_id)
+            if not stays:
+                return False
+            position = bisect.bisect_left(stays, (start,))
+            if position == len(stays) or stays[position] != (start, end, booking_id):
+                return False
+            del stays[position]
+            for night in range(start, end):
+                occupied = cls.occupied_nights.get(night)
+                if occupied is not None:
+                    occupied.discard(apartment_id)
+                    if not occupied:
+                        del cls.occupied_nights[night]
+            return True
+
+    @classmethod
+    def remove_booking(cls, booking):
+        """Remove every apartment stay held by a cancelled booking"""
+        with cls._lock:
+            return all([cls.remove_stay(apartment_id, booking.check_in_date,
+                                        booking.check_out_date, booking.booking_id)
+                        for apartment_id in booking.get_booked_apartment_ids()])
+
+    @classmethod
+    def is_available(cls, apartment_id, check_in_date, check_out_date):
+        """
+        Check whether an apartment is free for the whole stay.
+
+        Check-out night is exclusive, so a stay may start on the day the
+        previous guest checks out.
+
+        Returns:
+            bool: True if no booked stay overlaps the requested nights
+        """
+        start = to_date_ordinal(check_in_date)
+        end = to_date_ordinal(check_out_date)
+        with cls._lock:
+            stays = cls.booked_stays.get(apartment_id)
+            if not stays:
+                return True
+            position = bisect.bisect_left(stays, (start,))
+            return cls._find_clash(stays, position, start, end) is None
+
+    @classmethod
+    def search_available(cls, check_in_date, check_out_date, number_of_guests=1):
+        """
+        Find every apartment that is free for a stay and can hold the guests.
+
+        An apartment can hold up to its capacity plus 4 guests, using one
+        double extra bed per 2 extra guests (see total_number_of_guest).
+
+        Args:
+            check_in_date: Check-in date (see to_date_ordinal)
+            check_out_date: Check-out date (see to_date_ordinal)
+            number_of_guests (int): Total number of guests
+
+        Returns:
+            list: Dicts with apartment_id, name, rate_per_night, capacity and
+                  extra_beds, sorted by rate per night
+        """
+        start = to_date_ordinal(check_in_date)
+        end = to_date_ordinal(check_out_date)
+        if end <= start:
+            raise ValueError("Check-out date must be after check-in date")
+
+        # Union the occupancy of each requested night once
+        occupied = set()
+        with cls._lock:
+            for night in range(start, end):
+                occupied_that_night = cls.occupied_nights.get(night)
+                if occupied_that_night:
+                    occupied |= occupied_that_night
+            catalogue = cls.get_catalogue_by_price()
+
+        results = []
+        for price, capacity, apt_id in catalogue:
+            if apt_id in occupied or number_of_guests > capacity + 4:
+                continue
+            extra_guests = max(0, number_of_guests - capacity)
+            results.append({
+                'apartment_id': apt_id,
+                'name': apartment.availaible_apartments[apt_id].get_name(),
+                'rate_per_night': price,
+                'capacity': capacity,
+                'extra_beds': (extra_guests + 1) // 2
+            })
+        return results
+
+    @classmethod
+    def display_available_apartments(cls, check_in_date, check_out_date, number_of_guests=1):
+        """Display apartments free for a stay, cheapest first"""
+        results = cls.search_available(check_in_date, check_out_date, number_of_guests)
+        print("--------------------------------------------------------------------------")
+        print("{:<15} {:<25} {:<12} {:<10} {:<10}".format(
+            "Apartment ID", "Name", "Rate (AUD)", "Capacity", "Extra Beds"))
+        print("--------------------------------------------------------------------------")
+        for result in results:
+            print("{:<15} {:<25} {:<12.2f} {:<10} {:<10}".format(
+                result['apartment_id'],
+                result['name'],
+                result['rate_per_night'],
+                result['capacity'],
+                result['extra_beds']
+            ))
+        print("--------------------------------------------------------------------------")
+        print(f"{len(results)} apartment(s) available for {number_of_guests} guest(s)")
+        return results
+
+    @classmethod
+    def get_stays(cls, apartment_id):
+        """Return the booked stays of an apartment as (check_in, check_out, booking_id) dates"""
+        with cls._lock:
+            stays = list(cls.booked_stays.get(apartment_id, []))
+        return [(date.fromordinal(start), date.fromordinal(end), booking_id)
+                for start, end, booking_id in stays]
+
+
+# In[ ]:
+
+
+import io
+import shutil
+import threading
+import zlib
+from itertools import chain
+
+
+def file_signature(*filenames):
+    """Size and modification time of a set of files, used to detect changes"""
+    parts = []
+    for filename in filenames:
+        if os.path.exists(filename):
+            stat = os.stat(filename)
+            parts.append(f"{filename}:{stat.st_size}:{stat.st_mtime_ns}")
+        else:
+            parts.append(f"{filename}:-")
+    return "|".join(parts)
+
+
+class OrderJournal:
+    """
+    Append-only journal of order rows kept next to an orders snapshot.
+
+    Bookings are appended to '<filename>.journal' instead of rewriting the
+    snapshot. Every record is framed as
+
+        <payload length>:<crc32 as 8 hex digits>:<csv row>\\n
+
+    so a torn or corrupted tail left behind by a crash is detected on the
+    next read and truncated. Every append is fsync'd before it returns.
+    After `compact_every` appends the journal is folded into the snapshot:
+
+        1. snapshot + journal rows are written to '<filename>.tmp' and fsync'd
+        2. the journal is renamed to '<filename>.journal.applied'
+        3. the temporary file replaces the snapshot
+        4. the applied journal is removed
+
+    recover() finishes or rolls back a compaction interrupted at any step.
+    Appends, journal reads and compactions hold `_lock`, so an append made
+    on another thread can never land between reading the journal and
+    retiring it.
+    """
+
+    compact_every = 500
+    appends_since_compaction = {}
+    _lock = threading.RLock()
+
+    @staticmethod
+    def journal_path(filename):
+        return f"{filename}.journal"
+
+    @classmethod
+    def signature(cls, filename="orders.csv"):
+        """Change signature of the snapshot together with its journal"""
+        return file_signature(filename, cls.journal_path(filename))
+
+    @staticmethod
+    def encode_record(row):
+        """Frame one CSV row as a length/checksum prefixed journal record"""
+        buffer = io.StringIO()
+        csv.writer(buffer, lineterminator='').writerow(row)
+        payload = buffer.getvalue().encode('utf-8')
+        return b"%d:%08x:" % (len(payload), zlib.crc32(payload)) + payload + b"\n"
+
+    @staticmethod
+    def _fsync_directory(path):
+        """Persist a rename by syncing the containing directory where supported"""
+        try:
+            fd = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY)
+        except OSError:
+            return
+        try:
+            os.fsync(fd)
+        except OSError:
+            pass
+        finally:
+            os.close(fd)
+
+    @classmethod
+    def append(cls, row, filename="orders.csv"):
+        """
+        Durably append a single order row.
+
+        Returns:
+            bool: True once the record is on disk, False otherwise
+        """
+        return cls.append_many([row], filename) == 1
+
+    @classmethod
+    def append_many(cls, rows, filename="orders.csv"):
+        """
+        Durably append several order rows with a single write and fsync.
+
+        Returns:
+            int: Number of rows written
+        """
+        rows = list(rows)
+        if not rows:
+            return 0
+        data = b"".join(cls.encode_record(row) for row in rows)
+        with cls._lock:
+            try:
+                cls.recover(filename)
+                with open(cls.journal_path(filename), 'ab') as journal:
+                    journal.write(data)
+                    journal.flush()
+                    os.fsync(journal.fileno())
+            except Exception as e:
+                log.error(f"❌ Error writing to order journal: {e}")
+                return 0
+
+            pending = cls.appends_since_compaction.get(filename, 0) + len(rows)
+            cls.appends_since_compaction[filename] = pending
+            if cls.compact_every and pending >= cls.compact_every:
+                cls.compact(filename)
+        return len(rows)
+
+    @classmethod
+    def read_journal(cls, filename="orders.csv"):
+        """
+        Return the rows recorded in the journal, oldest first.
+
+        Reading stops at the first incomplete or corrupted record; the
+        journal is truncated there so later appends start on a clean record.
+        """
+        with cls._lock:
+            return cls._read_journal(filename)
+
+    @classmethod
+    def _read_journal(cls, filename):
+        path = cls.journal_path(filename)
+        if not os.path.exists(path):
+            return []
+
+        with open(path, 'rb') as journal:
+            data = journal.read()
+
+        rows = []
+        position = 0
+        end = len(data)
+        while position < end:
+            try:
+                length_end = data.index(b":", position)
+                crc_end = length_end + 9
+                length = int(data[position:length_end])
+                if data[crc_end:crc_end + 1] != b":":
+                    raise ValueError("malformed record header")
+                checksum = int(data[length_end + 1:crc_end], 16)
+                payload_start = crc_end + 1
+                payload_end = payload_start + length
+                if data[payload_end:payload_end + 1] != b"\n":
+                    raise ValueError("incomplete record")
+                payload = data[payload_start:payload_end]
+                if zlib.crc32(payload) != checksum:
+                    raise ValueError("checksum mismatch")
+            except ValueError:
+                break
+            rows.extend(csv.reader(io.StringIO(payload.decode('utf-8'))))
+            position = payload_end + 1
+
+        if position < end:
+            log.warning(f"⚠️  Order journal: discarding {end - position} bytes of incomplete data")
+            with open(path, 'r+b') as journal:
+                journal.truncate(position)
+                journal.flush()
+                os.fsync(journal.fileno())
+
+        cls.appends_since_compaction[filename] = len(rows)
+        return rows
+
+    @staticmethod
+    def read_snapshot(filename="orders.csv"):
+        """Yield the rows of the snapshot file alone"""
+        if os.path.exists(filename):
+            with open(filename, 'r', newline='', encoding='utf-8') as file:
+                for row in csv.reader(file):
+                    if row:
+                        yield row
+
+    @classmethod
+    def read_rows(cls, filename="orders.csv"):
+        """Yield every order row: the snapshot first, then the journal"""
+        cls.recover(filename)
+        yield from cls.read_snapshot(filename)
+        yield from cls.read_journal(filename)
+
+    @classmethod
+    def compact(cls, filename="orders.csv"):
+        """
+        Fold the journal into the snapshot file.
+
+        The snapshot is copied byte for byte, except once: when the journal
+        brings the first OrderRows.HEADER into a file that does not start
+        with one, the file is rewritten with HEADER as its first row (see
+        OrderRows.with_leading_header), so writers only ever need to check
+        the first line for it.
+
+        Returns:
+            bool: True if successful, False otherwise
+        """
+        with cls._lock:
+            try:
+                cls.recover(filename)
+                rows = cls.read_journal(filename)
+                if not rows:
+                    return True
+
+                journal = cls.journal_path(filename)
+                temp_name = f"{filename}.tmp"
+                headed = OrderRows.starts_with_header(filename)
+                with open(temp_name, 'wb') as temp:
+                    text = io.StringIO()
+                    if not headed and any(row[0] == OrderRows.HEADER[0] for row in rows):
+                        csv.writer(text).writerows(
+                            OrderRows.with_leading_header(chain(cls.read_snapshot(filename), rows)))
+                    else:
+                        if headed:
+                            rows = [row for row in rows if row[0] != OrderRows.HEADER[0]]
+                        if os.path.exists(filename):
+                            with open(filename, 'rb') as snapshot:
+                                shutil.copyfileobj(snapshot, temp)
+                                # Keep appended rows on their own line
+                                if snapshot.tell() > 0:
+                                    snapshot.seek(-1, os.SEEK_END)
+                                    if snapshot.read(1) != b"\n":
+                                        temp.write(b"\r\n")
+                        csv.writer(text).writerows(rows)
+                    temp.write(text.getvalue().encode('utf-8'))
+                    temp.flush()
+                    os.fsync(temp.fileno())
+
+                os.replace(journal, f"{journal}.applied")
+                os.replace(temp_name, filename)
+                cls._fsync_directory(filename)
+                os.remove(f"{journal}.applied")
+
+                cls.appends_since_compaction[filename] = 0
+                log.info(f"✅ Compacted {len(rows)} journal entries into {filename}")
+                return True
+
+            except Exception as e:
+                log.error(f"❌ Error compacting order journal: {e}")
+                return False
+
+    @classmethod
+    def recover(cls, filename="orders.csv"):
+        """Complete or roll back a compaction that was interrupted by a crash"""
+        applied = f"{cls.journal_path(filename)}.applied"
+        temp_name = f"{filename}.tmp"
+        if os.path.exists(applied):
+            # The journal was retired, so the temporary snapshot is complete
+            if os.path.exists(temp_name):
+                os.replace(temp_name, filename)
+                cls._fsync_directory(filename)
+            os.remove(applied)
+        elif os.path.exists(temp_name):
+            # Crashed while writing the new snapshot; the journal is still live
+            os.remove(temp_name)
+
+
+# In[ ]:
+
+
+import mmap
+
+
+class OrderRows:
+    """
+    Reader for the rows of orders.csv and its journal, whatever wrote them.
+
+    An orders file can hold:
+
+        - a legacy header ('booking_id,guest_id,apartment_id,...') followed
+          by header-based rows
+        - rows written by Booking.save_to_csv; below a HEADER row their first
+          column is the booking ID, rows written before IDs were stored
+          start with the booking date
+        - bundle rows written by Bundle.save_bundle_order
+
+    Whether a row carries a booking ID is decided by the header rows above
+    it, never by the value in its first column. Writers put HEADER in front
+    of their first ID-bearing row (see header_for), and journal compaction
+    then moves it to the top of the file.
+
+    Cancelled bookings stay in the file, which is append-only;
+    iter_records() leaves out every booking listed in the CancellationLog,
+    so each reader sees the same live bookings.
+    """
+
+    HEADER = ['order_id', 'booking_date', 'guest_id', 'check_in_date', 'check_out_date',
+              'nights', 'number_of_guests', 'products', 'total_cost', 'reward_points']
+    LEGACY_KEY = 'booking_id'
+    _headed = {}    # filename -> (device, inode) of the orders file known to contain HEADER
+
+    def __init__(self, with_ids=False, legacy_header=None):
+        """
+        Args:
+            with_ids (bool): A HEADER row was seen above the first row
+            legacy_header (list, optional): The legacy header seen above the first row
+        """
+        self.with_ids = with_ids
+        self.legacy_header = legacy_header
+
+    def classify(self, row):
+        """
+        Classify the next row of the file.
+
+        Returns:
+            tuple: (kind, booking_id, values) where kind is
+                   'header' - values is the header row
+                   'order'  - values is the save_to_csv row without its booking
+                              ID; booking_id is the stored ID or None
+                   'bundle' - values is the save_bundle_order row
+                   'legacy' - values is a dict keyed by the legacy header
+                   'unknown' - a header-based row with no legacy header above it
+        """
+        if row[0] == self.HEADER[0]:
+            self.with_ids = True
+            return 'header', None, row
+        if row[0] == self.LEGACY_KEY and self.legacy_header is None:
+            self.legacy_header = row
+            return 'header', None, row
+        booking_id, values = (row[0], row[1:]) if self.with_ids else (None, row)
+        if Booking.is_order_row(values):
+            return 'order', booking_id, values
+        if len(row) >= 5 and ' x ' in row[1]:
+            return 'bundle', None, row
+        if self.legacy_header is not None:
+            order = dict(zip(self.legacy_header, row))
+            return 'legacy', order.get(self.LEGACY_KEY), order
+        return 'unknown', None, row
+
+    @classmethod
+    def iter_records(cls, rows, skip_cancelled=True):
+        """
+        Classify a stream of rows, skipping the header rows.
+
+        Rows without a stored booking ID are named by their position in the
+        file ('ORD000042'), counting every row from 1, so each reader gives
+        them the same ID.
+
+        Args:
+            rows (iterable): Rows of an orders file, from its first row
+            skip_cancelled (bool): Leave out bookings in the CancellationLog
+
+        Yields:
+            tuple: (position, kind, booking_id, values) as returned by classify()
+        """
+        cancelled = CancellationLog.booking_ids() if skip_cancelled else ()
+        reader = cls()
+        for position, row in enumerate(rows, 1):
+            kind, booking_id, values = reader.classify(row)
+            if kind == 'header':
+                continue
+            if kind == 'order' and booking_id is None:
+                booking_id = f"ORD{position:06d}"
+            if booking_id in cancelled:
+                continue
+            yield position, kind, booking_id, values
+
+    @classmethod
+    def read(cls, filename="orders.csv", skip_cancelled=True):
+        """Classify the rows of an orders file and its journal"""
+        return cls.iter_records(OrderJournal.read_rows(filename), skip_cancelled)
+
+    @staticmethod
+    def signature(filename="orders.csv"):
+        """Change signature of everything read() depends on: the file, its journal and the cancellations"""
+        return file_signature(filename, OrderJournal.journal_path(filename), CancellationLog.filename)
+
+    @staticmethod
+    def _identity(filename):
+        try:
+            stat = os.stat(filename)
+        except FileNotFoundError:
+            return None
+        return stat.st_dev, stat.st_ino
+
+    @classmethod
+    def starts_with_header(cls, filename):
+        """Check whether the first row of a file is HEADER, reading only that line"""
+        try:
+            with open(filename, 'rb') as file:
+                return file.readline().startswith((cls.HEADER[0] + ',').encode('ascii'))
+        except FileNotFoundError:
+            return False
+
+    @classmethod
+    def header_for(cls, filename="orders.csv"):
+        """
+        Rows to write before appending ID-bearing order rows to a file.
+
+        Compaction keeps HEADER on the first line of the file, so only that
+        line and the (bounded) journal are checked, never the history. The
+        answer is remembered until the file is replaced.
+
+        Returns:
+            list: [HEADER] if neither the first line nor the journal is a HEADER, else []
+        """
+        identity = cls._identity(filename)
+        if cls._headed.get(filename) == identity:
+            return []
+        if (cls.starts_with_header(filename)
+                or any(row[0] == cls.HEADER[0] for row in OrderJournal.read_journal(filename))):
+            cls._headed[filename] = identity
+            return []
+        return [list(cls.HEADER)]
+
+    @classmethod
+    def with_leading_header(cls, rows):
+        """
+        Rewrite the rows of an orders file so that HEADER is its first row.
+
+        Order rows that were named by their position are given that ID
+        explicitly, so every booking keeps its ID; later HEADER rows are
+        dropped and every other row is kept as it is.
+
+        Args:
+            rows (iterable): Rows of an orders file, from its first row
+
+        Yields:
+            list: The rewritten rows
+        """
+        yield list(cls.HEADER)
+        reader = cls()
+        for position, row in enumerate(rows, 1):
+            kind, booking_id, values = reader.classify(row)
+            if kind == 'header' and row[0] == cls.HEADER[0]:
+                continue
+            if kind == 'order' and booking_id is None:
+                row = [f"ORD{position:06d}", *row]
+            yield row
+
+    @staticmethod
+    def header_offset(filename):
+        """
+        Byte offset of the first HEADER row in a file.
+
+        Returns:
+            int: The offset, or None if the file has no HEADER row
+        """
+        marker = (OrderRows.HEADER[0] + ',').encode('ascii')
+        if not os.path.exists(filename) or not os.path.getsize(filename):
+            return None
+        with open(filename, 'rb') as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            if data[:len(marker)] == marker:
+                return 0
+            offset = data.find(b'\n' + marker)
+            return offset + 1 if offset >= 0 else None
+
+
+# In[ ]:
+
+
+import threading
+
+
+class CatalogueDelta(OrderJournal):
+    """
+    Delta log of catalogue edits, merged over products.csv on load.
+
+    Editing one apartment or supplementary item appends a single framed
+    record to '<filename>.delta' ('PUT' followed by the product row, or
+    'DEL' followed by the product ID) instead of rewriting the catalogue.
+    Once `compact_every` edits have accumulated the delta is folded into
+    products.csv on a background thread, using the same crash-safe
+    temp-file-and-rename protocol as the order journal.
+    """
+
+    compact_every = 50
+    appends_since_compaction = {}
+    _lock = threading.RLock()
+    _compaction_threads = {}
+
+    @staticmethod
+    def journal_path(filename):
+        return f"{filename}.delta"
+
+    @classmethod
+    def append_many(cls, rows, filename="products.csv"):
+        with cls._lock:
+            return super().append_many(rows, filename)
+
+    @classmethod
+    def record_changes(cls, registry, changed_ids, format_row, filename="products.csv"):
+        """
+        Append the current state of the changed products to the delta.
+
+        Args:
+            registry (dict): Product registry the IDs belong to
+            changed_ids (iterable): IDs that were added, updated or removed
+            format_row (callable): Turns a product into its products.csv fields
+            filename (str): Name of the products file
+
+        Returns:
+            int: Number of records written
+        """
+        records = []
+        for product_id in dict.fromkeys(changed_ids):
+            if product_id in registry:
+                records.append(['PUT', *format_row(registry[product_id])])
+            else:
+                records.append(['DEL', product_id])
+        return cls.append_many(records, filename)
+
+    @staticmethod
+    def apply(rows, records):
+        """Merge delta records over catalogue rows, keeping the file order"""
+        merged = {row[0]: row for row in rows if row and row[0]}
+        for record in records:
+            if len(record) < 2:
+                continue
+            action, product_id = record[0], record[1]
+            if action == 'PUT':
+                merged[product_id] = record[1:]
+            elif action == 'DEL':
+                merged.pop(product_id, None)
+        return list(merged.values())
+
+    @classmethod
+    def read_catalogue_rows(cls, filename="products.csv"):
+        """Return the products.csv rows with every pending edit applied"""
+        with cls._lock:
+            cls.recover(filename)
+            rows = []
+            if os.path.exists(filename):
+                with open(filename, 'r', encoding='utf-8-sig', newline='') as file:
+                    for row in csv.reader(file, skipinitialspace=True):
+                        rows.append([part.strip() for part in row])
+            return cls.apply(rows, cls.read_journal(filename))
+
+    @classmethod
+    def compact(cls, filename="products.csv", background=True):
+        """
+        Fold the delta into products.csv.
+
+        Args:
+            filename (str): Name of the products file
+            background (bool): Run on a background thread instead of waiting
+
+        Returns:
+            bool: True if successful or scheduled, False otherwise
+        """
+        if not background:
+            return cls._compact_now(filename)
+
+        with cls._lock:
+            running = cls._compaction_threads.get(filename)
+            if running and running.is_alive():
+                return True
+            worker = threading.Thread(target=cls._compact_now, args=(filename,),
+                                      name=f"compact-{filename}")
+            cls._compaction_threads[filename] = worker
+            worker.start()
+        return True
+
+    @classmethod
+    def wait_for_compaction(cls, timeout=None):
+        """
+        Wait for running background compactions to finish.
+
+        Args:
+            timeout (float, optional): Seconds to wait for each compaction
+
+        Returns:
+            bool: True if no compaction is still running
+        """
+        with cls._lock:
+            workers = list(cls._compaction_threads.values())
+        for worker in workers:
+            worker.join(timeout)
+        return not any(worker.is_alive() for worker in workers)
+
+    @classmethod
+    def _compact_now(cls, filename):
+        try:
+            with cls._lock:
+                cls.recover(filename)
+                if not os.path.exists(cls.journal_path(filename)):
+                    return True
+                rows = cls.read_catalogue_rows(filename)
+
+                delta = cls.journal_path(filename)
+                temp_name = f"{filename}.tmp"
+                with open(temp_name, 'w', encoding='utf-8', newline='') as temp:
+                    # products.csv is written unquoted with ', ' separators
+                    for row in rows:
+                        temp.write(", ".join(row) + "\n")
+                    temp.flush()
+                    os.fsync(temp.fileno())
+
+                os.replace(delta, f"{delta}.applied")
+                os.replace(temp_name, filename)
+                cls._fsync_directory(filename)
+                os.remove(f"{delta}.applied")
+
+                cls.appends_since_compaction[filename] = 0
+                return True
+
+        except Exception as e:
+            log.error(f"❌ Error compacting catalogue changes: {e}")
+            return False
+
+
+# In[ ]:
+
+
+import json
+import sqlite3
+from collections.abc import MutableMapping
+
+
+class SQLiteBookingView(MutableMapping):
+    """
+    Dictionary-like view of the bookings stored in SQLite.
+
+    Bookings are only rebuilt when they are looked up, and each one is
+    cached afterwards, so startup does not materialise the order history.
+    Assigning a booking stores it in the database.
+    """
+
+    def __init__(self, records):
+        self.records = records
+        self.cache = {}
+
+    def __getitem__(self, booking_id):
+        if booking_id not in self.cache:
+            booking = self.records.get_booking(booking_id)
+            if booking is None:
+                raise KeyError(booking_id)
+            self.cache[booking_id] = booking
+        return self.cache[booking_id]
+
+    def __setitem__(self, booking_id, booking):
+        self.records.store_bookings([booking])
+        self.cache[booking_id] = booking
+
+    def __delitem__(self, booking_id):
+        self.cache.pop(booking_id, None)
+        self.records.delete_booking(booking_id)
+
+    def __contains__(self, booking_id):
+        return booking_id in self.cache or self.records.has_booking(booking_id)
+
+    def __iter__(self):
+        return iter(self.records.get_booking_ids())
+
+    def __len__(self):
+        return self.records.count_bookings()
+
+
+class SQLiteRecords(Records):
+    """
+    Records backed by an embedded SQLite database instead of CSV files.
+
+    The CSV files remain the import format: each one is imported when its
+    size or modification time differs from the last import, otherwise the
+    data is read straight from the database. Guest and order imports are
+    merges keyed on guest_id and booking_id: they add what the database is
+    missing and never drop rows saved only to the database. Orders are
+    never rebuilt up front; availability is indexed from the stays table
+    and individual bookings are loaded on demand through indexed queries.
+
+    The connection is shared with the booking service's worker threads, so
+    every statement and transaction runs while holding self.lock.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS guests (
+            guest_id TEXT PRIMARY KEY,
+            first_name TEXT NOT NULL,
+            last_name TEXT NOT NULL,
+            date_of_birth TEXT NOT NULL,
+            reward_points INTEGER NOT NULL,
+            reward_rate REAL NOT NULL,
+            redeem_rate REAL NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS products (
+            product_id TEXT PRIMARY KEY,
+            position INTEGER NOT NULL,
+            fields TEXT NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS orders (
+            booking_id TEXT PRIMARY KEY,
+            guest_id TEXT NOT NULL,
+            check_in_ordinal INTEGER,
+            check_out_ordinal INTEGER,
+            total_cost REAL,
+            reward_points INTEGER,
+            format TEXT NOT NULL,
+            data TEXT NOT NULL,
+            booked_on INTEGER
+        );
+        CREATE TABLE IF NOT EXISTS stays (
+            booking_id TEXT NOT NULL,
+            apartment_id TEXT NOT NULL,
+            check_in_ordinal INTEGER NOT NULL,
+            check_out_ordinal INTEGER NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS imports (
+            source TEXT PRIMARY KEY,
+            signature TEXT NOT NULL
+        );
+    """
+
+    # Created after migrate() has added any missing columns
+    INDEXES = """
+        DROP INDEX IF EXISTS idx_orders_guest;
+        CREATE INDEX IF NOT EXISTS idx_orders_guest_booked ON orders (guest_id, booked_on);
+        CREATE INDEX IF NOT EXISTS idx_orders_check_in ON orders (check_in_ordinal);
+        CREATE INDEX IF NOT EXISTS idx_stays_apartment ON stays (apartment_id, check_in_ordinal);
+        CREATE INDEX IF NOT EXISTS idx_stays_booking ON stays (booking_id);
+    """
+
+    def __init__(self, database="pythonia.db"):
+        super().__init__()
+        self.database = database
+        self.lock = threading.RLock()
+        self.connection = sqlite3.connect(database, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.executescript(self.SCHEMA)
+        self.migrate()
+        self.connection.executescript(self.INDEXES)
+        self.bookings = SQLiteBookingView(self)
+
+    def migrate(self):
+        """Bring a database created by an older version up to the current schema"""
+        columns = {row[1] for row in self.connection.execute("PRAGMA table_info(orders)")}
+        if 'booked_on' not in columns:
+            with self.connection:
+                self.connection.execute("ALTER TABLE orders ADD COLUMN booked_on INTEGER")
+                self.connection.executemany(
+                    "UPDATE orders SET booked_on = ? WHERE booking_id = ?",
+                    [(self._booked_on(record_format, json.loads(data)), booking_id)
+                     for booking_id, record_format, data in self.connection.execute(
+                         "SELECT booking_id, format, data FROM orders")])
+
+    @staticmethod
+    def _booked_on(record_format, values):
+        """
+        Booking date ordinal of a stored order.
+
+        Legacy rows carry no booking date; like unreadable dates in
+        Records.booking_index_key they get 0 and sort first.
+        """
+        if record_format == 'order':
+            try:
+                return to_date_ordinal(values[0])
+            except ValueError:
+                pass
+        return 0
+
+    def close(self):
+        """Close the database connection"""
+        with self.lock:
+            self.connection.close()
+
+    def needs_import(self, source, signature):
+        with self.lock:
+            row = self.connection.execute(
+                "SELECT signature FROM imports WHERE source = ?", (source,)).fetchone()
+        return row is None or row[0] != signature
+
+    def mark_imported(self, source, signature):
+        with self.lock:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO imports (source, signature) VALUES (?, ?)",
+                (source, signature))
+
+    # Guests
+
+    def read_guests(self, filename="guests.csv"):
+        """
+        Load guests, importing guests.csv first if it changed since the last import.
+
+        The import only adds guests that are not in the database yet; stored
+        guests keep their balance and rates.
+        """
+        try:
+            signature = file_signature(filename)
+            if self.needs_import('guests', signature):
+                if not super().read_guests(filename):
+                    return False
+                with self.lock, self.connection:
+                    self._upsert_guests(self.guests.values(), replace=False)
+                    self.mark_imported('guests', signature)
+
+            log.info("\nLoading Guest Data")
+            log.info("=" * 50)
+            self.guests.clear()
+            with self.lock:
+                rows = self.connection.execute(
+                    "SELECT first_name, last_name, date_of_birth, reward_points, reward_rate, redeem_rate "
+                    "FROM guests").fetchall()
+            for row in rows:
+                guest = Guest(*row)
+                self.guests[guest.get_guest_id()] = guest
+            log.info(f"\n✅ Successfully loaded {len(self.guests)} guests from {self.database}")
+            return True
+
+        except Exception as e:
+            log.error(f"❌ Error loading guests: {e}")
+            return False
+
+    def _upsert_guests(self, guests, replace=True):
+        self.connection.executemany(
+            f"INSERT OR {'REPLACE' if replace else 'IGNORE'} INTO guests (guest_id, first_name, last_name, date_of_birth, "
+            "reward_points, reward_rate, redeem_rate) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            [(guest.get_guest_id(), guest.first_name, guest.last_name, guest.date_of_birth,
+              guest.total_reward_points_earned, guest.get_reward_rate(), guest.get_redeem_rate())
+             for guest in guests])
+
+    def save_guests_to_csv(self, filename="guests.csv"):
+        """Save guests to the database (the CSV file is only used for imports)"""
+        try:
+            with self.lock, self.connection:
+                self._upsert_guests(self.guests.values())
+            return True
+        except Exception as e:
+            log.error(f"❌ Error saving guests to database: {e}")
+            return False
+
+    # Products
+
+    def read_products(self, filename="products.csv"):
+        """Load the catalogue, importing products.csv first if it changed since the last import"""
+        try:
+            signature = CatalogueDelta.signature(filename)
+            if self.needs_import('products', signature):
+                if not os.path.exists(filename):
+                    raise FileNotFoundError(f"Product file '{filename}' not found")
+                rows = CatalogueDelta.read_catalogue_rows(filename)
+                with self.lock, self.connection:
+                    self.connection.execute("DELETE FROM products")
+                    self.connection.executemany(
+                        "INSERT OR REPLACE INTO products (product_id, position, fields) VALUES (?, ?, ?)",
+                        [(row[0], position, json.dumps(row)) for position, row in enumerate(rows)])
+                    self.mark_imported('products', signature)
+            else:
+                with self.lock:
+                    rows = [json.loads(fields) for (fields,) in self.connection.execute(
+                        "SELECT fields FROM products ORDER BY position")]
+
+            self.load_catalogue(filename, rows=rows)
+            return len(self.products) > 0
+
+        except Exception as e:
+            log.error(f"❌ Error loading products: {e}")
+            self.products = {}
+            return False
+
+    # Orders
+
+    @staticmethod
+    def _order_record(kind, booking_id, values):
+        """Turn a classified orders.csv row into (orders row, stays rows) without building a Booking"""
+        if kind == 'order':
+            check_in = to_date_ordinal(values[2])
+            check_out = to_date_ordinal(values[3])
+            apartment_ids = [product.split(' x ')[1].strip()
+                             for product in values[6:-2] if ' x U' in product]
+            order = (booking_id, values[1], check_in, check_out,
+                     float(values[-2]), int(values[-1]), 'order', json.dumps(values),
+                     SQLiteRecords._booked_on('order', values))
+        else:
+            check_in = to_date_ordinal(values['check_in_date'])
+            check_out = to_date_ordinal(values['check_out_date'])
+            apartment_ids = [values['apartment_id']]
+            order = (booking_id, values['guest_id'], check_in, check_out,
+                     float(values['total_cost']), int(values['reward_points_earned']), 'legacy', json.dumps(values),
+                     SQLiteRecords._booked_on('legacy', values))
+        stays = [(booking_id, apartment_id, check_in, check_out) for apartment_id in apartment_ids]
+        return order, stays
+
+    def import_orders(self, filename="orders.csv"):
+        """
+        Merge orders.csv (and its journal) into the orders and stays tables.
+
+        Bookings already in the database are left as stored, bookings saved
+        only to the database are kept, and cancelled bookings are removed.
+
+        Returns:
+            tuple: (number of bookings added, number of rows skipped)
+        """
+        log.info(f"ℹ️  Importing {filename} into {self.database}...")
+        orders = []
+        stays = []
+        skipped = 0
+        for position, kind, booking_id, values in OrderRows.read(filename):
+            if kind == 'bundle':
+                continue
+            try:
+                if kind == 'unknown':
+                    raise ValueError("orders file has no header row")
+                order, order_stays = self._order_record(kind, booking_id, values)
+                orders.append(order)
+                stays.extend(order_stays)
+            except Exception as e:
+                log.warning(f"⚠️  Warning: Skipping order at line {position}: {e}")
+                skipped += 1
+
+        with self.lock:
+            stored = {booking_id for (booking_id,) in self.connection.execute("SELECT booking_id FROM orders")}
+            orders = [order for order in orders if order[0] not in stored]
+            stays = [stay for stay in stays if stay[0] not in stored]
+            cancelled = [(booking_id,) for booking_id in CancellationLog.booking_ids() if booking_id in stored]
+            with self.connection:
+                self.connection.executemany(
+                    "INSERT OR IGNORE INTO orders (booking_id, guest_id, check_in_ordinal, check_out_ordinal, "
+                    "total_cost, reward_points, format, data, booked_on) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", orders)
+                self.connection.executemany(
+                    "INSERT INTO stays (booking_id, apartment_id, check_in_ordinal, check_out_ordinal) "
+                    "VALUES (?, ?, ?, ?)", stays)
+                self.connection.executemany("DELETE FROM orders WHERE booking_id = ?", cancelled)
+                self.connection.executemany("DELETE FROM stays WHERE booking_id = ?", cancelled)
+        return len(orders), skipped
+
+    def load_orders(self, filename="orders.csv"):
+        """
+        Index the order history without rebuilding every booking.
+
+        orders.csv is re-imported only when it or its journal changed since
+        the last import; bookings are then rebuilt lazily on lookup.
+        """
+        try:
+            log.info("\nLoading Orders Data")
+            log.info("=" * 50)
+
+            signature = OrderRows.signature(filename)
+            if self.needs_import('orders', signature):
+                imported, skipped = self.import_orders(filename)
+                with self.lock, self.connection:
+                    self.mark_imported('orders', signature)
+                log.info(f"✅ Imported {imported} new orders")
+                if skipped > 0:
+                    log.warning(f"⚠️  Skipped {skipped} invalid entries")
+
+            with self.lock:
+                stays = self.connection.execute(
+                    "SELECT apartment_id, check_in_ordinal, check_out_ordinal, booking_id FROM stays").fetchall()
+            AvailabilityIndex.clear()
+            for apartment_id, check_in, check_out, booking_id in stays:
+                AvailabilityIndex.add_stay(apartment_id, check_in, check_out, booking_id)
+
+            log.info(f"\n✅ Successfully indexed {self.count_bookings()} orders.")
+            return True
+
+        except Exception as e:
+            log.error(f"❌ Error loading orders: {e}")
+            return False
+
+    def _booking_from_record(self, booking_id, record_format, data):
+        values = json.loads(data)
+        if record_format == 'legacy':
+            _, booking = self.booking_from_legacy_row(values)
+        else:
+            booking = Booking.from_order_row(values)
+        booking.booking_id = booking_id
+        return booking
+
+    def get_booking(self, booking_id):
+        """Look up a single booking by ID"""
+        with self.lock:
+            row = self.connection.execute(
+                "SELECT booking_id, format, data FROM orders WHERE booking_id = ?", (booking_id,)).fetchone()
+        return self._booking_from_record(*row) if row else None
+
+    def has_booking(self, booking_id):
+        with self.lock:
+            return self.connection.execute(
+                "SELECT 1 FROM orders WHERE booking_id = ?", (booking_id,)).fetchone() is not None
+
+    def get_booking_ids(self):
+        with self.lock:
+            return [booking_id for (booking_id,) in self.connection.execute(
+                "SELECT booking_id FROM orders ORDER BY check_in_ordinal, booking_id")]
+
+    def count_bookings(self):
+        with self.lock:
+            return self.connection.execute("SELECT COUNT(*) FROM orders").fetchone()[0]
+
+    def delete_booking(self, booking_id):
+        with self.lock, self.connection:
+            self.connection.execute("DELETE FROM orders WHERE booking_id = ?", (booking_id,))
+            self.connection.execute("DELETE FROM stays WHERE booking_id = ?", (booking_id,))
+
+    def _rebuild(self, rows):
+        """Rebuild bookings from (booking_id, format, data) rows, reusing cached ones"""
+        cache = self.bookings.cache
+        bookings = []
+        for booking_id, record_format, data in rows:
+            if booking_id not in cache:
+                cache[booking_id] = self._booking_from_record(booking_id, record_format, data)
+            bookings.append(cache[booking_id])
+        return bookings
+
+    def iter_statistics_records(self, filename="orders.csv"):
+        """Stream statistics records from the orders table"""
+        with self.lock:
+            records = self.connection.execute("SELECT format, data FROM orders").fetchall()
+        for record_format, data in records:
+            values = json.loads(data)
+            if record_format == 'legacy':
+                rows = [list(values), list(values.values())]
+            else:
+                rows = [values]
+            # Cancelled bookings are deleted from the table, and these rows have no file position
+            yield from OrderStatistics.iter_order_rows(rows, skip_cancelled=False)
+
+    def count_guest_bookings(self, guest_id):
+        self.ensure_orders_loaded()
+        with self.lock:
+            return self.connection.execute(
+                "SELECT COUNT(*) FROM orders WHERE guest_id = ?", (guest_id,)).fetchone()[0]
+
+    def get_guest_bookings(self, guest_id, page=None, page_size=20):
+        """Return a guest's bookings, oldest booking first, optionally one page at a time"""
+        self.ensure_orders_loaded()
+        query = "SELECT booking_id, format, data FROM orders WHERE guest_id = ? ORDER BY booked_on, rowid"
+        parameters = (guest_id,)
+        if page is not None:
+            query += " LIMIT ? OFFSET ?"
+            parameters += (page_size, (max(page, 1) - 1) * page_size)
+        with self.lock:
+            rows = self.connection.execute(query, parameters).fetchall()
+        return self._rebuild(rows)
+
+    def find_bookings(self, start_date=None, end_date=None, apartment_id=None):
+        """
+        Return bookings checking in between two dates, optionally for one apartment.
+
+        Args:
+            start_date: First check-in date to include (any format accepted by to_date_ordinal)
+            end_date: Last check-in date to include
+            apartment_id (str, optional): Only include stays in this apartment
+        """
+        self.ensure_orders_loaded()
+        start = to_date_ordinal(start_date) if start_date is not None else -1
+        end = to_date_ordinal(end_date) if end_date is not None else date.max.toordinal()
+        with self.lock:
+            if apartment_id:
+                rows = self.connection.execute(
+                    "SELECT o.booking_id, o.format, o.data FROM stays s JOIN orders o USING (booking_id) "
+                    "WHERE s.apartment_id = ? AND s.check_in_ordinal BETWEEN ? AND ? "
+                    "ORDER BY s.check_in_ordinal", (apartment_id, start, end)).fetchall()
+            else:
+                rows = self.connection.execute(
+                    "SELECT booking_id, format, data FROM orders WHERE check_in_ordinal BETWEEN ? AND ? "
+                    "ORDER BY check_in_ordinal", (start, end)).fetchall()
+        return self._rebuild(rows)
+
+    def save_booking(self, booking, filename="orders.csv"):
+        """Store a confirmed booking in the database"""
+        return self.save_bookings([booking], filename) == 1
+
+    def save_bookings(self, bookings, filename="orders.csv"):
+        """
+        Store a batch of confirmed bookings in a single transaction.
+
+        Returns:
+            int: Number of bookings saved (0 or all of them)
+        """
+        bookings = list(bookings)
+        try:
+            self.store_bookings(bookings)
+            for booking in bookings:
+                self.bookings.cache[booking.booking_id] = booking
+            return len(bookings)
+
+        except Exception as e:
+            log.error(f"❌ Error saving bookings to database: {e}")
+            return 0
+
+    def store_bookings(self, bookings):
+        """
+        Write bookings and their stays in one transaction, replacing stored copies.
+
+        Raises:
+            sqlite3.Error: If the transaction failed (nothing is written)
+        """
+        orders = []
+        stays = []
+        for booking in bookings:
+            booking_id, values = booking.booking_id, booking.to_order_row()[1:]
+            check_in = to_date_ordinal(booking.check_in_date)
+            check_out = to_date_ordinal(booking.check_out_date)
+            orders.append((booking_id, values[1], check_in, check_out,
+                           float(values[-2]), int(values[-1]), 'order', json.dumps(values),
+                           self.booking_index_key(booking)[1]))
+            stays.extend((booking_id, apartment_id, check_in, check_out)
+                         for apartment_id in booking.get_booked_apartment_ids())
+        with self.lock, self.connection:
+            self.connection.executemany("DELETE FROM stays WHERE booking_id = ?",
+                                        [(order[0],) for order in orders])
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO orders (booking_id, guest_id, check_in_ordinal, check_out_ordinal, "
+                "total_cost, reward_points, format, data, booked_on) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                orders)
+            self.connection.executemany(
+                "INSERT INTO stays (booking_id, apartment_id, check_in_ordinal, check_out_ordinal) "
+                "VALUES (?, ?, ?, ?)",
+                stays)
+
+
+# In[ ]:
+
+
+import heapq
+from operator import itemgetter
+
+
+class OrderStatistics:
+    """
+    Streaming aggregation of guest spend and product quantities.
+
+    Orders are consumed one at a time as (guest_id, total_cost, products)
+    records, where products is a list of (product_id, quantity) pairs.
+    Only the running totals are kept in memory (one entry per guest and
+    per product, however many orders there are), and the top K are picked
+    with heapq.nlargest instead of sorting every total.
+
+    The class also keeps a live accumulator for the running system. It is
+    updated as bookings are confirmed or cancelled and persisted to
+    stats.json, together with the signature of the orders file it reflects,
+    when the system shuts down; after a crash the signature no longer
+    matches and the totals are rebuilt from the orders file.
+    Alongside the totals it keeps a max-heap of (-total, key) entries per
+    ranking. Every change pushes the key's new total, so confirming or
+    cancelling a booking costs O(log n); entries whose total is out of date
+    are dropped when they reach the top, and the heap is rebuilt once
+    stale entries outnumber the live ones. Service worker threads update
+    the accumulator, so it is only read or changed while holding `_lock`.
+
+    Live updates and rebuilds from the orders file count a booking the
+    same way: a bundle booking is one unit of its bundle, whichever row
+    format it was saved in, and the cost is the amount paid as written to
+    the file (rounded to cents).
+    """
+
+    STAT_KINDS = ('guest_totals', 'product_quantities')
+    state_file = "stats.json"
+    running = None      # {kind: {key: total}} or None until loaded or rebuilt
+    heaps = {}          # {kind: [(-total, key), ...]}, possibly with stale entries
+    _lock = threading.RLock()
+
+    @staticmethod
+    def iter_bookings(bookings):
+        """Yield statistics records for Booking objects, as iter_order_rows reads back their rows"""
+        for booking in bookings:
+            guest_id = getattr(booking.guest, 'guest_id', booking.guest)
+            if getattr(booking, 'bundle_info', None):
+                # Count bundle as one product
+                products = [(booking.bundle_info['bundle_id'], 1)]
+            else:
+                apartments = booking.booked_apartments_for_current_booking
+                if apartments:
+                    products = [(apt_id, details.get('length_of_stay', 1)) for apt_id, details in apartments.items()]
+                else:
+                    # Bookings from legacy rows name one apartment and have no line items
+                    products = [(booking.apartment_id, booking.nights)]
+                items = booking.supplementary_items_for_current_booking
+                if isinstance(items, dict):
+                    products.extend((item_id, item_info['quantity']) for item_id, item_info in items.items())
+                else:
+                    products.extend((item_id, 1) for item_id in items if item_id)
+            yield guest_id, float(f"{booking.get_final_cost():.2f}"), products
+
+    @staticmethod
+    def iter_order_rows(rows, skip_cancelled=True):
+        """Yield statistics records for raw orders.csv rows, without building bookings"""
+        for _, kind, _, values in OrderRows.iter_records(rows, skip_cancelled):
+            try:
+                # Same parsing as the columnar store, so bundle rows count too
+                order = ColumnarOrderStore.parse_record(kind, values)
+                if order is not None:
+                    guest_id, products, total_cost = order[:3]
+                    yield guest_id, total_cost, products
+            except (ValueError, KeyError, IndexError) as e:
+                log.warning(f"⚠️  Skipping order row: {e}")
+
+    @classmethod
+    def iter_orders_file(cls, filename="orders.csv"):
+        """Stream statistics records straight from orders.csv and its journal"""
+        return cls.iter_order_rows(OrderJournal.read_rows(filename))
+
+    @staticmethod
+    def aggregate(records):
+        """
+        Fold statistics records into running totals.
+
+        Returns:
+            dict: {'guest_totals': {guest_id: spend},
+                   'product_quantities': {product_id: quantity}}
+        """
+        guest_totals = defaultdict(float)
+        product_quantities = defaultdict(int)
+        for guest_id, total_cost, products in records:
+            guest_totals[guest_id] += total_cost
+            for product_id, quantity in products:
+                product_quantities[product_id] += quantity
+        return {'guest_totals': guest_totals, 'product_quantities': product_quantities}
+
+    @staticmethod
+    def top_k(totals, k=3):
+        """Return the k largest (key, total) pairs, largest first"""
+        return heapq.nlargest(k, totals.items(), key=itemgetter(1))
+
+    @classmethod
+    def summarise(cls, records, k=3):
+        """Aggregate records and attach the top k guests and products"""
+        stats = cls.aggregate(records)
+        stats['top_guests'] = cls.top_k(stats['guest_totals'], k)
+        stats['top_products'] = cls.top_k(stats['product_quantities'], k)
+        return stats
+
+    # Live accumulator
+
+    @classmethod
+    def reset(cls, stats=None):
+        """Replace the live totals and build their heaps once"""
+        stats = stats or {}
+        with cls._lock:
+            cls.running = {kind: defaultdict(int if kind == 'product_quantities' else float,
+                                             stats.get(kind, {}))
+                           for kind in cls.STAT_KINDS}
+            cls.heaps = {}
+            for kind in cls.STAT_KINDS:
+                cls._heapify(kind)
+
+    @classmethod
+    def _heapify(cls, kind):
+        """Rebuild the heap of one ranking from its totals, dropping stale entries"""
+        heap = [(-total, key) for key, total in cls.running[kind].items()]
+        heapq.heapify(heap)
+        cls.heaps[kind] = heap
+
+    @classmethod
+    def rebuild(cls, records):
+        """Recompute the live totals from a stream of statistics records"""
+        cls.reset(cls.aggregate(records))
+
+    @classmethod
+    def _update(cls, kind, key, change):
+        """Change one total and push its corrected heap entry"""
+        totals = cls.running[kind]
+        totals[key] += change
+        heap = cls.heaps[kind]
+        heapq.heappush(heap, (-totals[key], key))
+        if len(heap) > 2 * len(totals) + 64:
+            cls._heapify(kind)
+
+    @classmethod
+    def record(cls, guest_id, total_cost, products, sign=1):
+        """Add one statistics record to the live totals (or take it out with sign=-1)"""
+        with cls._lock:
+            if cls.running is None:
+                return
+            cls._update('guest_totals', guest_id, sign * total_cost)
+            for product_id, quantity in products:
+                cls._update('product_quantities', product_id, sign * quantity)
+
+    @classmethod
+    def record_booking(cls, booking):
+        """Add a newly confirmed booking to the live totals"""
+        try:
+            for record in cls.iter_bookings([booking]):
+                cls.record(*record)
+        except Exception as e:
+            log.warning(f"⚠️  Warning: Could not update statistics - {e}")
+
+    @classmethod
+    def remove_booking(cls, booking):
+        """Take a cancelled booking out of the live totals"""
+        if cls.running is None:
+            return
+        try:
+            for record in cls.iter_bookings([booking]):
+                cls.record(*record, sign=-1)
+        except Exception as e:
+            log.warning(f"⚠️  Warning: Could not update statistics - {e}")
+
+    @classmethod
+    def current_top(cls, kind, k=3):
+        """Return the k leading (key, total) pairs of a ranking"""
+        with cls._lock:
+            totals = cls.running[kind]
+            heap = cls.heaps[kind]
+            top = []
+            seen = set()
+            kept = []
+            while heap and len(top) < k:
+                entry = heapq.heappop(heap)
+                total, key = -entry[0], entry[1]
+                if key in seen or totals.get(key) != total:
+                    continue    # Superseded by a later entry for the same key
+                seen.add(key)
+                top.append((key, total))
+                kept.append(entry)
+            for entry in kept:
+                heapq.heappush(heap, entry)
+            return top
+
+    @classmethod
+    def report(cls, k=3, source=None):
+        """
+        Return the top k guests and products from the live totals.
+
+        Args:
+            k (int): Number of guests and products to report
+            source (callable, optional): Returns statistics records to rebuild
+                                         from when no live totals are available
+        """
+        with cls._lock:
+            if cls.running is None:
+                cls.rebuild(source() if source else ())
+            stats = {kind: dict(totals) for kind, totals in cls.running.items()}
+            stats['top_guests'] = cls.current_top('guest_totals', k)
+            stats['top_products'] = cls.current_top('product_quantities', k)
+            return stats
+
+    @classmethod
+    def save_state(cls, orders_file="orders.csv"):
+        """Persist the live totals with the signature of the orders they reflect"""
+        with cls._lock:
+            if cls.running is None:
+                return False
+            state = {'orders_signature': OrderRows.signature(orders_file)}
+            state.update((kind, dict(totals)) for kind, totals in cls.running.items())
+        try:
+            temp_name = f"{cls.state_file}.tmp"
+            with open(temp_name, 'w', encoding='utf-8') as file:
+                json.dump(state, file)
+            os.replace(temp_name, cls.state_file)
+            return True
+        except Exception as e:
+            log.warning(f"⚠️  Warning: Could not save statistics - {e}")
+            return False
+
+    @classmethod
+    def load_state(cls, orders_file="orders.csv"):
+        """
+        Load persisted totals if they still match the orders file.
+
+        Returns:
+            bool: True if the totals were loaded, False if they must be rebuilt
+        """
+        cls.running = None
+        try:
+            if not os.path.exists(cls.state_file):
+                return False
+            with open(cls.state_file, 'r', encoding='utf-8') as file:
+                state = json.load(file)
+            if state.get('orders_signature') != OrderRows.signature(orders_file):
+                log.info("ℹ️  Statistics are out of date and will be rebuilt when requested")
+                return False
+            cls.reset(state)
+            return True
+        except Exception as e:
+            log.warning(f"⚠️  Warning: Could not load statistics - {e}")
+            return False
+
+
+# In[ ]:
+
+
+from array import array
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; the plain loops below give the same results
+    np = None
+
+
+class ColumnarOrderStore:
+    """
+    Column-per-field copy of the order history for analytics.
+
+    Each order is one position in a set of parallel typed arrays: total
+    cost, nights, guest count, reward points, and the check-in and booking
+    date ordinals with their month keys (year * 12 + month - 1). Guest and
+    product IDs are dictionary encoded, so the columns hold small integer
+    codes and guest_ids / product_ids map them back. The products of order i
+    are product_codes[product_start[i]:product_start[i + 1]], with the
+    matching quantities.
+
+    Aggregates are single passes over the columns, or NumPy bincounts when
+    NumPy is installed. Stores are cached per orders file and only rebuilt
+    when the file (or its journal) changes.
+    """
+
+    cache = {}  # orders file -> (signature, store)
+
+    def __init__(self):
+        self.total_cost = array('d')
+        self.nights = array('i')
+        self.guest_count = array('i')
+        self.reward_points = array('q')
+        self.check_in = array('i')
+        self.check_in_month = array('i')
+        self.booked_on = array('i')
+        self.booked_month = array('i')
+        self.guest_codes = array('i')
+        self.product_start = array('q', [0])
+        self.product_codes = array('i')
+        self.quantities = array('q')
+        self.guest_ids = []
+        self.product_ids = []
+        self._guest_lookup = {}
+        self._product_lookup = {}
+        self._dates = {}  # date text -> (ordinal, month key)
+
+    def __len__(self):
+        return len(self.total_cost)
+
+    # Building
+
+    @staticmethod
+    def _encode(lookup, ids, key):
+        """Return the code of key, assigning the next free code if it is new"""
+        code = lookup.get(key)
+        if code is None:
+            code = lookup[key] = len(ids)
+            ids.append(key)
+        return code
+
+    def _date(self, value):
+        """Parse a date once per distinct value and return (ordinal, month key)"""
+        parsed = self._dates.get(value)
+        if parsed is None:
+            ordinal = to_date_ordinal(value)
+            day = date.fromordinal(ordinal)
+            parsed = self._dates[value] = (ordinal, day.year * 12 + day.month - 1)
+        return parsed
+
+    @staticmethod
+    def _parse_products(entries):
+        """Split "quantity x product_id" entries into (product_id, quantity) pairs"""
+        products = []
+        for entry in entries:
+            quantity, product_id = entry.strip().split(' x ')
+            products.append((product_id.strip(), int(quantity)))
+        return products
+
+    def append(self, guest_id, products, total_cost, reward_points, booking_date,
+               check_in_date=None, nights=0, guest_count=0):
+        """
+        Add one order to the columns.
+
+        Args:
+            guest_id (str): Guest who placed the order
+            products (list): (product_id, quantity) pairs
+            total_cost (float): Amount paid
+            reward_points (int): Points earned
+            booking_date: Date the order was placed
+            check_in_date: Start of the stay; the booking date when the order has none
+            nights (int): Length of stay
+            guest_count (int): Number of guests
+        """
+        # Parse the dates before touching any column so a bad row leaves them aligned
+        booked_on, booked_month = self._date(booking_date)
+        if check_in_date:
+            check_in, check_in_month = self._date(check_in_date)
+        else:
+            check_in, check_in_month = booked_on, booked_month
+
+        self.total_cost.append(total_cost)
+        self.nights.append(nights)
+        self.guest_count.append(guest_count)
+        self.reward_points.append(reward_points)
+        self.check_in.append(check_in)
+        self.check_in_month.append(check_in_month)
+        self.booked_on.append(booked_on)
+        self.booked_month.append(booked_month)
+        self.guest_codes.append(self._encode(self._guest_lookup, self.guest_ids, guest_id))
+        for product_id, quantity in products:
+            self.product_codes.append(self._encode(self._product_lookup, self.product_ids, product_id))
+            self.quantities.append(quantity)
+        self.product_start.append(len(self.product_codes))
+
+    @classmethod
+    def parse_record(cls, kind, values):
+        """
+        Parse an orders.csv row in any of the formats found in the file.
+
+        Args:
+            kind (str): Row kind from OrderRows.classify
+            values: The classified row
+
+        Returns:
+            tuple: The arguments of append() (guest_id, products, total_cost,
+                   reward_points, booking_date, check_in_date, nights,
+                   guest_count), or None if the row is not an order
+        """
+        if kind == 'order':
+            # Rows written by Booking.save_to_csv
+            return (values[1], cls._parse_products(values[6:-2]), float(values[-2]), int(values[-1]),
+                    values[0], values[2], int(values[4]), int(values[5]))
+        if kind == 'bundle':
+            # Rows written by Bundle.save_bundle_order
+            return (values[0], cls._parse_products(values[1:-3]), float(values[-3]), int(values[-2]),
+                    values[-1], None, 0, 0)
+        if kind == 'legacy':
+            order = values
+            nights = int(order['nights'])
+            products = [(order['apartment_id'], nights)]
+            products.extend((item_id, 1) for item_id in order['supplementary_items'].split(", ") if item_id)
+            return (order['guest_id'], products, float(order['total_cost']),
+                    int(order['reward_points_earned']), order['check_in_date'],
+                    order['check_in_date'], nights, int(order['number_of_guests']))
+        return None
+
+    @classmethod
+    def iter_orders(cls, rows):
+        """Yield parse_record() tuples for the orders in a stream of rows, skipping bad rows"""
+        for _, kind, _, values in OrderRows.iter_records(rows):
+            try:
+                order = cls.parse_record(kind, values)
+                if order is not None:
+                    yield order
+            except (ValueError, KeyError, IndexError) as e:
+                log.warning(f"⚠️  Skipping order row: {e}")
+
+    def append_record(self, kind, values):
+        """
+        Add a classified orders.csv row (see OrderRows.classify).
+
+        Returns:
+            bool: True if the row was an order
+        """
+        order = self.parse_record(kind, values)
+        if order is None:
+            return False
+        self.append(*order)
+        return True
+
+    @classmethod
+    def from_rows(cls, rows):
+        """Build a store from orders.csv rows"""
+        store = cls()
+        for order in cls.iter_orders(rows):
+            try:
+                store.append(*order)
+            except ValueError as e:
+                log.warning(f"⚠️  Skipping order row: {e}")
+        return store
+
+    @classmethod
+    def load(cls, filename="orders.csv"):
+        """Return the store for an orders file, rebuilding it only if the file changed"""
+        signature = OrderRows.signature(filename)
+        cached = cls.cache.get(filename)
+        if cached is not None and cached[0] == signature:
+            return cached[1]
+        store = cls.from_rows(OrderJournal.read_rows(filename))
+        cls.cache[filename] = (signature, store)
+        return store
+
+    # Aggregates
+
+    @staticmethod
+    def _column(values):
+        """Zero-copy NumPy view of an array column"""
+        return np.frombuffer(values, dtype=values.typecode) if len(values) else np.zeros(0, values.typecode)
+
+    def _selected(self, ordinals, start=None, end=None):
+        """Positions whose ordinal falls in [start, end], or None for every position"""
+        if start is None and end is None:
+            return None
+        low = to_date_ordinal(start) if start is not None else -1
+        high = to_date_ordinal(end) if end is not None else 1 << 31
+        if np is not None:
+            column = self._column(ordinals)
+            return np.flatnonzero((column >= low) & (column <= high))
+        return [position for position, ordinal in enumerate(ordinals) if low <= ordinal <= high]
+
+    def _group_sum(self, keys, weights, positions=None):
+        """
+        Sum weights per key.
+
+        Args:
+            keys (array): Integer key column
+            weights (array): Column to add up, aligned with keys
+            positions (optional): Only use these positions
+
+        Returns:
+            dict: {key: total} for every key that occurs
+        """
+        if np is not None:
+            key_column = self._column(keys)
+            weight_column = self._column(weights)
+            if positions is not None:
+                key_column = key_column[positions]
+                weight_column = weight_column[positions]
+            if not len(key_column):
+                return {}
+            base = int(key_column.min())
+            totals = np.bincount(key_column - base, weights=weight_column)
+            present = np.flatnonzero(np.bincount(key_column - base))
+            cast = float if weights.typecode == 'd' else int
+            return {base + int(key): cast(totals[key]) for key in present}
+
+        totals = defaultdict(float if weights.typecode == 'd' else int)
+        if positions is None:
+            for key, weight in zip(keys, weights):
+                totals[key] += weight
+        else:
+            for position in positions:
+                totals[keys[position]] += weights[position]
+        return dict(totals)
+
+    def guest_totals(self):
+        """Total spend per guest ID"""
+        return {self.guest_ids[code]: total
+                for code, total in self._group_sum(self.guest_codes, self.total_cost).items()}
+
+    def product_quantities(self):
+        """Total quantity ordered per product ID"""
+        return {self.product_ids[code]: total
+                for code, total in self._group_sum(self.product_codes, self.quantities).items()}
+
+    def summarise(self, k=3):
+        """Totals and top k guests and products, in the shape of OrderStatistics.summarise"""
+        stats = {'guest_totals': self.guest_totals(), 'product_quantities': self.product_quantities()}
+        stats['top_guests'] = OrderStatistics.top_k(stats['guest_totals'], k)
+        stats['top_products'] = OrderStatistics.top_k(stats['product_quantities'], k)
+        return stats
+
+    def monthly_revenue(self, start_date=None, end_date=None, by_check_in=True):
+        """
+        Revenue per month.
+
+        Args:
+            start_date, end_date (optional): Only count orders in this date range (inclusive)
+            by_check_in (bool): Group by check-in month, or by booking month if False
+
+        Returns:
+            dict: {month key: revenue} in month order
+        """
+        ordinals, months = ((self.check_in, self.check_in_month) if by_check_in
+                            else (self.booked_on, self.booked_month))
+        totals = self._group_sum(months, self.total_cost, self._selected(ordinals, start_date, end_date))
+        return dict(sorted(totals.items()))
+
+    def guest_orders(self, guest_id):
+        """Positions of a guest's orders, oldest first"""
+        code = self._guest_lookup.get(guest_id)
+        if code is None:
+            return []
+        if np is not None:
+            positions = np.flatnonzero(self._column(self.guest_codes) == code)
+            order = np.argsort(self._column(self.booked_on)[positions], kind='stable')
+            return positions[order].tolist()
+        positions = [position for position, guest_code in enumerate(self.guest_codes) if guest_code == code]
+        return sorted(positions, key=self.booked_on.__getitem__)
+
+    def order_products(self, position):
+        """(product_id, quantity) pairs of the order at a position"""
+        start, end = self.product_start[position], self.product_start[position + 1]
+        return [(self.product_ids[self.product_codes[index]], self.quantities[index])
+                for index in range(start, end)]
+
+    def product_orders(self, product_id):
+        """Positions of the orders that include a product"""
+        code = self._product_lookup.get(product_id)
+        if code is None:
+            return []
+        if np is not None:
+            entries = np.flatnonzero(self._column(self.product_codes) == code)
+            positions = np.searchsorted(self._column(self.product_start), entries, side='right') - 1
+            return np.unique(positions).tolist()
+        positions = []
+        for index, product_code in enumerate(self.product_codes):
+            if product_code == code:
+                position = bisect.bisect_right(self.product_start, index) - 1
+                if not positions or positions[-1] != position:
+                    positions.append(position)
+        return positions
+
+    def product_statistics(self, product_id, start_date=None, end_date=None):
+        """
+        Booking statistics of one product (typically a bundle), by booking date.
+
+        Returns:
+            dict: total_bookings, total_revenue, average_revenue,
+                  total_reward_points, unique_guests and monthly_distribution
+                  ({month key: bookings})
+        """
+        positions = self.product_orders(product_id)
+        if start_date is not None or end_date is not None:
+            low = to_date_ordinal(start_date) if start_date is not None else -1
+            high = to_date_ordinal(end_date) if end_date is not None else 1 << 31
+            positions = [position for position in positions if low <= self.booked_on[position] <= high]
+
+        if np is not None and positions:
+            costs = self._column(self.total_cost)[positions]
+            months, counts = np.unique(self._column(self.booked_month)[positions], return_counts=True)
+            return {
+                'total_bookings': len(positions),
+                'total_revenue': float(costs.sum()),
+                'average_revenue': float(costs.mean()),
+                'total_reward_points': int(self._column(self.reward_points)[positions].sum()),
+                'unique_guests': len(np.unique(self._column(self.guest_codes)[positions])),
+                'monthly_distribution': dict(zip(months.tolist(), counts.tolist()))
+            }
+
+        total_revenue = sum(self.total_cost[position] for position in positions)
+        monthly_distribution = defaultdict(int)
+        for position in positions:
+            monthly_distribution[self.booked_month[position]] += 1
+        return {
+            'total_bookings': len(positions),
+            'total_revenue': total_revenue,
+            'average_revenue': total_revenue / len(positions) if positions else 0,
+            'total_reward_points': sum(self.reward_points[position] for position in positions),
+            'unique_guests': len({self.guest_codes[position] for position in positions}),
+            'monthly_distribution': dict(sorted(monthly_distribution.items()))
+        }
+
+
+# In[ ]:
+
+
+import tracemalloc
+
+
+def benchmark_booking_memory(count=20000, orders_per_guest=50):
+    """
+    Measure the memory held by a loaded order history.
+
+    Builds `count` bookings from synthetic orders.csv rows with
+    Booking.from_order_row and compares them against the same orders held the
+    old way (a __dict__ per booking, three eager dicts and a dict per line item).
+
+    Args:
+        count (int): Number of bookings to build
+        orders_per_guest (int): Bookings assigned to each synthetic guest row
+
+    Returns:
+        dict: Bytes held by each representation and the saving ratio
+    """
+    if not apartment.availaible_apartments or not Guest.guest_data:
+        records = Records()
+        records.load_catalogue()
+        records.read_guests()
+
+    apartment_ids = list(apartment.availaible_apartments)
+    item_ids = list(supplementary_items.available_supplementary_items)
+    guest_ids = [guest_id for guest_id, guest in Guest.guest_data.items() if isinstance(guest, Guest)]
+    if not apartment_ids or not guest_ids:
+        print("❌ Benchmark needs at least one apartment and one guest loaded")
+        return None
+
+    rows = []
+    for number in range(count):
+        day = number % 28 + 1
+        month = number // orders_per_guest % 12 + 1
+        year = 2020 + number // (orders_per_guest * 12) % 5
+        nights = number % 7 + 1
+        products = [f"{nights} x {apartment_ids[number % len(apartment_ids)]}"]
+        for offset in range(number % 3):
+            products.append(f"{offset + 1} x {item_ids[(number + offset) % len(item_ids)]}")
+        rows.append([f"{day:02d}/{month:02d}/{year}", guest_ids[number // orders_per_guest % len(guest_ids)],
+                     f"{day:02d}/{month:02d}/{year}", f"{day:02d}/{month:02d}/{year}",
+                     str(nights), "2", *products, "0.00", "0"])
+
+    class DictBooking:
+        """The pre-__slots__ layout, kept only for comparison"""
+        def __init__(self, row):
+            self.guest = Guest.guest_data[row[1]]
+            self.current_booking_date = row[0]
+            self.number_of_guests = int(row[5])
+            self.check_in_date = row[2]
+            self.check_out_date = row[3]
+            self.nights = int(row[4])
+            self.apartment_id = None
+            self.reward_points = int(row[-1])
+            self.supplementary_items_for_current_booking = {}
+            self.booked_apartments_for_current_booking = {}
+            self.booking_id = f"BK{row[1]}{row[0]}"
+            self.booking_of_guest = {}
+            self.booking_discount = 0
+            for product in row[6:-2]:
+                quantity, product_id = product.split(' x ')
+                quantity = int(quantity)
+                if product_id.startswith('U'):
+                    self.apartment_id = product_id
+                    rate = apartment.availaible_apartments[product_id].get_price()
+                    self.booked_apartments_for_current_booking[product_id] = {
+                        'booking_date': row[0], 'number_of_guests': self.number_of_guests,
+                        'check_in_date': row[2], 'check_out_date': row[3],
+                        'length_of_stay': self.nights, 'rate_per_night': rate,
+                        'total_cost': rate * self.nights}
+                else:
+                    price = supplementary_items.available_supplementary_items[product_id].get_price()
+                    self.supplementary_items_for_current_booking[product_id] = {
+                        'quantity': quantity, 'price_per_unit': price, 'total_price': quantity * price}
+
+    def measure(build):
+        tracemalloc.start()
+        start = tracemalloc.get_traced_memory()[0]
+        held = build()
+        used = tracemalloc.get_traced_memory()[0] - start
+        tracemalloc.stop()
+        return held, used
+
+    legacy, legacy_bytes = measure(lambda: [DictBooking(row) for row in rows])
+    del legacy
+    # Explicit IDs keep the benchmark from drawing booking numbers (and writing booking_ids.json)
+    compact, compact_bytes = measure(lambda: [Booking.from_order_row(row, f"BENCH{number:06d}")
+                                              for number, row in enumerate(rows)])
+    del compact
+
+    result = {
+        'bookings': count,
+        'dict_bytes': legacy_bytes,
+        'slots_bytes': compact_bytes,
+        'ratio': compact_bytes / legacy_bytes if legacy_bytes else 0.0
+    }
+    print("\nBooking Memory Benchmark")
+    print("=" * 50)
+    print(f"Bookings built:        {count}")
+    print(f"Dict layout:           {legacy_bytes / 1024:,.0f} KiB ({legacy_bytes / count:.0f} B/booking)")
+    print(f"Slots + line items:    {compact_bytes / 1024:,.0f} KiB ({compact_bytes / count:.0f} B/booking)")
+    print(f"✅ Compact layout uses {result['ratio']:.0%} of the dict layout")
+    return result
+
+
+# In[ ]:
+
+
+class EventLog(OrderJournal):
+    """
+    A single append-only CSV of framed, fsync'd event rows.
+
+    Unlike the order journal an event log is its own file and is never
+    compacted, so there is no journal to fold in or recover.
+    """
+
+    filename = None
+    compact_every = 0
+    appends_since_compaction = {}
+
+    @staticmethod
+    def journal_path(filename):
+        return filename
+
+    @classmethod
+    def recover(cls, filename=None):
+        """Event logs are never compacted, so there is nothing to roll back"""
+
+    @classmethod
+    def read_rows(cls, filename=None):
+        """Yield every event, oldest first"""
+        return iter(cls.read_journal(filename or cls.filename))
+
+
+class RewardLedger(EventLog):
+    """
+    Append-only ledger of reward point events with cached balances.
+
+    Every change to a guest's points is one event row:
+
+        timestamp, guest_id, kind, points, reference
+
+    where kind is 'opening' (the balance carried over from guests.csv),
+    'earn', 'redeem', 'expire' or 'adjust', and points is signed. Events are framed
+    and fsync'd like order journal records, but the ledger is never
+    compacted: reward_ledger.csv is the audit trail. `balances` caches the
+    running total of every guest, so reading a balance is a dict lookup;
+    replay() rebuilds the cache from the file and audit() checks it.
+    """
+
+    filename = "reward_ledger.csv"
+    EVENT_KINDS = ('opening', 'earn', 'redeem', 'expire', 'adjust')
+    balances = None     # {guest_id: points} once the ledger has been replayed
+
+    @staticmethod
+    def fold(events):
+        """Sum ledger events into {guest_id: balance}"""
+        balances = defaultdict(int)
+        for _, guest_id, _, points, _ in events:
+            balances[guest_id] += int(points)
+        return dict(balances)
+
+    @classmethod
+    def replay(cls):
+        """Rebuild the cached balances from the ledger file"""
+        cls.balances = cls.fold(cls.read_rows())
+        return cls.balances
+
+    @classmethod
+    def balance(cls, guest_id, opening=0):
+        """
+        Current points of a guest.
+
+        Args:
+            guest_id (str): Guest to look up
+            opening (int): Balance to report if the guest has no ledger events yet
+        """
+        if cls.balances is None:
+            cls.replay()
+        return cls.balances.get(guest_id, opening)
+
+    @classmethod
+    def record(cls, guest, kind, points, reference=""):
+        """
+        Append one event for a guest and update the cached balance.
+
+        The guest's opening balance is written first if this is their first event.
+
+        Args:
+            guest (Guest): Guest whose points change
+            kind (str): 'earn', 'redeem', 'expire' or 'adjust'
+            points (int): Points earned, redeemed or expired (positive) or adjusted (signed)
+            reference (str): Booking ID or note explaining the event
+
+        Returns:
+            int: The new balance
+
+        Raises:
+            ValueError: If the event is invalid or a deduction exceeds the balance
+            OSError: If the event could not be written
+        """
+        return cls.record_batch([(guest, kind, points, reference)])[0]
+
+    @classmethod
+    def prepare_batch(cls, entries, pending=None):
+        """
+        Validate several events and build their ledger rows without writing them.
+
+        Args:
+            entries (list): (guest, kind, points, reference) tuples, as for record()
+            pending (dict, optional): {guest_id: balance} left by earlier entries
+                                      that are not written yet; updated in place
+
+        Returns:
+            tuple: (ledger rows, pending balances, the new balance after each entry)
+
+        Raises:
+            ValueError: If any event is invalid
+        """
+        if cls.balances is None:
+            cls.replay()
+        timestamp = datetime.now().strftime("%d/%m/%Y %H:%M:%S")
+        pending = {} if pending is None else pending
+        events = []
+        results = []
+        for guest, kind, points, reference in entries:
+            if kind not in cls.EVENT_KINDS[1:]:
+                raise ValueError(f"Unknown reward event: {kind}")
+            points = int(points)
+            if kind in ('redeem', 'expire'):
+                points = -abs(points)
+            elif kind == 'earn' and points < 0:
+                raise ValueError("Cannot earn negative points")
+
+            guest_id = guest.get_guest_id()
+            if guest_id in pending:
+                current = pending[guest_id]
+            else:
+                current = cls.balance(guest_id, guest.opening_reward_points)
+                if guest_id not in cls.balances and guest.opening_reward_points:
+                    events.append([timestamp, guest_id, 'opening', guest.opening_reward_points, "guests.csv"])
+            if current + points < 0:
+                raise ValueError("Not enough points available")
+
+            events.append([timestamp, guest_id, kind, points, reference])
+            pending[guest_id] = current + points
+            results.append(current + points)
+        return events, pending, results
+
+    @classmethod
+    def commit_batch(cls, events, pending):
+        """
+        Write rows built by prepare_batch with a single write and fsync.
+
+        Raises:
+            OSError: If the events could not be written
+        """
+        if cls.append_many(events, cls.filename) != len(events):
+            raise OSError("Could not write to the reward ledger")
+        cls.balances.update(pending)
+
+    @classmethod
+    def record_batch(cls, entries):
+        """
+        Append several events with a single write and fsync.
+
+        Args:
+            entries (list): (guest, kind, points, reference) tuples, as for record()
+
+        Returns:
+            list: The new balance after each entry
+
+        Raises:
+            ValueError: If any event is invalid; nothing is written in that case
+            OSError: If the events could not be written
+        """
+        events, pending, results = cls.prepare_batch(entries)
+        cls.commit_batch(events, pending)
+        return results
+
+    @classmethod
+    def history(cls, guest_id):
+        """Return a guest's ledger events, oldest first"""
+        return [event for event in cls.read_rows() if event[1] == guest_id]
+
+    @classmethod
+    def audit(cls):
+        """
+        Replay the ledger and compare it with the cached balances.
+
+        Returns:
+            dict: {guest_id: (cached, replayed)} for every balance that differs
+        """
+        replayed = cls.fold(cls.read_rows())
+        cached = cls.balances or {}
+        return {guest_id: (cached.get(guest_id, 0), replayed.get(guest_id, 0))
+                for guest_id in set(cached) | set(replayed)
+                if cached.get(guest_id, 0) != replayed.get(guest_id, 0)}
+
+
+# In[ ]:
+
+
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+
+
+class RewardBatchJob:
+    """
+    Period-end reward reconciliation for the whole guest base.
+
+    One streaming pass over the orders totals, per guest, the points earned
+    in the period and the points earned before the expiry cutoff. One pass
+    over the reward ledger totals redemptions and expiries. Points expire
+    `expiry_months` after the month they were earned in. Redemptions use up
+    the oldest points first, starting with the opening balance carried over
+    from guests.csv (which never expires on its own); earlier expiries used
+    up earned points only. What expires at the end of the period is
+    whatever was earned before the cutoff and has not been used up yet, so
+    running the job twice for the same period expires nothing more.
+
+    Run from the command line with
+    `--rewards-batch <start dd/mm/yyyy> <end dd/mm/yyyy> [--apply]`
+    (see PythoniaSystem.run_reward_batch).
+
+    When the orders are sharded (e.g. one orders file per year) each shard
+    is summed by a worker process; the per-shard totals are one pair of
+    integers per guest and are added up in the parent.
+    """
+
+    expiry_months = 24
+
+    @staticmethod
+    def accrue_shard(filename, start, end, cutoff):
+        """
+        Sum the points earned per guest in one orders file.
+
+        Args:
+            filename (str): Orders file (its journal is included)
+            start, end (int): Period as date ordinals (inclusive)
+            cutoff (int): Points earned before this ordinal are due to expire
+
+        Returns:
+            dict: {guest_id: [points earned in the period, points earned before cutoff]}
+        """
+        totals = {}
+        ordinals = {}
+        for guest_id, _, _, reward_points, booking_date, *_ in ColumnarOrderStore.iter_orders(
+                OrderJournal.read_rows(filename)):
+            ordinal = ordinals.get(booking_date)
+            if ordinal is None:
+                try:
+                    ordinal = ordinals[booking_date] = to_date_ordinal(booking_date)
+                except ValueError:
+                    continue
+            if ordinal > end:
+                continue
+            entry = totals.get(guest_id)
+            if entry is None:
+                entry = totals[guest_id] = [0, 0]
+            if ordinal >= start:
+                entry[0] += reward_points
+            if ordinal < cutoff:
+                entry[1] += reward_points
+        return totals
+
+    @classmethod
+    def expiry_cutoff(cls, end_date):
+        """First day of the month whose points are still valid at end_date"""
+        end = date.fromordinal(to_date_ordinal(end_date))
+        month_key = end.year * 12 + end.month - 1 - cls.expiry_months
+        return date(month_key // 12, month_key % 12 + 1, 1).toordinal()
+
+    @classmethod
+    def accrue(cls, shards, start, end, cutoff, workers=None):
+        """
+        Sum accrue_shard() over every shard, in a worker pool when there are several.
+
+        Returns:
+            dict: {guest_id: [points earned in the period, points earned before cutoff]}
+        """
+        arguments = (shards, repeat(start), repeat(end), repeat(cutoff))
+        partials = None
+        if len(shards) > 1 and workers != 1:
+            try:
+                with ProcessPoolExecutor(max_workers=workers) as pool:
+                    partials = list(pool.map(cls.accrue_shard, *arguments))
+            except Exception as e:
+                log.warning(f"⚠️  Worker pool unavailable ({e}), processing shards one by one")
+        if partials is None:
+            partials = list(map(cls.accrue_shard, *arguments))
+
+        totals = defaultdict(lambda: [0, 0])
+        for partial in partials:
+            for guest_id, (earned, before_cutoff) in partial.items():
+                entry = totals[guest_id]
+                entry[0] += earned
+                entry[1] += before_cutoff
+        return totals
+
+    @staticmethod
+    def ledger_entry():
+        """Ledger totals of a guest with no events"""
+        return {'opening': 0, 'redeemed': 0, 'expired': 0, 'redeemed_total': 0, 'expired_total': 0}
+
+    @classmethod
+    def ledger_totals(cls, start, end):
+        """
+        Sum the reward ledger per guest.
+
+        Returns:
+            dict: {guest_id: {'opening', 'redeemed', 'expired', 'redeemed_total',
+                  'expired_total'}} where redeemed and expired cover the period
+                  and the totals count every event recorded so far
+        """
+        totals = defaultdict(cls.ledger_entry)
+        for timestamp, guest_id, kind, points, _ in RewardLedger.read_rows():
+            entry = totals[guest_id]
+            points = int(points)
+            if kind == 'opening':
+                entry['opening'] += points
+            elif kind in ('redeem', 'expire'):
+                key = 'redeemed' if kind == 'redeem' else 'expired'
+                entry[f"{key}_total"] -= points
+                if start <= to_date_ordinal(timestamp) <= end:
+                    entry[key] -= points
+        return totals
+
+    @classmethod
+    def run(cls, start_date, end_date, shards=None, workers=None, apply=False):
+        """
+        Compute points earned, redeemed and expired per guest over a period.
+
+        Args:
+            start_date, end_date (str): Period in dd/mm/yyyy format (inclusive)
+            shards (list, optional): Orders files to read; orders.csv if omitted
+            workers (int, optional): Worker processes for sharded orders (1 disables the pool)
+            apply (bool): Record the newly expired points in the reward ledger
+
+        Returns:
+            dict: {guest_id: {'earned', 'redeemed', 'expired', 'expiring', 'balance'}}
+        """
+        start = to_date_ordinal(start_date)
+        end = to_date_ordinal(end_date)
+        cutoff = cls.expiry_cutoff(end)
+        accrued = cls.accrue(list(shards or ["orders.csv"]), start, end, cutoff, workers)
+        ledger = cls.ledger_totals(start, end)
+
+        results = {}
+        expiries = []
+        for guest_id in set(accrued) | set(ledger):
+            earned, before_cutoff = accrued.get(guest_id, (0, 0))
+            events = ledger.get(guest_id) or cls.ledger_entry()
+            guest = Guest.guest_data.get(guest_id)
+            opening = events['opening'] or (guest.opening_reward_points if isinstance(guest, Guest) else 0)
+            balance = RewardLedger.balance(guest_id, opening)
+
+            # Redemptions use up the opening balance first, then the oldest earned
+            # points; earlier expiries only ever took earned points
+            unused_opening = max(0, opening - events['redeemed_total'])
+            unused_old_points = (before_cutoff - max(0, events['redeemed_total'] - opening)
+                                 - events['expired_total'])
+            expiring = max(0, min(unused_old_points, balance - unused_opening))
+            results[guest_id] = {
+                'earned': earned,
+                'redeemed': events['redeemed'],
+                'expired': events['expired'] + expiring,
+                'expiring': expiring,
+                'balance': balance - expiring
+            }
+            if apply and expiring:
+                if isinstance(guest, Guest):
+                    expiries.append((guest, 'expire', expiring, f"expiry to {end_date}"))
+                else:
+                    log.warning(f"⚠️  Guest {guest_id} is not loaded; {expiring} points not expired")
+
+        if expiries:
+            RewardLedger.record_batch(expiries)
+            log.info(f"✅ Expired points recorded for {len(expiries)} guests")
+        return results
+
+    @staticmethod
+    def write_report(results, filename="reward_reconciliation.csv"):
+        """Write run() results as CSV, one guest per row"""
+        try:
+            with open(filename, 'w', newline='', encoding='utf-8') as file:
+                writer = csv.writer(file)
+                writer.writerow(['guest_id', 'earned', 'redeemed', 'expired', 'balance'])
+                for guest_id, totals in sorted(results.items()):
+                    writer.writerow([guest_id, totals['earned'], totals['redeemed'],
+                                     totals['expired'], totals['balance']])
+            log.info(f"✅ Reward reconciliation saved to {filename}")
+            return True
+        except Exception as e:
+            log.error(f"❌ Error writing reward reconciliation: {e}")
+            return False
+
+
+# In[ ]:
+
+
+import itertools
+import time
+
+
+class BookingError(ValueError):
+    """A booking request that breaks one of the booking rules"""
+
+
+class CancellationLog(EventLog):
+    """
+    Append-only log of cancelled bookings.
+
+    Each row is: timestamp, booking_id, guest_id, reason. Cancelled bookings
+    stay in orders.csv (which is append-only), so load_orders skips every
+    booking listed here.
+    """
+
+    filename = "cancellations.csv"
+    cancelled = None    # set of booking IDs once the log has been read
+
+    @classmethod
+    def booking_ids(cls):
+        """Return the IDs of every cancelled booking"""
+        if cls.cancelled is None:
+            cls.cancelled = {row[1] for row in cls.read_rows() if len(row) > 1}
+        return cls.cancelled
+
+    @classmethod
+    def record(cls, booking_id, guest_id, reason=""):
+        """
+        Log a cancelled booking.
+
+        Raises:
+            OSError: If the cancellation could not be written
+        """
+        timestamp = datetime.now().strftime("%d/%m/%Y %H:%M:%S")
+        if cls.append_many([[timestamp, booking_id, guest_id, reason]], cls.filename) != 1:
+            raise OSError("Could not write to the cancellation log")
+        cls.booking_ids().add(booking_id)
+
+
+class BookingEngine:
+    """
+    Non-interactive booking API.
+
+    Requests are plain dicts and every call returns a dict with a 'status'
+    of 'quoted', 'held', 'confirmed', 'cancelled' or 'rejected' (with an
+    'error' message). A booking request has:
+
+        guest_id          Existing guest ID
+        apartment_id      Apartment unit to book
+        check_in          'dd/mm/yyyy', 'dd/mm/yyyy HH:MM', date or datetime
+        check_out         As check_in
+        number_of_guests  Guests staying, including those on extra beds
+        items             Optional {item_id: quantity}; for the car park the
+                          quantity is cars per night
+        redeem_points     Optional reward points to redeem
+        booking_date      Optional, defaults to now
+
+    The rules are the ones the booking menu has always applied: stays of 1
+    to 7 nights starting after the booking date, at most capacity + 4
+    guests with one double extra bed per 2 extra guests per night, and
+    points redeemed in multiples of 100.
+
+    hold() reserves the apartment in the AvailabilityIndex for
+    `hold_seconds` so a quote cannot be sold twice while the guest decides;
+    confirm() turns the hold into a saved booking.
+    """
+
+    hold_seconds = 900
+    max_nights = 7
+    max_extra_guests = 4
+    redeem_step = 100
+    extra_bed_item = 'SI6'
+    car_park_item = 'SI1'
+    DATE_FORMATS = ("%d/%m/%Y %H:%M", "%d/%m/%Y", "%Y-%m-%d")
+
+    def __init__(self, records):
+        """
+        Args:
+            records (Records): Records holding the guests and bookings
+        """
+        self.records = records
+        self.holds = {}     # hold_id -> {'quote': dict, 'guest': Guest, 'expires': monotonic time}
+        self._hold_ids = itertools.count(1)
+        self.lock = threading.RLock()
+
+    # Validation and pricing rules
+
+    @classmethod
+    def parse_datetime(cls, value, field="date"):
+        """Parse a request date into a datetime"""
+        if isinstance(value, datetime):
+            return value
+        if isinstance(value, date):
+            return datetime(value.year, value.month, value.day)
+        for date_format in cls.DATE_FORMATS:
+            try:
+                return datetime.strptime(str(value).strip(), date_format)
+            except ValueError:
+                continue
+        raise BookingError(f"Invalid {field}: {value!r} (use dd/mm/yyyy or dd/mm/yyyy HH:MM)")
+
+    @classmethod
+    def validate_stay(cls, check_in, check_out, booked_at):
+        """
+        Check a stay against the booking date rules.
+
+        Args:
+            check_in (datetime): Check-in date and time
+            check_out (datetime): Check-out date and time
+            booked_at (datetime): When the booking is made
+
+        Returns:
+            int: Number of nights
+
+        Raises:
+            BookingError: If the dates break a rule
+        """
+        if check_in < booked_at:
+            raise BookingError("Check-in date and time must be in the future")
+        if check_out <= check_in:
+            raise BookingError("Check-out date must be after the check-in date")
+        if check_out.date() == check_in.date():
+            raise BookingError("Check-in date cannot be the same as the check-out date")
+        nights = (check_out.date() - check_in.date()).days
+        if nights > cls.max_nights:
+            raise BookingError(f"You have to book for at least one day and at most {cls.max_nights} days")
+        return nights
+
+    @classmethod
+    def extra_beds_needed(cls, apartment_id, number_of_guests):
+        """
+        Number of double extra beds a stay needs per night.
+
+        Raises:
+            BookingError: If the apartment does not exist or cannot hold the guests
+        """
+        if apartment_id not in apartment.availaible_apartments:
+            raise BookingError(f"Apartment {apartment_id} does not exist")
+        capacity = apartment.availaible_apartments[apartment_id].get_capacity()
+        max_capacity = capacity + cls.max_extra_guests
+        if not 1 <= number_of_guests <= max_capacity:
+            raise BookingError(f"Number of guests must be between 1 and {max_capacity} for {apartment_id}")
+        return (max(0, number_of_guests - capacity) + 1) // 2
+
+    @classmethod
+    def item_quantity(cls, item_id, quantity, nights):
+        """
+        Units of a supplementary item to charge for a stay.
+
+        Raises:
+            BookingError: If the item does not exist or the quantity is not positive
+        """
+        if item_id not in supplementary_items.available_supplementary_items:
+            raise BookingError(f"Supplementary item {item_id} does not exist")
+        quantity = int(quantity)
+        if quantity <= 0:
+            raise BookingError(f"Quantity for {item_id} must be a positive number")
+        # The car park is booked per car per night
+        return quantity * nights if item_id == cls.car_park_item else quantity
+
+    @classmethod
+    def redemption_discount(cls, guest, points):
+        """
+        Discount earned by redeeming reward points.
+
+        Raises:
+            BookingError: If the points cannot be redeemed
+        """
+        if not points:
+            return 0.0
+        if points < cls.redeem_step or points % cls.redeem_step:
+            raise BookingError(f"Points must be redeemed in multiples of {cls.redeem_step}")
+        balance = guest.get_total_reward_points_earned()
+        if points > balance:
+            raise BookingError(f"Not enough points available (balance {balance})")
+        return points * guest.get_redeem_rate() / 100
+
+    @staticmethod
+    def _line(product, quantity):
+        """One priced line of a quote"""
+        return {
+            'product_id': product.get_id(),
+            'name': product.get_name(),
+            'quantity': quantity,
+            'unit_price': product.get_price(),
+            'cost': round(product.get_price() * quantity, 2)
+        }
+
+    @staticmethod
+    def _rejected(error):
+        return {'status': 'rejected', 'error': str(error)}
+
+    def price_request(self, request):
+        """
+        Validate a booking request and price it.
+
+        Returns:
+            tuple: (quote, Guest)
+
+        Raises:
+            BookingError: If the request breaks a booking rule
+        """
+        self.records.ensure_orders_loaded()
+        guest = self.records.find_guest(str(request.get('guest_id', '')))
+        if guest is None:
+            raise BookingError(f"Guest {request.get('guest_id')!r} not found")
+
+        booked_at = self.parse_datetime(request.get('booking_date') or datetime.now(), "booking date")
+        check_in = self.parse_datetime(request.get('check_in'), "check-in date")
+        check_out = self.parse_datetime(request.get('check_out'), "check-out date")
+        nights = self.validate_stay(check_in, check_out, booked_at)
+
+        apartment_id = request.get('apartment_id')
+        number_of_guests = int(request.get('number_of_guests', 1))
+        extra_beds = self.extra_beds_needed(apartment_id, number_of_guests)
+        if not AvailabilityIndex.is_available(apartment_id, check_in, check_out):
+            raise BookingError(f"Apartment {apartment_id} is already booked for these dates")
+
+        lines = [self._line(apartment.availaible_apartments[apartment_id], nights)]
+        quantities = {}
+        if extra_beds:
+            quantities[self.extra_bed_item] = extra_beds * nights
+        for item_id, quantity in (request.get('items') or {}).items():
+            quantities[item_id] = quantities.get(item_id, 0) + self.item_quantity(item_id, quantity, nights)
+        for item_id, quantity in quantities.items():
+            lines.append(self._line(supplementary_items.available_supplementary_items[item_id], quantity))
+
+        subtotal = round(sum(line['cost'] for line in lines), 2)
+        points_redeemed = int(request.get('redeem_points') or 0)
+        discount = self.redemption_discount(guest, points_redeemed)
+        if discount > subtotal:
+            raise BookingError("Discount cannot exceed the booking total")
+        total = round(subtotal - discount, 2)
+
+        quote = {
+            'status': 'quoted',
+            'guest_id': guest.get_guest_id(),
+            'apartment_id': apartment_id,
+            'check_in': check_in.strftime("%d/%m/%Y %H:%M"),
+            'check_out': check_out.strftime("%d/%m/%Y %H:%M"),
+            'booking_date': booked_at.strftime("%d/%m/%Y %H:%M"),
+            'nights': nights,
+            'number_of_guests': number_of_guests,
+            'extra_beds': extra_beds,
+            'lines': lines,
+            'subtotal': subtotal,
+            'points_redeemed': points_redeemed,
+            'discount': round(discount, 2),
+            'total': total,
+            'reward_points': round(total * guest.get_reward_rate() / 100)
+        }
+        return quote, guest
+
+    # Public API
+
+    def quote(self, request):
+        """
+        Price a booking request without reserving anything.
+
+        Returns:
+            dict: The priced quote, or a rejection
+        """
+        try:
+            return self.price_request(request)[0]
+        except Exception as e:
+            return self._rejected(e)
+
+    def expire_holds(self):
+        """Release every hold past its expiry time"""
+        with self.lock:
+            now = time.monotonic()
+            for hold_id in [hold_id for hold_id, hold in self.holds.items() if hold['expires'] <= now]:
+                self._release(hold_id)
+
+    def _release(self, hold_id):
+        hold = self.holds.pop(hold_id)
+        quote = hold['quote']
+        AvailabilityIndex.remove_stay(quote['apartment_id'], quote['check_in'], quote['check_out'], hold_id)
+        return hold
+
+    def hold(self, request):
+        """
+        Quote a request and reserve the apartment until the hold expires.
+
+        Returns:
+            dict: The quote with 'status': 'held', 'hold_id' and 'expires_in'
+                  (seconds), or a rejection
+        """
+        with self.lock:
+            try:
+                self.expire_holds()
+                quote, guest = self.price_request(request)
+                hold_id = f"HOLD{next(self._hold_ids):06d}"
+                if not AvailabilityIndex.add_stay(quote['apartment_id'], quote['check_in'],
+                                                  quote['check_out'], hold_id):
+                    raise BookingError(f"Apartment {quote['apartment_id']} is already booked for these dates")
+                self.holds[hold_id] = {'quote': quote, 'guest': guest,
+                                       'expires': time.monotonic() + self.hold_seconds}
+                return dict(quote, status='held', hold_id=hold_id, expires_in=self.hold_seconds)
+            except Exception as e:
+                return self._rejected(e)
+
+    def build_booking(self, quote, guest):
+        """Turn a quote into a Booking with its line items, discount and points"""
+        booking = Booking(guest, quote['check_in'], quote['check_out'], quote['booking_date'],
+                          quote['number_of_guests'], quote['nights'], quote['apartment_id'])
+        apartment_line, *item_lines = quote['lines']
+        booking.add_apartment_line(quote['apartment_id'], apartment_line['unit_price'])
+        for line in item_lines:
+            booking.add_supplementary_line(line['product_id'], line['quantity'], line['unit_price'])
+        booking.booking_discount = quote['discount']
+        booking.discount_applied = quote['discount']
+        booking.points_redeemed = quote['points_redeemed']
+        booking.reward_points = quote['reward_points']
+        return booking
+
+    def confirm(self, hold_id):
+        """
+        Turn a hold into a confirmed, saved booking.
+
+        Redeemed and earned points are written to the reward ledger together
+        once the booking has been saved.
+
+        Returns:
+            dict: 'status': 'confirmed' with the booking_id, total,
+                  reward_points and the guest's new reward_balance, or a rejection
+        """
+        with self.lock:
+            try:
+                self.expire_holds()
+                if hold_id not in self.holds:
+                    raise BookingError(f"Hold {hold_id} not found or expired")
+                hold = self._release(hold_id)
+                quote, guest = hold['quote'], hold['guest']
+                booking = self.build_booking(quote, guest)
+
+                if not AvailabilityIndex.add_booking(booking):
+                    raise BookingError(f"Apartment {quote['apartment_id']} is already booked for these dates")
+                OrderStatistics.record_booking(booking)
+                if not self.records.save_booking(booking):
+                    AvailabilityIndex.remove_booking(booking)
+                    OrderStatistics.remove_booking(booking)
+                    self.records.delete_booking(booking.booking_id)
+                    raise BookingError("The booking could not be saved")
+                Booking.add_to_registry(booking)
+                guest.add_booking_to_history(booking)
+
+                entries = []
+                if quote['points_redeemed']:
+                    entries.append((guest, 'redeem', quote['points_redeemed'], booking.booking_id))
+                if quote['reward_points']:
+                    entries.append((guest, 'earn', quote['reward_points'], booking.booking_id))
+                if entries:
+                    RewardLedger.record_batch(entries)
+
+                return {
+                    'status': 'confirmed',
+                    'booking_id': booking.booking_id,
+                    'guest_id': quote['guest_id'],
+                    'total': quote['total'],
+                    'reward_points': quote['reward_points'],
+                    'reward_balance': guest.get_total_reward_points_earned()
+                }
+            except Exception as e:
+                return self._rejected(e)
+
+    def cancel(self, reference, reason=""):
+        """
+        Release a hold or cancel a confirmed booking.
+
+        Cancelling a booking frees the apartment, takes it out of the
+        statistics and reverses its reward points. Points already spent
+        elsewhere are clawed back only down to a zero balance.
+
+        Args:
+            reference (str): Hold ID or booking ID
+            reason (str): Note recorded in the cancellation log
+
+        Returns:
+            dict: 'status': 'cancelled', or a rejection
+        """
+        self.records.ensure_orders_loaded()
+        with self.lock:
+            try:
+                if reference in self.holds:
+                    self._release(reference)
+                    return {'status': 'cancelled', 'hold_id': reference}
+
+                booking = self.records.bookings.get(reference) or Booking.get_registered_booking(reference)
+                if booking is None:
+                    raise BookingError(f"Booking {reference} not found")
+                guest = booking.guest
+                guest_id = getattr(guest, 'guest_id', guest)
+
+                CancellationLog.record(reference, guest_id, reason)
+                AvailabilityIndex.remove_booking(booking)
+                OrderStatistics.remove_booking(booking)
+                self.records.delete_booking(reference)
+                Booking.remove_from_registry(reference)
+
+                if isinstance(guest, Guest):
+                    guest.booking_history_of_guest.pop(reference, None)
+                    earned = booking.get_reward_points_for_this_booking()
+                    redeemed = getattr(booking, 'points_redeemed', 0)
+                    adjustment = max(redeemed - earned, -guest.get_total_reward_points_earned())
+                    if adjustment:
+                        RewardLedger.record(guest, 'adjust', adjustment, f"cancelled {reference}")
+
+                return {'status': 'cancelled', 'booking_id': reference, 'guest_id': guest_id}
+            except Exception as e:
+                return self._rejected(e)
+
+
+# In[ ]:
+
+
+class BulkBookingImporter:
+    """
+    Streaming import of block bookings from a CSV or JSONL file.
+
+    Each record is a booking engine request (see BookingEngine). CSV files
+    need a header row naming the request fields; their items column holds
+    entries such as "2 x SI2; 1 x SI5" or "SI2:2; SI5:1". JSONL files hold
+    one request object per line.
+
+    Records are validated one at a time as they are read, so memory does
+    not grow with the size of the file. An accepted booking takes its stay
+    in the AvailabilityIndex straight away, so later records in the same
+    file are checked against it too. Accepted bookings are saved
+    `batch_size` at a time, as one append to the orders file and one write
+    to the reward ledger per batch. Rejected records are listed with their
+    line number and reason in a rejections report.
+    """
+
+    batch_size = 500
+    REPORT_HEADER = ['line', 'error', 'record']
+
+    def __init__(self, engine, orders_file="orders.csv"):
+        """
+        Args:
+            engine (BookingEngine): Engine used to validate and price each record
+            orders_file (str): Orders file the bookings are appended to
+        """
+        self.engine = engine
+        self.records = engine.records
+        self.orders_file = orders_file
+
+    @staticmethod
+    def parse_items(text):
+        """
+        Parse an items column into {item_id: quantity}.
+
+        Raises:
+            BookingError: If an entry cannot be read
+        """
+        items = {}
+        for entry in str(text or "").replace(',', ';').split(';'):
+            entry = entry.strip()
+            if not entry:
+                continue
+            try:
+                if ' x ' in entry:
+                    quantity, item_id = entry.split(' x ')
+                else:
+                    item_id, quantity = entry.split(':')
+                item_id = item_id.strip().upper()
+                items[item_id] = items.get(item_id, 0) + int(quantity)
+            except ValueError:
+                raise BookingError(f"Invalid item entry: {entry!r}")
+        return items
+
+    @classmethod
+    def read_requests(cls, filename):
+        """
+        Stream the records of an import file.
+
+        Yields:
+            tuple: (line number, request dict or the Exception raised reading it)
+        """
+        with open(filename, 'r', newline='', encoding='utf-8') as file:
+            if filename.lower().endswith(('.jsonl', '.json')):
+                for line_number, line in enumerate(file, 1):
+                    if not line.strip():
+                        continue
+                    try:
+                        request = json.loads(line)
+                        if not isinstance(request, dict):
+                            raise ValueError("expected a JSON object")
+                        yield line_number, request
+                    except ValueError as e:
+                        yield line_number, e
+            else:
+                reader = csv.DictReader(file, skipinitialspace=True)
+                for row in reader:
+                    try:
+                        request = {key.strip(): value for key, value in row.items() if key}
+                        request['items'] = cls.parse_items(request.get('items'))
+                        yield reader.line_num, request
+                    except BookingError as e:
+                        yield reader.line_num, e
+
+    def _accept(self, request, pending_points):
+        """Validate one request and reserve its stay; returns the Booking"""
+        quote, guest = self.engine.price_request(request)
+
+        # Points redeemed earlier in the batch are not in the ledger yet
+        guest_id = guest.get_guest_id()
+        pending = pending_points.get(guest_id, 0)
+        if quote['points_redeemed'] > guest.get_total_reward_points_earned() + pending:
+            raise BookingError("Not enough points available")
+
+        booking = self.engine.build_booking(quote, guest)
+        if not AvailabilityIndex.add_booking(booking):
+            raise BookingError(f"Apartment {quote['apartment_id']} is already booked for these dates")
+        pending_points[guest_id] = pending + quote['reward_points'] - quote['points_redeemed']
+        return booking
+
+    def _flush(self, batch, pending_points, rejections):
+        """
+        Save a batch of accepted bookings and their reward point events.
+
+        The reward events are validated against the ledger before anything
+        is written; a booking whose events the ledger would refuse is
+        rejected and its stay released, so no booking is saved without its
+        points.
+
+        Returns:
+            int: Number of bookings saved
+        """
+        pending_points.clear()
+        accepted = []
+        events = []
+        balances = {}
+        for line_number, booking in batch:
+            entries = []
+            if booking.points_redeemed:
+                entries.append((booking.guest, 'redeem', booking.points_redeemed, booking.booking_id))
+            if booking.reward_points:
+                entries.append((booking.guest, 'earn', booking.reward_points, booking.booking_id))
+            try:
+                rows, balances, _ = RewardLedger.prepare_batch(entries, dict(balances))
+            except ValueError as e:
+                AvailabilityIndex.remove_booking(booking)
+                rejections.append([line_number, str(e), booking.booking_id])
+                continue
+            accepted.append((line_number, booking))
+            events.extend(rows)
+        if not accepted:
+            return 0
+
+        bookings = [booking for _, booking in accepted]
+        if self.records.save_bookings(bookings, self.orders_file) != len(bookings):
+            for line_number, booking in accepted:
+                AvailabilityIndex.remove_booking(booking)
+                rejections.append([line_number, "The booking could not be saved", booking.booking_id])
+            return 0
+
+        for booking in bookings:
+            OrderStatistics.record_booking(booking)
+            Booking.add_to_registry(booking)
+            booking.guest.add_booking_to_history(booking)
+        if events:
+            RewardLedger.commit_batch(events, balances)
+        return len(bookings)
+
+    def write_report(self, rejections, report_file):
+        """Write the rejected records to a CSV report"""
+        with open(report_file, 'w', newline='', encoding='utf-8') as file:
+            writer = csv.writer(file)
+            writer.writerow(self.REPORT_HEADER)
+            writer.writerows(rejections)
+
+    def run(self, filename, report_file=None):
+        """
+        Import every booking in a file.
+
+        Args:
+            filename (str): CSV or JSONL file of booking requests
+            report_file (str, optional): Where to write rejected records;
+                                         defaults to <filename>.rejections.csv
+
+        Returns:
+            dict: {'imported': int, 'rejected': int, 'batches': int,
+                   'report_file': str or None}
+        """
+        log.info("\nBulk Booking Import")
+        log.info("=" * 50)
+        report_file = report_file or f"{filename}.rejections.csv"
+        batch = []
+        pending_points = {}
+        rejections = []
+        imported = 0
+        batches = 0
+
+        with self.engine.lock:
+            for line_number, request in self.read_requests(filename):
+                try:
+                    if isinstance(request, Exception):
+                        raise request
+                    batch.append((line_number, self._accept(request, pending_points)))
+                except Exception as e:
+                    record = "" if isinstance(request, Exception) else json.dumps(request, default=str)
+                    rejections.append([line_number, str(e), record])
+                    continue
+                if len(batch) >= self.batch_size:
+                    imported += self._flush(batch, pending_points, rejections)
+                    batches += 1
+                    batch = []
+            if batch:
+                imported += self._flush(batch, pending_points, rejections)
+                batches += 1
+
+        if rejections:
+            self.write_report(rejections, report_file)
+            log.warning(f"⚠️  Rejected {len(rejections)} record(s); see {report_file}")
+        log.info(f"✅ Imported {imported} booking(s) in {batches} batch(es)")
+        return {'imported': imported, 'rejected': len(rejections), 'batches': batches,
+                'report_file': report_file if rejections else None}
+
+
+# In[ ]:
+
+
+import asyncio
+import functools
+import re
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+from urllib.parse import parse_qs, urlsplit
+
+
+class BookingService:
+    """
+    HTTP/JSON front end to the booking engine, on stdlib asyncio streams.
+
+    Endpoints:
+
+        GET    /availability?check_in=&check_out=&guests=   Free apartments
+        POST   /quote                                      Price a request
+        POST   /holds                                      Quote and hold
+        POST   /holds/<hold_id>/confirm                    Confirm a hold
+        POST   /bookings                                   Hold and confirm
+        DELETE /bookings/<booking_id>                      Cancel a booking
+        GET    /guests/<guest_id>                          Guest details
+        GET    /statistics?k=3                             Top guests and products
+
+    Request bodies are BookingEngine requests. The event loop only parses
+    and routes requests: every engine call runs on a thread pool, so a slow
+    fsync in save_to_csv or the reward ledger never stalls other
+    connections. Engine calls are serialised by the engine lock, and the
+    in-memory lookups take the same lock so they never see a half-applied
+    booking. Connections are kept alive between requests.
+    """
+
+    max_body_size = 1024 * 1024
+    ROUTES = [
+        ('GET', re.compile(r'^/availability$'), 'get_availability'),
+        ('POST', re.compile(r'^/quote$'), 'post_quote'),
+        ('POST', re.compile(r'^/holds$'), 'post_hold'),
+        ('POST', re.compile(r'^/holds/(?P<hold_id>[^/]+)/confirm$'), 'post_confirm'),
+        ('POST', re.compile(r'^/bookings$'), 'post_booking'),
+        ('DELETE', re.compile(r'^/bookings/(?P<booking_id>[^/]+)$'), 'delete_booking'),
+        ('GET', re.compile(r'^/guests/(?P<guest_id>[^/]+)$'), 'get_guest'),
+        ('GET', re.compile(r'^/statistics$'), 'get_statistics'),
+    ]
+
+    def __init__(self, engine, host="127.0.0.1", port=8080, workers=8):
+        """
+        Args:
+            engine (BookingEngine): Engine serving the requests
+            host (str): Interface to listen on
+            port (int): Port to listen on
+            workers (int): Threads running engine calls and file I/O
+        """
+        self.engine = engine
+        self.records = engine.records
+        self.host = host
+        self.port = port
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="pythonia")
+
+    async def run_blocking(self, function, *args):
+        """Run a blocking call on the worker threads"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, functools.partial(function, *args))
+
+    def _locked(self, function, *args):
+        with self.engine.lock:
+            return function(*args)
+
+    @staticmethod
+    def _engine_status(result, success=HTTPStatus.OK):
+        """HTTP status for an engine result"""
+        return (HTTPStatus.UNPROCESSABLE_ENTITY if result['status'] == 'rejected' else success), result
+
+    # Handlers: each returns (HTTPStatus, JSON-serialisable payload)
+
+    async def get_availability(self, query, body):
+        try:
+            check_in = BookingEngine.parse_datetime(query.get('check_in'), "check-in date")
+            check_out = BookingEngine.parse_datetime(query.get('check_out'), "check-out date")
+            guests = int(query.get('guests', 1))
+        except ValueError as e:
+            return HTTPStatus.BAD_REQUEST, {'error': str(e)}
+        await self.run_blocking(self.records.ensure_orders_loaded)
+        results = await self.run_blocking(self._locked, AvailabilityIndex.search_available,
+                                          check_in, check_out, guests)
+        return HTTPStatus.OK, {'apartments': results}
+
+    async def post_quote(self, query, body):
+        return self._engine_status(await self.run_blocking(self.engine.quote, body))
+
+    async def post_hold(self, query, body):
+        return self._engine_status(await self.run_blocking(self.engine.hold, body), HTTPStatus.CREATED)
+
+    async def post_confirm(self, query, body, hold_id):
+        return self._engine_status(await self.run_blocking(self.engine.confirm, hold_id), HTTPStatus.CREATED)
+
+    async def post_booking(self, query, body):
+        held = await self.run_blocking(self.engine.hold, body)
+        if held['status'] == 'rejected':
+            return self._engine_status(held)
+        return await self.post_confirm(query, body, held['hold_id'])
+
+    async def delete_booking(self, query, body, booking_id):
+        return self._engine_status(await self.run_blocking(self.engine.cancel, booking_id, body.get('reason', "")))
+
+    def _guest_details(self, guest_id):
+        guest = self.records.find_guest(guest_id)
+        if guest is None:
+            return None
+        return {
+            'guest_id': guest.get_guest_id(),
+            'name': guest.get_full_name(),
+            'reward_points': guest.get_total_reward_points_earned(),
+            'reward_rate': guest.get_reward_rate(),
+            'redeem_rate': guest.get_redeem_rate(),
+            'bookings': self.records.count_guest_bookings(guest.get_guest_id())
+        }
+
+    async def get_guest(self, query, body, guest_id):
+        details = await self.run_blocking(self._locked, self._guest_details, guest_id)
+        if details is None:
+            return HTTPStatus.NOT_FOUND, {'error': f"Guest {guest_id} not found"}
+        return HTTPStatus.OK, details
+
+    async def get_statistics(self, query, body):
+        try:
+            k = int(query.get('k', 3))
+            if k < 1:
+                raise ValueError("k must be at least 1")
+        except ValueError as e:
+            return HTTPStatus.BAD_REQUEST, {'error': str(e)}
+        await self.run_blocking(self.records.ensure_orders_loaded)
+        stats = await self.run_blocking(self._locked, OrderStatistics.report, k,
+                                        self.records.iter_statistics_records)
+        return HTTPStatus.OK, {'top_guests': stats['top_guests'], 'top_products': stats['top_products']}
+
+    # HTTP plumbing
+
+    async def dispatch(self, method, target, body):
+        """Route one request; returns (HTTPStatus, payload)"""
+        url = urlsplit(target)
+        query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        try:
+            body = json.loads(body) if body else {}
+            if not isinstance(body, dict):
+                raise ValueError("expected a JSON object")
+        except ValueError as e:
+            return HTTPStatus.BAD_REQUEST, {'error': f"Invalid JSON body: {e}"}
+
+        allowed = False
+        for route_method, pattern, handler in self.ROUTES:
+            match = pattern.match(url.path)
+            if not match:
+                continue
+            if route_method != method:
+                allowed = True
+                continue
+            try:
+                return await getattr(self, handler)(query, body, **match.groupdict())
+            except Exception as e:
+                log.error(f"❌ Error handling {method} {url.path}: {e}")
+                return HTTPStatus.INTERNAL_SERVER_ERROR, {'error': str(e)}
+        if allowed:
+            return HTTPStatus.METHOD_NOT_ALLOWED, {'error': f"{method} not allowed on {url.path}"}
+        return HTTPStatus.NOT_FOUND, {'error': f"No endpoint at {url.path}"}
+
+    @staticmethod
+    def _response(status, payload, keep_alive):
+        body = json.dumps(payload, default=str).encode('utf-8')
+        head = (f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+                f"Content-Type: application/json\r\n"
+                f"Content-Length: {len(body)}\r\n"
+                f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+        return head.encode('latin-1') + body
+
+    async def handle_connection(self, reader, writer):
+        """Serve the requests of one connection until it closes"""
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    break
+                method, target, version = request_line.decode('latin-1').split()
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+
+                length = int(headers.get('content-length') or 0)
+                if length > self.max_body_size:
+                    writer.write(self._response(HTTPStatus.REQUEST_ENTITY_TOO_LARGE,
+                                                {'error': "Request body too large"}, False))
+                    await writer.drain()
+                    break
+                body = await reader.readexactly(length) if length else b''
+
+                status, payload = await self.dispatch(method.upper(), target, body)
+                keep_alive = (version == 'HTTP/1.1' and headers.get('connection', '').lower() != 'close')
+                writer.write(self._response(status, payload, keep_alive))
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self):
+        """Accept connections until cancelled"""
+        server = await asyncio.start_server(self.handle_connection, self.host, self.port)
+        log.info(f"✅ Booking service listening on http://{self.host}:{self.port}")
+        async with server:
+            await server.serve_forever()
+
+    def serve_forever(self):
+        """Run the service in the current thread until interrupted"""
+        try:
+            asyncio.run(self.serve())
+        except KeyboardInterrupt:
+            log.info("\nℹ️  Booking service stopped")
+        finally:
+            self.executor.shutdown(wait=True)
+
+
+# In[ ]:
+
+
+class ParallelOrderLoader:
+    """
+    Cold-start loader that parses orders.csv on every core.
+
+    The snapshot file is split into byte ranges on line boundaries and
+    each range is parsed in a ProcessPoolExecutor worker. A worker sends
+    back plain tuples (see Booking.parse_order_row), so only compact
+    parsed rows cross the process boundary. The parent then
+    walks the chunks in file order, followed by the rows still in the
+    order journal, and hands each record to Records._apply_order_record,
+    the step Records.load_orders uses too: same position-based IDs for
+    rows without a stored booking ID, same handling of legacy header rows
+    and cancelled bookings.
+
+    Order rows never contain line breaks, which is what makes splitting
+    on line boundaries safe. Whether the rows of a chunk carry booking IDs
+    depends on the OrderRows.HEADER row above them, so its offset is found
+    before the file is split. Bundle rows written by save_bundle_order are
+    not bookings and are skipped.
+    """
+
+    min_chunk_size = 1 << 20    # Smaller files are parsed in one chunk
+
+    @classmethod
+    def split(cls, filename, chunks):
+        """
+        Split a file into about `chunks` byte ranges.
+
+        Returns:
+            list: (start, end) offsets; a range owns every line starting inside it
+        """
+        size = os.path.getsize(filename) if os.path.exists(filename) else 0
+        if not size:
+            return []
+        chunk_size = max(cls.min_chunk_size, -(-size // max(1, chunks)))
+        return [(start, min(start + chunk_size, size)) for start in range(0, size, chunk_size)]
+
+    @staticmethod
+    def parse_rows(rows, with_ids=False):
+        """
+        Parse order rows into compact records.
+
+        Args:
+            rows (iterable): Rows of one chunk
+            with_ids (bool): An OrderRows.HEADER row comes before the chunk
+
+        Returns:
+            tuple: (number of rows, [(index, kind, data), ...]) where kind is
+                   'order' (data from Booking.parse_order_row), 'header' (the
+                   header row), 'legacy' (the raw row) or 'error' (the error
+                   message)
+        """
+        reader = OrderRows(with_ids)
+        parsed = []
+        count = 0
+        for index, row in enumerate(rows):
+            count += 1
+            try:
+                kind, booking_id, values = reader.classify(row)
+                if kind == 'order':
+                    parsed.append((index, 'order', Booking.parse_order_row(values, booking_id)))
+                elif kind == 'header':
+                    parsed.append((index, 'header', row))
+                elif kind != 'bundle':
+                    # The legacy header may be in an earlier chunk
+                    parsed.append((index, 'legacy', row))
+            except (ValueError, IndexError) as e:
+                parsed.append((index, 'error', str(e)))
+        return count, parsed
+
+    @classmethod
+    def parse_chunk(cls, filename, start, end, with_ids=False):
+        """Parse the rows starting inside one byte range (runs in a worker process)"""
+        lines = []
+        with open(filename, 'rb') as file:
+            if start:
+                # Skip the rest of the line that began in the previous range
+                file.seek(start - 1)
+                file.readline()
+            while file.tell() < end:
+                line = file.readline()
+                if not line:
+                    break
+                lines.append(line.decode('utf-8'))
+        return cls.parse_rows((row for row in csv.reader(lines) if row), with_ids)
+
+    @classmethod
+    def parse(cls, filename="orders.csv", workers=None):
+        """
+        Parse the snapshot in parallel, falling back to one process on failure.
+
+        Returns:
+            list: (number of rows, records) per chunk, in file order, with
+                  the order journal last
+        """
+        OrderJournal.recover(filename)
+        workers = workers or os.cpu_count() or 1
+        ranges = cls.split(filename, workers)
+        # A chunk holds ID-bearing rows if the header line starts before it
+        header_offset = OrderRows.header_offset(filename)
+        with_ids = [header_offset is not None and header_offset < start for start, _ in ranges]
+        results = None
+        if workers > 1 and len(ranges) > 1:
+            try:
+                with ProcessPoolExecutor(max_workers=min(workers, len(ranges))) as pool:
+                    results = list(pool.map(cls.parse_chunk, repeat(filename),
+                                            [start for start, _ in ranges], [end for _, end in ranges],
+                                            with_ids))
+            except Exception as e:
+                log.warning(f"⚠️  Parallel parsing failed ({e}); parsing in one process")
+        if results is None:
+            results = [cls.parse_chunk(filename, start, end, headed)
+                       for (start, end), headed in zip(ranges, with_ids)]
+        results.append(cls.parse_rows(OrderJournal.read_journal(filename), header_offset is not None))
+        return results
+
+    @classmethod
+    def load(cls, records, filename="orders.csv", workers=None):
+        """
+        Load the order history into a Records instance.
+
+        Args:
+            records (Records): Records to fill
+            filename (str): Orders file
+            workers (int, optional): Worker processes, defaults to the CPU count
+
+        Returns:
+            bool: True if the orders were loaded
+        """
+        try:
+            log.info("\nLoading Orders Data")
+            log.info("=" * 50)
+            if not os.path.exists(filename) and not os.path.exists(OrderJournal.journal_path(filename)):
+                raise FileNotFoundError(filename)
+
+            cancelled = CancellationLog.booking_ids()
+            header = None
+            offset = 0
+            skipped = 0
+            for count, parsed in cls.parse(filename, workers):
+                for index, kind, data in parsed:
+                    position = offset + index + 1
+                    try:
+                        if kind == 'error':
+                            raise ValueError(data)
+                        if kind == 'header':
+                            if header is None and data[0] == OrderRows.LEGACY_KEY:
+                                header = data
+                            continue
+                        if kind == 'legacy':
+                            if header is None:
+                                raise ValueError("orders file has no header row")
+                            data = dict(zip(header, data))
+                            booking_id = data.get(OrderRows.LEGACY_KEY)
+                        else:
+                            booking_id = data[0] or f"ORD{position:06d}"
+                        if booking_id in cancelled:
+                            continue
+                        records._apply_order_record(kind, data, position)
+                    except Exception as e:
+                        log.warning(f"⚠️  Warning: Skipping order at row {position}: {e}")
+                        skipped += 1
+                offset += count
+
+            log.info(f"\n✅ Successfully loaded {len(records.bookings)} orders.")
+            if skipped:
+                log.warning(f"⚠️  Skipped {skipped} invalid orders")
+            return True
+
+        except FileNotFoundError:
+            log.error(f"❌ Error: '{filename}' not found.")
+            return False
+        except Exception as e:
+            log.error(f"❌ Error loading orders: {e}")
+            return False
+
+
+# In[ ]:
+
+
+import marshal
+import mmap
+import struct
+import zlib
+from array import array
+
+
+class BinarySnapshot:
+    """
+    Versioned binary snapshot of the catalogue, the guest table and the
+    order columns, for warm restarts.
+
+    Layout (little-endian):
+
+        header   MAGIC, VERSION, number of sections           (8s H H)
+        entries  name, offset, length, CRC-32 per section     (24s Q Q I)
+        sections 'meta', 'catalogue', 'guests' and 'orders' are marshalled
+                 tuples, lists and dicts of plain values; 'orders.<column>'
+                 is the raw buffer of one ColumnarOrderStore array
+
+    No live objects are stored. The catalogue and guest sections hold the
+    rows as they were right after a validated CSV load, so restoring them
+    skips validate_apartment_format, validate_supplementary_format and
+    Bundle._process_components. Each group of sections records the change
+    signature of its source file ('meta' -> 'sources') and is used only
+    while that file is unchanged; a stale group falls back to its CSV.
+    This is a copy-in snapshot, not a persistent map: the file is
+    memory-mapped on startup, every section is copied out and the map is
+    closed, so restore time still grows with the size of the data; it only
+    saves the CSV parsing and validation. The column sections go straight
+    into typed arrays. The 'orders' group restores the ColumnarOrderStore
+    cache only; Booking objects are still parsed from orders.csv the first
+    time Records.load_orders runs.
+    """
+
+    filename = "pythonia.snapshot"
+    MAGIC = b'PYTHONIA'
+    VERSION = 1
+    HEADER = struct.Struct('<8sHH')
+    ENTRY = struct.Struct('<24sQQI')
+    SOURCES = {'catalogue': 'products.csv', 'guests': 'guests.csv', 'orders': 'orders.csv'}
+    COLUMNS = ('total_cost', 'nights', 'guest_count', 'reward_points', 'check_in', 'check_in_month',
+               'booked_on', 'booked_month', 'guest_codes', 'product_start', 'product_codes', 'quantities')
+
+    sections = {}  # 'catalogue' / 'guests' -> (source signature, marshalled rows)
+
+    @classmethod
+    def source_signature(cls, group):
+        """Change signature of the file a group of sections is built from"""
+        filename = cls.SOURCES[group]
+        if group == 'catalogue':
+            return CatalogueDelta.signature(filename)
+        if group == 'orders':
+            return OrderRows.signature(filename)
+        return file_signature(filename)
+
+    # Reading
+
+    @classmethod
+    def read(cls, filename=None):
+        """
+        Map a snapshot file and check its header and checksums.
+
+        Each section is copied out of the map, which is closed (and the file
+        released) before returning.
+
+        Returns:
+            dict: {section name: bytes}, or None if the file is missing,
+                  from another version or damaged
+        """
+        try:
+            with open(filename or cls.filename, 'rb') as file, \
+                    mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                magic, version, count = cls.HEADER.unpack_from(data, 0)
+                if magic != cls.MAGIC or version != cls.VERSION:
+                    return None
+                sections = {}
+                for index in range(count):
+                    name, offset, length, checksum = cls.ENTRY.unpack_from(
+                        data, cls.HEADER.size + index * cls.ENTRY.size)
+                    section = data[offset:offset + length]
+                    if len(section) != length or zlib.crc32(section) != checksum:
+                        return None
+                    sections[name.rstrip(b'\0').decode('ascii')] = section
+                return sections
+        except (OSError, ValueError, struct.error):
+            return None
+
+    @classmethod
+    def restore(cls, records, filename=None):
+        """
+        Load every group of sections whose source file is unchanged.
+
+        Args:
+            records (Records): Records to fill
+            filename (str, optional): Snapshot file
+
+        Returns:
+            set: The groups restored ('catalogue', 'guests', 'orders')
+        """
+        restored = set()
+        sections = cls.read(filename)
+        if sections is None:
+            return restored
+        try:
+            meta = marshal.loads(sections['meta'])
+            if meta['byteorder'] != sys.byteorder:
+                return restored
+        except (KeyError, ValueError, EOFError, TypeError) as e:
+            log.warning(f"⚠️  Warning: Ignoring unreadable snapshot - {e}")
+            return restored
+
+        for group in ('catalogue', 'guests', 'orders'):
+            signature = meta['sources'].get(group)
+            if signature is None or signature != cls.source_signature(group):
+                continue
+            try:
+                getattr(cls, f"_restore_{group}")(records, sections, meta)
+            except Exception as e:
+                log.warning(f"⚠️  Warning: Could not restore {group} from snapshot - {e}")
+                continue
+            if group != 'orders':
+                cls.sections[group] = (signature, sections[group])
+            restored.add(group)
+        if restored:
+            log.info(f"✅ Restored {', '.join(sorted(restored))} from {filename or cls.filename}")
+        return restored
+
+    @staticmethod
+    def _new(product_class, product_id, name, price):
+        """Create a product without running its validating constructor"""
+        product = product_class.__new__(product_class)
+        Product.__init__(product, product_id, name, price)
+        return product
 
-    def display_info(self):
-        """Display item information with enhanced formatting"""
-        try:
-            return f"""
-Item Details:
-{'-' * 50}
-ID:          {self.get_id()}
-Name:        {self.get_name()}
-Price:       ${self.get_price():.2f}
-Description: {self.get_description()}
-{'-' * 50}"""
-        except Exception as e:
-            return f"❌ Error displaying item information: {str(e)}"
+    @classmethod
+    def _restore_catalogue(cls, records, sections, meta):
+        apartment_rows, item_rows, bundle_rows = marshal.loads(sections['catalogue'])
+        apartments = {}
+        for product_id, name, price, capacity in apartment_rows:
+            apartments[product_id] = unit = cls._new(apartment, product_id, name, price)
+            unit.capacity = capacity
+        items = {}
+        for product_id, name, price, description in item_rows:
+            items[product_id] = item = cls._new(supplementary_items, product_id, name, price)
+            item.description = description
+
+        apartment.availaible_apartments = apartments
+        supplementary_items.available_supplementary_items = items
+        AvailabilityIndex.invalidate_catalogue()
+
+        Bundle.clear_indexes()
+        bundles = {}
+        for product_id, name, apartment_id, components, discount_rate, price in bundle_rows:
+            bundles[product_id] = bundle = cls._new(Bundle, product_id, name, price)
+            bundle.components = dict(components)
+            bundle.apartment_id = apartment_id
+            bundle.discount_rate = discount_rate
+            Bundle.price_cache[product_id] = price
+            bundle._index_components()
+            Bundle.name_index[normalise_name(name)] = product_id
+        Bundle.available_bundles = bundles
+
+        records.products = {}
+        records.products.update(apartments)
+        records.products.update(items)
+        records.products.update(bundles)
 
-supplementary_items.available_supplementary_items = { 
-    'SI1': supplementary_items('SI1', 'Car Park', 25.00, 'Secure underground parking space per night'),
-    'SI2': supplementary_items('SI2', 'Breakfast', 25.30, 'Continental breakfast with coffee/tea'),
-    'SI3': supplementary_items('SI3', 'Tooth Brush Kit', 10.00, 'Premium toothbrush with travel-size toothpaste'),
-    'SI4': supplementary_items('SI4', 'Bath Amenities Set', 15.50, 'Shampoo, conditioner, and body wash set'),
-    'SI5': supplementary_items('SI5', 'Extra Towel Set', 12.00, 'Set of bath, hand, and face towels'),
-    'SI6': supplementary_items('SI6', 'Double Extra Bed', 50.00, 'Comfortable double-size extra bed'),
-    'SI7': supplementary_items('SI7', 'Single Extra Bed', 35.00, 'Comfortable single-size extra bed'),
-    'SI8': supplementary_items('SI8', 'High Chair', 15.00, 'Child high chair for dining'),
-    'SI9': supplementary_items('SI9', 'Baby Cot', 30.00, 'Baby cot with bedding'),
-    'SI10': supplementary_items('SI10', 'WiFi Premium', 15.00, 'High-speed premium internet access per day'),
-    'SI11': supplementary_items('SI11', 'Late Check-out', 45.00, 'Extended check-out until 2 PM'),
-    'SI12': supplementary_items('SI12', 'Early Check-in', 45.00, 'Early check-in from 10 AM'),
-    'SI13': supplementary_items('SI13', 'Airport Transfer', 80.00, 'One-way airport transfer service'),
-    'SI14': supplementary_items('SI14', 'Laundry Service', 35.00, 'Per load of laundry washing and drying'),
-    'SI15': supplementary_items('SI15', 'Room Service', 20.00, 'In-room dining service charge'),
-    'SI16': supplementary_items('SI16', 'Mini Bar Package', 40.00, 'Selection of snacks and beverages'),
-    'SI17': supplementary_items('SI17', 'Dinner Package', 45.00, 'Set dinner menu with dessert'),
-    'SI18': supplementary_items('SI18', 'Business Kit', 25.00, 'Printing and office supplies package'),
-    'SI19': supplementary_items('SI19', 'Gym Access', 15.00, 'Daily access to fitness center'),
-    'SI20': supplementary_items('SI20', 'Spa Package', 120.00, '60-minute massage treatment')
-}  
+    @classmethod
+    def _restore_guests(cls, records, sections, meta):
+        records.guests.clear()
+        for first_name, last_name, date_of_birth, reward, reward_rate, redeem_rate in marshal.loads(sections['guests']):
+            guest = Guest(first_name, last_name, date_of_birth, reward, reward_rate, redeem_rate)
+            records.guests[guest.get_guest_id()] = guest
 
+    @classmethod
+    def _restore_orders(cls, records, sections, meta):
+        store = ColumnarOrderStore()
+        for name in cls.COLUMNS:
+            typecode, itemsize = meta['columns'][name]
+            column = array(typecode)
+            if column.itemsize != itemsize:
+                raise ValueError(f"column {name} was written with {itemsize}-byte items")
+            column.frombytes(sections[f"orders.{name}"])
+            setattr(store, name, column)
+        store.guest_ids, store.product_ids = marshal.loads(sections['orders'])
+        store._guest_lookup = {guest_id: code for code, guest_id in enumerate(store.guest_ids)}
+        store._product_lookup = {product_id: code for code, product_id in enumerate(store.product_ids)}
+        ColumnarOrderStore.cache[cls.SOURCES['orders']] = (meta['sources']['orders'], store)
+
+    # Capturing
 
-# In[ ]:
+    @classmethod
+    def capture_catalogue(cls, records, signature):
+        """Remember the catalogue just loaded from a products file with this signature"""
+        cls.sections['catalogue'] = (signature, marshal.dumps((
+            [(unit.get_id(), unit.get_name(), unit.get_price(), unit.get_capacity())
+             for unit in apartment.availaible_apartments.values()],
+            [(item.get_id(), item.get_name(), item.get_price(), item.description)
+             for item in supplementary_items.available_supplementary_items.values()],
+            [(bundle.get_id(), bundle.get_name(), bundle.apartment_id, list(bundle.components.items()),
+              bundle.discount_rate, bundle.get_price())
+             for bundle in Bundle.available_bundles.values()]
+        )))
 
+    @classmethod
+    def capture_guests(cls, records, signature):
+        """Remember the guests just loaded from a guests file with this signature"""
+        cls.sections['guests'] = (signature, marshal.dumps([
+            (guest.first_name, guest.last_name, guest.date_of_birth, guest.opening_reward_points,
+             guest.reward_rate, guest.redeem_rate)
+            for guest in records.guests.values()
+        ]))
 
+    @classmethod
+    def load(cls, records, filename=None):
+        """
+        Load the catalogue and guests from the snapshot where it is current,
+        and from the CSV files otherwise.
 
+        Returns:
+            set: The groups restored from the snapshot
+        """
+        restored = cls.restore(records, filename)
+        if 'guests' not in restored:
+            signature = cls.source_signature('guests')
+            if records.read_guests(cls.SOURCES['guests']):
+                cls.capture_guests(records, signature)
+        if 'catalogue' not in restored:
+            signature = cls.source_signature('catalogue')
+            if records.read_products(cls.SOURCES['catalogue']):
+                cls.capture_catalogue(records, signature)
+        return restored
+
+    # Writing
 
+    @classmethod
+    def save(cls, filename=None):
+        """
+        Write the snapshot if any part of it is out of date.
 
-# In[ ]:
+        Catalogue and guest sections are written only while their source
+        file still matches what was loaded. The order columns are rebuilt
+        from orders.csv when it changed.
 
+        Returns:
+            bool: True if a snapshot was written
+        """
+        filename = filename or cls.filename
+        try:
+            sources = {}
+            payloads = {}
+            for group in ('catalogue', 'guests'):
+                captured = cls.sections.get(group)
+                if captured is not None and captured[0] == cls.source_signature(group):
+                    sources[group] = captured[0]
+                    payloads[group] = captured[1]
+
+            orders_file = cls.SOURCES['orders']
+            orders_signature = cls.source_signature('orders')
+            has_orders = (os.path.exists(orders_file)
+                          or os.path.exists(OrderJournal.journal_path(orders_file)))
+            if has_orders:
+                sources['orders'] = orders_signature
+
+            existing = cls.read(filename)
+            if existing is not None and marshal.loads(existing['meta'])['sources'] == sources:
+                return False
 
+            columns = {}
+            if has_orders:
+                store = ColumnarOrderStore.load(orders_file)
+                payloads['orders'] = marshal.dumps((store.guest_ids, store.product_ids))
+                for name in cls.COLUMNS:
+                    column = getattr(store, name)
+                    columns[name] = (column.typecode, column.itemsize)
+                    payloads[f"orders.{name}"] = column.tobytes()
+            payloads = {'meta': marshal.dumps({'sources': sources, 'byteorder': sys.byteorder,
+                                               'columns': columns}), **payloads}
+
+            # Sections start on 8-byte boundaries after the header and entry table
+            entries = []
+            offset = cls.HEADER.size + cls.ENTRY.size * len(payloads)
+            for name, payload in payloads.items():
+                offset += -offset % 8
+                entries.append((name, offset, payload))
+                offset += len(payload)
+
+            temp_name = f"{filename}.tmp"
+            with open(temp_name, 'wb') as file:
+                file.write(cls.HEADER.pack(cls.MAGIC, cls.VERSION, len(entries)))
+                for name, offset, payload in entries:
+                    file.write(cls.ENTRY.pack(name.encode('ascii'), offset, len(payload), zlib.crc32(payload)))
+                for name, offset, payload in entries:
+                    file.write(b'\0' * (offset - file.tell()))
+                    file.write(payload)
+                file.flush()
+                os.fsync(file.fileno())
+            os.replace(temp_name, filename)
+            OrderJournal._fsync_directory(filename)
+            log.info(f"✅ Snapshot saved to {filename}")
+            return True
 
+        except Exception as e:
+            log.warning(f"⚠️  Warning: Could not save snapshot - {e}")
+            return False
 
 
 # In[2]:
@@ -3995,42 +8806,82 @@ from typing import Optional, Dict, List
 import csv
 
 class PythoniaSystem:
-    def __init__(self):
-        """Initialize the Pythonia booking system"""
-        self.records = Records()
+    def __init__(self, storage="csv"):
+        """
+        Initialize the Pythonia booking system
+
+        Args:
+            storage (str): 'csv' to keep records in memory backed by the CSV
+                           files, or 'sqlite' to use the SQLite backend
+        """
+        self.records = SQLiteRecords() if storage == "sqlite" else Records()
+        self.engine = BookingEngine(self.records)
         self.setup_logging()
         self.load_data()
 
     def setup_logging(self):
         """Configure logging system"""
-        logging.basicConfig(
-            filename=f'pythonia_{datetime.now().strftime("%Y%m%d")}.log',
-            level=logging.INFO,
-            format='%(asctime)s - %(levelname)s - %(message)s'
-        )
+        # The log file is only created once something is logged
+        handler = logging.FileHandler(f'pythonia_{datetime.now().strftime("%Y%m%d")}.log', delay=True)
+        handler.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s'))
+        logging.basicConfig(level=logging.INFO, handlers=[handler])
 
     def load_data(self):
         """Load initial data from files"""
         try:
-            # Load guest data
             if not os.path.exists('guests.csv'):
                 raise FileNotFoundError("guests.csv not found")
-            self.records.read_guests('guests.csv')
-            
-            # Load product data
             if not os.path.exists('products.csv'):
                 raise FileNotFoundError("products.csv not found")
-            self.records.read_products('products.csv')
+
+            if isinstance(self.records, SQLiteRecords):
+                self.records.read_guests('guests.csv')
+                self.records.read_products('products.csv')
+            else:
+                # Guests and products come from the binary snapshot while it is current
+                BinarySnapshot.load(self.records)
             
-            # Load order history if exists
-            if os.path.exists('orders.csv'):
-                self.records.load_orders('orders.csv')
+            # The order and bundle booking histories load on first use
+            if isinstance(self.records, SQLiteRecords):
+                self.records.defer_orders('orders.csv')
+            else:
+                self.records.defer_orders('orders.csv', functools.partial(ParallelOrderLoader.load, self.records))
+            Bundle.defer_bundle_orders('orders.csv')
                 
         except Exception as e:
             logging.error(f"Error loading data: {e}")
-            print(f"Error: {e}")
+            log.error(f"Error: {e}")
             sys.exit(1)
 
+    def shutdown(self):
+        """Persist the statistics and the startup snapshot before exiting"""
+        # Let a background catalogue compaction finish before the process exits
+        CatalogueDelta.wait_for_compaction()
+        if self.records.pending_orders is None:
+            OrderStatistics.save_state('orders.csv')
+        if not isinstance(self.records, SQLiteRecords):
+            BinarySnapshot.save()
+
+    def run_reward_batch(self, start_date, end_date, apply=False, report_file="reward_reconciliation.csv"):
+        """
+        Run the period-end reward reconciliation and write its report.
+
+        Args:
+            start_date, end_date (str): Period in dd/mm/yyyy format (inclusive)
+            apply (bool): Record the newly expired points in the reward ledger
+            report_file (str): CSV file for the per-guest results
+
+        Returns:
+            dict: RewardBatchJob.run() results, or None if the job failed
+        """
+        try:
+            results = RewardBatchJob.run(start_date, end_date, apply=apply)
+        except (ValueError, OSError) as e:
+            log.error(f"❌ Reward batch failed: {e}")
+            return None
+        RewardBatchJob.write_report(results, report_file)
+        return results
+
     def display_menu(self):
         """Display main menu"""
         print("\nWelcome to Pythonia Service Apartments!")
@@ -4047,10 +8898,11 @@ class PythoniaSystem:
         print("=" * 50)
 
     def make_booking(self):
-        """Handle the booking process"""
+        """Handle the booking process through the booking engine"""
         try:
             print("\nNew Booking")
             print("=" * 50)
+            self.records.ensure_orders_loaded()
             
             # Get guest information
             guest = self.get_guest_info()
@@ -4059,41 +8911,49 @@ class PythoniaSystem:
             check_in, check_out, current_booking_date, length_of_stay = self.get_booking_dates()
             
             # Select apartment
-            apartment = self.select_apartment(length_of_stay, check_in, check_out)
-            if not apartment:
-                return
+            apartment_id = self.select_apartment(length_of_stay, check_in, check_out)
+            if not apartment_id:
+                return False
             
             # Get number of guests
-            num_guests = self.process_guest_capacity(apartment, length_of_stay)
+            result = self.total_number_of_guest(apartment_id, length_of_stay)
+            if not result:
+                return False
             
-            # Create booking
-            booking = Booking(
-                guest=guest,
-                check_in_date=check_in,
-                check_out_date=check_out,
-                current_booking_date=datetime.now().strftime("%d/%m/%Y %H:%M"),
-                number_of_guests=num_guests,
-                length_of_stay=length_of_stay,
-                apartment_id=apartment
-            )
+            request = {
+                'guest_id': guest.get_guest_id(),
+                'apartment_id': apartment_id,
+                'check_in': check_in,
+                'check_out': check_out,
+                'booking_date': current_booking_date,
+                'number_of_guests': result[0],
+                'items': self.add_or_update_supplementary_item(length_of_stay, {})
+            }
+            quote = self.engine.quote(request)
+            if quote['status'] == 'rejected':
+                print(f"\n❌ {quote['error']}")
+                return False
             
-            # Add supplementary items
-            if self.add_supplementary_items(booking):
-                # Calculate costs and rewards
-                booking.get_total_cost()
-                
-                # Offer reward point redemption
-                if guest.get_total_reward_points_earned() >= 100:
-                    self.handle_reward_redemption(booking, guest)
-                
-                # Display and confirm booking
-                booking.display_booking_receipt()
-                if self.confirm_booking():
-                    # Save booking
-                    guest.add_booking(booking)
-                    self.records.save_booking(booking)
-                    print("\n✅ Booking completed successfully!")
+            # Offer reward point redemption
+            if guest.get_total_reward_points_earned() >= BookingEngine.redeem_step:
+                request['redeem_points'] = self.handle_reward_redemption(guest, quote)
+            
+            # Hold the apartment while the guest reviews the booking
+            held = self.engine.hold(request)
+            if held['status'] == 'rejected':
+                print(f"\n❌ {held['error']}")
+                return False
+            
+            if self.confirm_booking(held):
+                confirmed = self.engine.confirm(held['hold_id'])
+                if confirmed['status'] == 'confirmed':
+                    Booking.get_registered_booking(confirmed['booking_id']).display_booking_receipt()
+                    print(f"\n✅ Booking {confirmed['booking_id']} completed successfully!")
+                    print(f"Your new reward points balance is: {confirmed['reward_balance']}")
                     return True
+                print(f"\n❌ {confirmed['error']}")
+            else:
+                self.engine.cancel(held['hold_id'])
             
             print("\n❌ Booking cancelled")
             return False
@@ -4128,10 +8988,15 @@ class PythoniaSystem:
                     # Find existing guest
                     guest = self.records.find_guest(guest_input)
                     if guest:
-                        print(f"\nWelcome back, {guest.get_first_name()}!")
+                        print(f"\nWelcome back, {guest.get_full_name()}!")
                         print(f"Current reward points: {guest.get_total_reward_points_earned()}")
                         return guest
                     
+                    matches = Guest.search(guest_input)
+                    if matches:
+                        print("\nDid you mean:")
+                        for score, match in matches:
+                            print(f"  {match.get_guest_id():<20} {match.get_full_name()}")
                     print("Guest not found. Please try again or enter 'new' for new guest.")
                     
             except ValueError as e:
@@ -4147,6 +9012,7 @@ class PythoniaSystem:
         except ValueError:
             return False
         
+    @staticmethod
     def validate_name(prompt):
         while True:
             name = input(prompt).strip()
@@ -4155,6 +9021,7 @@ class PythoniaSystem:
             print("Error: Name must contain only alphabetic characters and spaces.")
     
     
+    @staticmethod
     def validate_date_time(prompt_date, prompt_time):
         while True:
             date_input = input(prompt_date)
@@ -4165,7 +9032,7 @@ class PythoniaSystem:
                 print("Error: Invalid date or time format. Please use dd/mm/yyyy for date and HH:MM for time.")
                     
     def get_booking_dates(self):
-        """Get and validate booking dates"""
+        """Get booking dates and validate them with the booking engine rules"""
         while True:
             try:
                 print("\nBooking Dates")
@@ -4176,41 +9043,21 @@ class PythoniaSystem:
                 print(f"Current booking date and time: {current_booking_date}")
 
                 # Check-in date and time
-                check_in = validate_date_time(
+                check_in = self.validate_date_time(
                     "Enter the check-in date (dd/mm/yyyy): ",
                     "Enter the check-in time (HH:MM): "
                 )
-                
-                if check_in < current_datetime:
-                    print("Error: Check-in date and time must be in the future.")
-                    continue
 
                 # Check-out date and time
-                check_out = validate_date_time(
+                check_out = self.validate_date_time(
                     "Enter the check-out date (dd/mm/yyyy): ",
                     "Enter the check-out time (HH:MM): "
                 )
-                
-                # Validate check-in and check-out dates
-                if check_in < current_datetime:
-                    print("Error: Check-in date is earlier than the booking date.")
-                    continue
 
-                if check_out < current_datetime:
-                    print("Error: Check-out date is earlier than the booking date.")
-                    continue
-
-                if check_out <= check_in:
-                    print("Error: Check-out date must be after the check-in date.")
-                    continue
-
-                if check_out.date() == check_in.date():
-                    print("Error: Check-in date cannot be the same as the check-out date.")
-                    continue
-
-                stay_duration = (check_out - check_in).days
-                if stay_duration < 1 or stay_duration > 7:
-                    print("Error: You have to book for at least one day and at most 7 days.")
+                try:
+                    stay_duration = BookingEngine.validate_stay(check_in, check_out, current_datetime)
+                except BookingError as e:
+                    print(f"Error: {e}.")
                     continue
 
                 # All validations passed
@@ -4240,8 +9087,8 @@ class PythoniaSystem:
                 raise ValueError(f"Apartment {apartment_id} does not exist.")
             
             # Get capacity information
-            capacity = apartment.availaible_apartments[apartment_id]['capacity']
-            max_capacity = capacity + 4  # Maximum 2 extra beds, each fits 2 people
+            capacity = apartment.availaible_apartments[apartment_id].get_capacity()
+            max_capacity = capacity + BookingEngine.max_extra_guests  # Maximum 2 extra beds, each fits 2 people
             
             while True:
                 try:
@@ -4267,7 +9114,7 @@ class PythoniaSystem:
                     
                     # Case 2: Extra beds needed
                     extra_guests = number_of_guests - capacity
-                    extra_beds = (extra_guests + 1) // 2
+                    extra_beds = BookingEngine.extra_beds_needed(apartment_id, number_of_guests)
                     total_extra_beds = extra_beds * length_of_stay
                     
                     # Show extra bed details
@@ -4277,7 +9124,7 @@ class PythoniaSystem:
                     print(f"Total extra beds for {length_of_stay} nights: {total_extra_beds}")
                     
                     # Get extra bed price info
-                    bed_price = supplementary_items.available_supplementary_items['SI6']['price']
+                    bed_price = supplementary_items.available_supplementary_items[BookingEngine.extra_bed_item].get_price()
                     total_bed_cost = bed_price * total_extra_beds
                     print(f"Extra bed cost: ${bed_price:.2f} per bed per night")
                     print(f"Total extra bed cost: ${total_bed_cost:.2f}")
@@ -4324,11 +9171,11 @@ class PythoniaSystem:
             total_price = total_extra_beds * price_per_bed
             
             # Add to booking's supplementary items
-            booking.supplementary_items_for_current_booking[bed_item_id] = {
-                'quantity': total_extra_beds,
-                'price_per_unit': price_per_bed,
-                'total_price': total_price
-            }
+            booking.supplementary_items_for_current_booking[bed_item_id] = SupplementaryLineItem(
+                quantity=total_extra_beds,
+                price_per_unit=price_per_bed,
+                total_price=total_price
+            )
             
             print("\n✅ Extra beds added to booking:")
             print(f"Quantity: {total_extra_beds}")
@@ -4369,13 +9216,15 @@ class PythoniaSystem:
     
     def select_apartment(self, length_of_stay, check_in_date, check_out_date):
     
-        apartment.display_apartments()
         while True:
             print("\nCurrently available Apartments:")
-            for apt_id in apartment.availaible_apartments:
-                print(f"- {apt_id}")  
+            AvailabilityIndex.display_available_apartments(check_in_date, check_out_date)
             apartment_id = input("Enter apartment unit ID to book (e.g., U12swan): ")
             if apartment_id in apartment.availaible_apartments:
+                if not AvailabilityIndex.is_available(apartment_id, check_in_date, check_out_date):
+                    print(f"Apartment {apartment_id} is already booked between {check_in_date} and {check_out_date}. Please choose another unit.")
+                    continue
+
                 rate_per_night = apartment.availaible_apartments[apartment_id].get_price()
                 initial_cost = rate_per_night * length_of_stay
                 
@@ -4406,15 +9255,15 @@ class PythoniaSystem:
             if apartment_id in apartment.availaible_apartments:
                 apartment_details = apartment.availaible_apartments[apartment_id]
 
-                # Add booking details as a dictionary
-                booking.booked_apartments_for_current_booking[apartment_id] = {
-                    'booking_date': current_booking_date,
-                    # 'number_of_guests': number_of_guests,
-                    'check_in_date': check_in_date,
-                    'check_out_date': check_out_date,
-                    'rate_per_night': apartment_details.rate_per_night,  # Assuming rate_per_night is an attribute
-                    'total_cost': apartment_details.rate_per_night * self.nights
-                }
+                # Add booking details as a compact line item
+                booking.booked_apartments_for_current_booking[apartment_id] = ApartmentLineItem(
+                    booking_date=current_booking_date,
+                    # number_of_guests=number_of_guests,
+                    check_in_date=check_in_date,
+                    check_out_date=check_out_date,
+                    rate_per_night=apartment_details.rate_per_night,  # Assuming rate_per_night is an attribute
+                    total_cost=apartment_details.rate_per_night * self.nights
+                )
 
                 # Display booked apartments
                 booking.display_booked_apartments()
@@ -4528,24 +9377,31 @@ class PythoniaSystem:
 
     
         
-    def handle_new_supplementary_item(self, item_id, length_of_stay, booking):
-        """Handle new supplementary item order with special handling for car park"""
+    def handle_new_supplementary_item(self, item_id, length_of_stay, items):
+        """
+        Ask how many of a supplementary item to order, with special handling for car park.
+
+        Args:
+            item_id (str): Supplementary item being ordered
+            length_of_stay (int): Number of nights
+            items (dict): {item_id: quantity} ordered so far; car park
+                          quantities are cars per night
+
+        Returns:
+            bool: True if the item was added
+        """
         try:
             price_per_unit = supplementary_items.available_supplementary_items[item_id].get_price()
             print(f"The price of each {item_id} is ${price_per_unit:.2f}")
 
-            if item_id == 'SI1':  # Car Park
+            if item_id == BookingEngine.car_park_item:
                 try:
                     cars_needed = int(input("How many cars do you need to park per night? "))
                     if cars_needed <= 0:
                         print("Please enter a positive number of cars.")
                         return False
-                    
-                    if length_of_stay is None:
-                        print("Error: Number of nights not provided for car park booking.")
-                        return False
                         
-                    total_quantity = cars_needed * length_of_stay
+                    total_quantity = BookingEngine.item_quantity(item_id, cars_needed, length_of_stay)
                     print(f"\nFor {cars_needed} car(s) over {length_of_stay} nights:")
                     print(f"Total car park bookings needed: {total_quantity}")
                     print(f"Total cost will be: ${total_quantity * price_per_unit:.2f}")
@@ -4555,7 +9411,7 @@ class PythoniaSystem:
                         print("Car park booking cancelled.")
                         return False
                         
-                    quantity = total_quantity
+                    quantity = cars_needed
                     
                 except ValueError:
                     print("Error: Please enter a valid number of cars.")
@@ -4571,16 +9427,12 @@ class PythoniaSystem:
                             print("Please enter a positive number.")
                     except ValueError:
                         print("Error: Please enter a valid number.")
+                total_quantity = quantity
 
-                booking.supplementary_items_for_current_booking[item_id] = {
-                'name': supplementary_items.available_supplementary_items[item_id].get_name(),
-                'quantity': quantity,
-                'price_per_unit': price_per_unit,
-                'total_price': price_per_unit * quantity
-            }
+            items[item_id] = items.get(item_id, 0) + quantity
             
-            print(f"\nAdded {quantity}x {supplementary_items.available_supplementary_items[item_id].get_description()}")
-            print(f"Total cost: ${price_per_unit * quantity:.2f}")
+            print(f"\nAdded {total_quantity}x {supplementary_items.available_supplementary_items[item_id].get_description()}")
+            print(f"Total cost: ${price_per_unit * total_quantity:.2f}")
             
             return True
             
@@ -4768,8 +9620,17 @@ class PythoniaSystem:
             print(f"\n❌ Error removing item: {e}")
             return False
             
-    def add_or_update_supplementary_item(self, length_of_stay, booking):
-        """Main function to add or update supplementary items"""
+    def add_or_update_supplementary_item(self, length_of_stay, items):
+        """
+        Ask for the supplementary items of a booking.
+
+        Args:
+            length_of_stay (int): Number of nights
+            items (dict): {item_id: quantity} to add to
+
+        Returns:
+            dict: The items, ready for a booking engine request
+        """
         try:
             flag = 0
             while True:
@@ -4785,14 +9646,10 @@ class PythoniaSystem:
                     item_id = input("Please Enter item id: ").strip().upper()
                     
                     if item_id in supplementary_items.available_supplementary_items:
-
-                        
-                        if item_id in booking.get_supplementary_items_booked_info():
-                            if self.handle_existing_supplementary_item(item_id, length_of_stay):
-                                return self.supplementary_item_section()
-                        else:
-                            if self.handle_new_supplementary_item(item_id, length_of_stay):
-                                flag = 1
+                        if item_id in items:
+                            print(f"You have already ordered {item_id}; the new quantity will be added.")
+                        if self.handle_new_supplementary_item(item_id, length_of_stay, items):
+                            flag = 1
                     else:
                         print("\nInvalid item ID. Available items:")
                         for item_id in supplementary_items.available_supplementary_items.keys():
@@ -4802,30 +9659,32 @@ class PythoniaSystem:
             
         except Exception as e:
             print(f"Error in supplementary item processing: {e}")
+        return items
 
-    def handle_reward_redemption(booking, guest):
+    def handle_reward_redemption(self, guest, quote):
         """
-        Handle reward points redemption for a booking.
+        Ask how many reward points to redeem on a booking.
         
         Args:
-            booking (Booking): Current booking object
             guest (Guest): Guest making the booking
+            quote (dict): Booking engine quote for the booking
             
         Returns:
-            bool: True if points were redeemed, False otherwise
+            int: Points to redeem, 0 if none
         """
         try:
             # Check if guest has enough points (minimum 100)
             current_points = guest.get_total_reward_points_earned()
-            if current_points < 100:
+            step = BookingEngine.redeem_step
+            if current_points < step:
                 print(f"\nℹ️  Not enough points for redemption. Current balance: {current_points}")
-                print("    Minimum 100 points required for redemption.")
-                return False
+                print(f"    Minimum {step} points required for redemption.")
+                return 0
     
             # Calculate maximum possible discount
-            max_redeemable_points = (current_points // 100) * 100  # Round down to nearest 100
+            max_redeemable_points = (current_points // step) * step  # Round down to nearest 100
             redeem_rate = guest.get_redeem_rate()
-            max_discount = (max_redeemable_points * redeem_rate) / 100
+            max_discount = BookingEngine.redemption_discount(guest, max_redeemable_points)
     
             # Show redemption options
             print("\nReward Points Redemption")
@@ -4835,163 +9694,107 @@ class PythoniaSystem:
             print(f"Redemption Rate: {redeem_rate}%")
             print(f"Maximum Possible Discount: ${max_discount:.2f}")
             print("-" * 50)
-            print("Current Booking Total: ${:.2f}".format(booking.get_total_cost()))
+            print("Current Booking Total: ${:.2f}".format(quote['subtotal']))
     
             # Ask if guest wants to use points
             use_points = input("\nWould you like to use reward points for a discount? (y/n): ").lower()
             if use_points != 'y':
                 print("\nℹ️  No points redeemed.")
-                return False
+                return 0
     
             # Get points to redeem
             while True:
                 try:
-                    points_to_redeem = int(input(f"\nEnter points to redeem (multiples of 100, max {max_redeemable_points}): "))
-                    
-                    # Validate points
-                    if points_to_redeem % 100 != 0:
-                        print("❌ Points must be in multiples of 100")
-                        continue
-                        
-                    if points_to_redeem > max_redeemable_points:
-                        print(f"❌ Maximum redeemable points: {max_redeemable_points}")
-                        continue
-                        
-                    if points_to_redeem < 100:
-                        print("❌ Minimum redemption is 100 points")
+                    points_to_redeem = int(input(f"\nEnter points to redeem (multiples of {step}, max {max_redeemable_points}): "))
+                    discount = BookingEngine.redemption_discount(guest, points_to_redeem)
+                    if discount > quote['subtotal']:
+                        print("❌ Discount cannot exceed the booking total")
                         continue
     
-                    # Calculate discount
-                    discount = (points_to_redeem * redeem_rate) / 100
-    
                     # Show redemption summary
                     print("\nRedemption Summary")
                     print("-" * 50)
                     print(f"Points to Redeem: {points_to_redeem}")
                     print(f"Discount Amount: ${discount:.2f}")
-                    print(f"Original Total: ${booking.get_total_cost():.2f}")
-                    print(f"Final Total: ${(booking.get_total_cost() - discount):.2f}")
+                    print(f"Original Total: ${quote['subtotal']:.2f}")
+                    print(f"Final Total: ${(quote['subtotal'] - discount):.2f}")
                     print(f"Remaining Points: {current_points - points_to_redeem}")
     
                     # Confirm redemption
                     confirm = input("\nConfirm redemption? (y/n): ").lower()
                     if confirm == 'y':
-                        # Update booking and guest
-                        booking.total_cost = booking.apply_discount(discount)
-                        guest.use_reward_points(points_to_redeem)
-                        
-                        print("\n✅ Reward points redeemed successfully!")
-                        print(f"New Booking Total: ${booking.get_total_cost():.2f}")
-                        print(f"Remaining Points Balance: {guest.get_reward()}")
-                        return True
-                    else:
-                        retry = input("\nTry different amount? (y/n): ").lower()
-                        if retry != 'y':
-                            print("\nℹ️  Redemption cancelled.")
-                            return False
-                        continue
+                        return points_to_redeem
+                    retry = input("\nTry different amount? (y/n): ").lower()
+                    if retry != 'y':
+                        print("\nℹ️  Redemption cancelled.")
+                        return 0
     
+                except BookingError as e:
+                    print(f"❌ {e}")
                 except ValueError:
                     print("❌ Please enter a valid number")
-                    continue
     
         except Exception as e:
             print(f"\n❌ Error processing reward redemption: {e}")
-            return False
-    def confirm_booking(self):
-            """
-            Display booking summary and get final confirmation from user.
-            Handles reward points and saves booking if confirmed.
-            
-            Returns:
-                bool: True if booking confirmed, False if cancelled
-            """
-            try:
-                print("\nBooking Confirmation")
-                print("=" * 60)
-                
-                # Display booking summary before confirmation
-                print("\nBooking Summary:")
-                print("-" * 60)
-                print(f"Guest: {booking.guest.first_name} {booking.guest.last_name}")
-                print(f"Apartment: {booking.apartment_id}")
-                print(f"Check-in: {booking.check_in_date}")
-                print(f"Check-out: {booking.check_out_date}")
-                print(f"Number of Guests: {booking.number_of_guests}")
-                print(f"Length of Stay: {booking.length_of_stay} nights")
-                
-                # Show cost breakdown
-                apartment_total = booking.get_total_apartment_booking_cost()
-                supplementary_total = booking.get_total_supplementary_item_booking_cost()
-                total_cost = booking.get_total_cost()
-                
-                print("\nCost Breakdown:")
-                print("-" * 60)
-                print(f"Apartment Cost: ${apartment_total:.2f}")
-                print(f"Supplementary Items: ${supplementary_total:.2f}")
-                
-                # Show discount if applied
-                if hasattr(self, 'discount_applied') and self.discount_applied > 0:
-                    print(f"Discount Applied: -${self.discount_applied:.2f}")
-                    
-                print(f"Final Total: ${total_cost:.2f}")
-                
-                # Show reward points
-                reward_points = self.get_reward_points_for_this_booking()
-                print(f"Reward Points to Earn: {reward_points}")
+            return 0
+
+    def confirm_booking(self, quote):
+        """
+        Display the booking summary and get final confirmation from the user.
+
+        Args:
+            quote (dict): Booking engine quote or hold to confirm
+
+        Returns:
+            bool: True if booking confirmed, False if cancelled
+        """
+        try:
+            print("\nBooking Confirmation")
+            print("=" * 60)
+            
+            # Display booking summary before confirmation
+            print("\nBooking Summary:")
+            print("-" * 60)
+            print(f"Guest: {quote['guest_id']}")
+            print(f"Apartment: {quote['apartment_id']}")
+            print(f"Check-in: {quote['check_in']}")
+            print(f"Check-out: {quote['check_out']}")
+            print(f"Number of Guests: {quote['number_of_guests']}")
+            print(f"Length of Stay: {quote['nights']} nights")
+            
+            # Show cost breakdown
+            print("\nCost Breakdown:")
+            print("-" * 60)
+            for line in quote['lines']:
+                print(f"{line['quantity']} x {line['product_id']:<10} {line['name']:<25} ${line['cost']:.2f}")
+            
+            # Show discount if applied
+            if quote['discount'] > 0:
+                print(f"Discount Applied: -${quote['discount']:.2f} ({quote['points_redeemed']} points)")
                 
-                # Get confirmation
-                print("\nPlease review the booking details carefully.")
-                confirm = input("\nConfirm this booking? (y/n): ").lower().strip()
+            print(f"Final Total: ${quote['total']:.2f}")
+            print(f"Reward Points to Earn: {quote['reward_points']}")
+            
+            # Get confirmation
+            print("\nPlease review the booking details carefully.")
+            confirm = input("\nConfirm this booking? (y/n): ").lower().strip()
+            if confirm == 'y':
+                return True
+            print("\nℹ️  Booking cancelled.")
+            print("You can start a new booking from the main menu.")
+            return False
                 
-                if confirm == 'y':
-                    try:
-                        # Save booking
-                        self.booking_id = self.generate_booking_id()
-                        Booking.bookings[self.booking_id] = self
-                        
-                        # Update guest's reward points
-                        self.guest.update_reward(reward_points)
-                        
-                        # Add booking to guest's history
-                        self.guest.add_booking_to_history(self)
-                        
-                        print("\n✅ Booking confirmed successfully!")
-                        print(f"Booking ID: {self.booking_id}")
-                        
-                        # Display receipt
-                        self.display_booking_receipt()
-                        
-                        print("\nBooking confirmation details:")
-                        print("-" * 60)
-                        print(f"• Your booking ID is: {self.booking_id}")
-                        print(f"• You have earned {reward_points} reward points")
-                        print(f"• Your new reward points balance is: {self.guest.get_reward()}")
-                        print("\nThank you for choosing Pythonia Service Apartments!")
-                        
-                        return True
-                        
-                    except Exception as e:
-                        print(f"\n❌ Error saving booking: {e}")
-                        print("Please contact support for assistance.")
-                        return False
-                else:
-                    print("\nℹ️  Booking cancelled.")
-                    print("You can start a new booking from the main menu.")
-                    return False
-                    
-            except Exception as e:
-                print(f"\n❌ Error during booking confirmation: {e}")
-                return False
+        except Exception as e:
+            print(f"\n❌ Error during booking confirmation: {e}")
+            return False
 
     @staticmethod
     def generate_booking_receipt(booking_id):
         """Generate a text file receipt for the booking"""
         try:
-            if booking_id not in Booking.bookings:
+            booking = Booking.get_registered_booking(booking_id)
+            if booking is None:
                 raise ValueError(f"Booking {booking_id} not found")
-                
-            booking = Booking.get_booking_id()
             
             # Create receipts directory if it doesn't exist
             os.makedirs('receipts', exist_ok=True)
@@ -5054,6 +9857,8 @@ class PythoniaSystem:
         Gets bundle selection and processes the booking.
         """
         try:
+            self.records.ensure_orders_loaded()
+
             # Display available bundles
             print("\nAvailable Bundle Packages:")
             print("=" * 60)
@@ -5153,7 +9958,7 @@ class PythoniaSystem:
             print(f"Reward Points to Earn: {self.reward_points}")
     
             # Handle reward point redemption if eligible
-            if guest.get_reward() >= 100:
+            if guest.get_total_reward_points_earned() >= 100:
                 success, discount = self.handle_reward_redemption(self, guest)
                 if success:
                     self.apply_discount(discount)
@@ -5164,6 +9969,9 @@ class PythoniaSystem:
             confirm = input("\nConfirm bundle booking? (y/n): ").lower().strip()
             if confirm == 'y':
                 # Save booking
+                Booking.register_booking(self)
+                OrderStatistics.record_booking(self)
+                guest.earn_reward_points(self.reward_points, self.booking_id)
                 guest.add_booking_to_history(self)
                 guest.add_booking_to_guest_data(self)
                 bundle.save_bundle_order(self)
@@ -5178,6 +9986,29 @@ class PythoniaSystem:
         except Exception as e:
             print(f"\n❌ Error processing bundle booking: {e}")
             return False
+    def display_order_history(self, page_size=10):
+        """Browse a guest's bookings one page at a time (menu option 7)"""
+        search_value = input("\nEnter guest ID or full name: ").strip()
+        guest = self.records.find_guest(search_value)
+        if not guest:
+            print(f"❌ Guest not found: {search_value}")
+            return False
+
+        pages = max(1, (self.records.count_guest_bookings(guest.guest_id) + page_size - 1) // page_size)
+        page = 1
+        while True:
+            self.records.display_guest_order_history(guest.guest_id, page=page, page_size=page_size)
+            if page >= pages:
+                return True
+            choice = input(f"\nPress Enter for page {page + 1} of {pages}, or 'q' to return: ").strip().lower()
+            if choice == 'q':
+                return True
+            page += 1
+
+    def generate_statistics(self, top_k=3):
+        """Report the top guests and products (menu option 8)"""
+        self.records.generate_statistics(top_k=top_k)
+
     def run(self):
         """Main program loop"""
         while True:
@@ -5186,6 +10017,7 @@ class PythoniaSystem:
                 choice = input("\nEnter your choice (0-8): ").strip()
                 
                 if choice == '0':
+                    self.shutdown()
                     print("\nThank you for using Pythonia Service Apartments!")
                     break
                 elif choice == '1':
@@ -5217,7 +10049,41 @@ class PythoniaSystem:
 def main():
     """Program entry point"""
     try:
-        system = PythoniaSystem()
+        # Batch and service runs only report warnings unless --verbose is given
+        arguments = sys.argv[1:]
+        if "--verbose" in arguments:
+            set_output_mode('verbose')
+        elif ("--quiet" in arguments or "--import" in arguments or "--serve" in arguments
+              or "--rewards-batch" in arguments):
+            set_output_mode('quiet')
+        if "--seed" in sys.argv[1:]:
+            # Write the sample data files instead of running the menu
+            generate_sample_data(overwrite="--force" in sys.argv[1:], verify="--verify" in sys.argv[1:])
+            return
+        if "--benchmark-memory" in sys.argv[1:]:
+            benchmark_booking_memory()
+            return
+        storage = "sqlite" if "--sqlite" in sys.argv[1:] else "csv"
+        system = PythoniaSystem(storage=storage)
+        if "--import" in sys.argv[1:-1]:
+            # Bulk import a CSV or JSONL file of bookings instead of running the menu
+            import_file = sys.argv[sys.argv.index("--import") + 1]
+            BulkBookingImporter(system.engine).run(import_file)
+            system.shutdown()
+            return
+        if "--rewards-batch" in sys.argv[1:-2]:
+            # Reconcile reward points over a period instead of running the menu
+            index = sys.argv.index("--rewards-batch")
+            system.run_reward_batch(sys.argv[index + 1], sys.argv[index + 2], apply="--apply" in sys.argv[1:])
+            system.shutdown()
+            return
+        if "--serve" in sys.argv[1:]:
+            # Serve the booking engine over HTTP instead of running the menu
+            arguments = sys.argv[sys.argv.index("--serve") + 1:]
+            port = int(arguments[0]) if arguments and arguments[0].isdigit() else 8080
+            BookingService(system.engine, port=port).serve_forever()
+            system.shutdown()
+            return
         system.run()
     except Exception as e:
         logging.critical(f"Critical error: {e}")
@@ -5226,9 +10092,6 @@ def main():
     finally:
         logging.info("System shutdown")
 
-if __name__ == "__main__":
-    main()
-
 
 # In[ ]:
 
@@ -5568,74 +10431,57 @@ bundles_data = [
      'items_included': ['SI2', 'SI2', 'SI1', 'SI13', 'SI20', 'SI15', 'SI10'], 'price': ''},
 ]
 
-import csv
-
 # Helper function to calculate bundle price
 def calculate_bundle_price(apartment_id, items_included, apartments_data, supplementary_items_data):
     """Calculate bundle price (80% of total components price)"""
-    # Get apartment price
-    apartment_price = next(apt['price'] for apt in apartments_data 
-                         if apt['product_id'] == apartment_id)
-    
-    # Calculate total supplementary items price
-    items_price = sum(
-        next(item['price'] for item in supplementary_items_data 
-             if item['product_id'] == item_id)
-        for item_id in items_included
-    )
-    
+    prices = {product['product_id']: product['price']
+              for product in apartments_data + supplementary_items_data}
+    apartment_price = prices[apartment_id]
+    items_price = sum(prices[item_id] for item_id in items_included)
+
     # Total price is apartment + items, with 20% discount
     total_price = (apartment_price + items_price) * 0.8
     return round(total_price, 2)
 
-# Calculate prices for all bundles first
-for bundle in bundles_data:
-    bundle['price'] = calculate_bundle_price(
-        bundle['associated_apartment'],
-        bundle['items_included'],
-        apartments_data,
-        supplementary_items_data
-    )
-
-# Write formatted data to CSV
-csv_file_path = "products.csv"
-
-with open(csv_file_path, mode='w', newline='', encoding='utf-8') as file:
-    writer = csv.writer(file)
-    
-    # Write apartments
-    for apt in apartments_data:
-        writer.writerow([
-            apt['product_id'],
-            apt['name'],
-            f"{apt['price']:.2f}",
-            str(apt['capacity'])
-        ])
-
-    # Write supplementary items
-    for item in supplementary_items_data:
-        writer.writerow([
-            item['product_id'],
-            item['name'],
-            f"{item['price']:.2f}",
-            item['description']
-        ])
-
-    # Write bundles
-    for bundle in bundles_data:
-        # Start with basic bundle info
-        row = [
-            bundle['product_id'],
-            bundle['name'],
-            bundle['associated_apartment']
-        ]
-        # Add all included items
-        row.extend(bundle['items_included'])
-        # Add the calculated price at the end
-        row.append(f"{bundle['price']:.2f}")
-        writer.writerow(row)
-
-print(f"Data successfully written to {csv_file_path}.")
+def write_sample_products(csv_file_path="products.csv"):
+    """Write the sample apartments, supplementary items and bundles to products.csv"""
+    with open(csv_file_path, mode='w', newline='', encoding='utf-8') as file:
+        writer = csv.writer(file)
+
+        # Write apartments
+        for apt in apartments_data:
+            writer.writerow([
+                apt['product_id'],
+                apt['name'],
+                f"{apt['price']:.2f}",
+                str(apt['capacity'])
+            ])
+
+        # Write supplementary items
+        for item in supplementary_items_data:
+            writer.writerow([
+                item['product_id'],
+                item['name'],
+                f"{item['price']:.2f}",
+                item['description']
+            ])
+
+        # Write bundles, with the price calculated from their components
+        for bundle in bundles_data:
+            price = calculate_bundle_price(bundle['associated_apartment'], bundle['items_included'],
+                                           apartments_data, supplementary_items_data)
+            row = [
+                bundle['product_id'],
+                bundle['name'],
+                bundle['associated_apartment']
+            ]
+            # Add all included items
+            row.extend(bundle['items_included'])
+            # Add the calculated price at the end
+            row.append(f"{price:.2f}")
+            writer.writerow(row)
+
+    log.info(f"Data successfully written to {csv_file_path}.")
 
 # Helper function to verify the CSV format
 def verify_csv(filename):
@@ -5645,15 +10491,10 @@ def verify_csv(filename):
         for line_num, line in enumerate(file, 1):
             print(f"Line {line_num}: {line.strip()}")
 
-# Verify the output
-verify_csv(csv_file_path)
-
 
 # In[ ]:
 
 
-import csv
-
 # Sample orders data with 'booking_id'
 orders_data = [
     {
@@ -5694,40 +10535,36 @@ orders_data = [
     }
 ]
 
-# Define the CSV file path
-csv_file_path = "orders.csv"
-
-# Write the orders data to CSV
-with open(csv_file_path, mode='w', newline='', encoding='utf-8') as file:
-    writer = csv.writer(file)
-    
-    # Write the header row
-    writer.writerow(["booking_id", "guest_id", "apartment_id", "check_in_date", "check_out_date",
-                     "number_of_guests", "nights", "total_cost", "reward_points_earned", "supplementary_items"])
-    
-    # Write each order's data
-    for order in orders_data:
-        writer.writerow([
-            order["booking_id"],
-            order["guest_id"],
-            order["apartment_id"],
-            order["check_in_date"],
-            order["check_out_date"],
-            order["number_of_guests"],
-            order["nights"],
-            order["total_cost"],
-            order["reward_points_earned"],
-            ", ".join(order["supplementary_items"])  # Convert list to comma-separated string
-        ])
-
-print(f"Sample orders data with 'booking_id' successfully written to {csv_file_path}.")
+def write_sample_orders(csv_file_path="orders.csv"):
+    """Write the sample orders to orders.csv in the header-based format"""
+    with open(csv_file_path, mode='w', newline='', encoding='utf-8') as file:
+        writer = csv.writer(file)
+
+        # Write the header row
+        writer.writerow(["booking_id", "guest_id", "apartment_id", "check_in_date", "check_out_date",
+                         "number_of_guests", "nights", "total_cost", "reward_points_earned", "supplementary_items"])
+
+        # Write each order's data
+        for order in orders_data:
+            writer.writerow([
+                order["booking_id"],
+                order["guest_id"],
+                order["apartment_id"],
+                order["check_in_date"],
+                order["check_out_date"],
+                order["number_of_guests"],
+                order["nights"],
+                order["total_cost"],
+                order["reward_points_earned"],
+                ", ".join(order["supplementary_items"])  # Convert list to comma-separated string
+            ])
+
+    log.info(f"Sample orders data with 'booking_id' successfully written to {csv_file_path}.")
 
 
 # In[ ]:
 
 
-import csv
-
 # Initialize guests as a list of dictionaries
 guest_data = [
     {"first_name": "John", "last_name": "Doe", "date_of_birth": "01/01/1980", "reward_points": 150, "reward_rate": 10, "redeem_rate": 5},
@@ -5742,27 +10579,58 @@ guest_data = [
     {"first_name": "Olivia", "last_name": "Taylor", "date_of_birth": "22/08/1984", "reward_points": 240, "reward_rate": 12, "redeem_rate": 5},
 ]
 
-# Define the CSV file path
-csv_file_path = "guests.csv"
+def write_sample_guests(csv_file_path="guests.csv"):
+    """Write the sample guests to guests.csv"""
+    with open(csv_file_path, mode='w', newline='', encoding='utf-8') as file:
+        writer = csv.writer(file)
+
+        # Write the header row
+        writer.writerow(["first_name", "last_name", "date_of_birth", "reward_points", "reward_rate", "redeem_rate"])
+
+        # Write guest data rows
+        for guest in guest_data:
+            writer.writerow([
+                guest["first_name"],
+                guest["last_name"],
+                guest["date_of_birth"],
+                guest["reward_points"],
+                guest["reward_rate"],
+                guest["redeem_rate"],
+            ])
+
+    log.info(f"Guest data successfully written to {csv_file_path}.")
+
+
+# In[ ]:
 
-# Write the guest data to CSV
-with open(csv_file_path, mode='w', newline='', encoding='utf-8') as file:
-    writer = csv.writer(file)
-    
-    # Write the header row
-    writer.writerow(["first_name", "last_name", "date_of_birth", "reward_points", "reward_rate", "redeem_rate"])
-    
-    # Write guest data rows
-    for guest in guest_data:
-        writer.writerow([
-            
-            guest["first_name"],
-            guest["last_name"],
-            guest["date_of_birth"],
-            guest["reward_points"],
-            guest["reward_rate"],
-            guest["redeem_rate"],
-        ])
 
-print(f"Guest data successfully written to {csv_file_path}.")
+def generate_sample_data(overwrite=False, verify=False):
+    """
+    Write the sample products, orders and guests files.
+
+    Nothing is written when the module is imported or main() starts; this
+    runs only for `--seed` (add `--force` to replace existing files).
+
+    Args:
+        overwrite (bool): Replace files that already exist
+        verify (bool): Echo products.csv after writing it
+
+    Returns:
+        list: The files written
+    """
+    written = []
+    for filename, write in (("products.csv", write_sample_products),
+                            ("orders.csv", write_sample_orders),
+                            ("guests.csv", write_sample_guests)):
+        if os.path.exists(filename) and not overwrite:
+            log.info(f"ℹ️  {filename} already exists; leaving it unchanged")
+            continue
+        write(filename)
+        written.append(filename)
+    if verify and "products.csv" in written:
+        verify_csv("products.csv")
+    return written
+
 
+if __name__ == "__main__":
+    main()
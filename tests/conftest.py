@@ -0,0 +1,39 @@
+import importlib.util
+import os
+import sys
+
+import pytest
+
+SOURCE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                      "src", "pythonia-apartments.py")
+MODULE_NAME = "pythonia_apartments"
+
+
+def load_module():
+    """Execute a fresh copy of src/pythonia-apartments.py, with empty class-level registries"""
+    spec = importlib.util.spec_from_file_location(MODULE_NAME, SOURCE)
+    module = importlib.util.module_from_spec(spec)
+    # Worker processes and pickle look classes up by module name
+    sys.modules[MODULE_NAME] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+@pytest.fixture
+def pythonia(tmp_path, monkeypatch):
+    """The module, working in an empty directory seeded with the sample data"""
+    monkeypatch.chdir(tmp_path)
+    module = load_module()
+    module.set_output_mode('quiet')
+    module.generate_sample_data()
+    yield module
+    sys.modules.pop(MODULE_NAME, None)
+
+
+@pytest.fixture
+def records(pythonia):
+    """CSV-backed records with the sample catalogue and guests loaded"""
+    records = pythonia.Records()
+    records.read_products()
+    records.read_guests()
+    return records
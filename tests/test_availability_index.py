@@ -0,0 +1,89 @@
+import threading
+import time
+from datetime import date
+
+
+def test_concurrent_bookings_of_the_same_nights_index_only_one(pythonia, monkeypatch):
+    AvailabilityIndex = pythonia.AvailabilityIndex
+    find_clash = AvailabilityIndex._find_clash
+
+    def slow_find_clash(*args):
+        # Widen the gap between finding the slot free and taking it
+        clash = find_clash(*args)
+        time.sleep(0.001)
+        return clash
+
+    monkeypatch.setattr(AvailabilityIndex, '_find_clash', staticmethod(slow_find_clash))
+    check_in, check_out = date(2030, 3, 1), date(2030, 3, 6)
+    start = threading.Barrier(8)
+    won = []
+
+    def book(worker):
+        start.wait()
+        if AvailabilityIndex.add_stay('U12swan', check_in, check_out, f"B{worker}"):
+            won.append(worker)
+
+    threads = [threading.Thread(target=book, args=(worker,)) for worker in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(won) == 1
+    assert AvailabilityIndex.get_stays('U12swan') == [(check_in, check_out, f"B{won[0]}")]
+    assert not AvailabilityIndex.is_available('U12swan', date(2030, 3, 5), date(2030, 3, 7))
+
+
+def test_stay_overlap_matches_a_scan_of_every_stay(pythonia):
+    AvailabilityIndex = pythonia.AvailabilityIndex
+    first = date(2030, 1, 1).toordinal()
+    booked = []
+    # The second stay checks in on the day the first checks out, which is not a clash
+    for number, (offset, nights) in enumerate([(0, 3), (3, 2), (10, 5), (20, 1), (4, 2), (14, 3), (21, 4)]):
+        check_in, check_out = date.fromordinal(first + offset), date.fromordinal(first + offset + nights)
+        clash = any(start < check_out and check_in < end for start, end in booked)
+        assert AvailabilityIndex.add_stay('U12swan', check_in, check_out, f"B{number}") is not clash
+        if not clash:
+            booked.append((check_in, check_out))
+
+    for offset in range(-2, 30):
+        for nights in range(1, 8):
+            check_in, check_out = date.fromordinal(first + offset), date.fromordinal(first + offset + nights)
+            free = not any(start < check_out and check_in < end for start, end in booked)
+            assert AvailabilityIndex.is_available('U12swan', check_in, check_out) is free
+    assert [stay[:2] for stay in AvailabilityIndex.get_stays('U12swan')] == sorted(booked)
+    assert AvailabilityIndex.is_available('U13swan', date(2030, 1, 1), date(2030, 1, 4))
+
+
+def test_removed_and_reindexed_stays(pythonia):
+    AvailabilityIndex = pythonia.AvailabilityIndex
+    check_in, check_out = date(2030, 2, 1), date(2030, 2, 4)
+    assert AvailabilityIndex.add_stay('U12swan', check_in, check_out, "B1")
+    assert AvailabilityIndex.add_stay('U12swan', check_in, check_out, "B1")
+    assert not AvailabilityIndex.add_stay('U12swan', date(2030, 2, 3), date(2030, 2, 5), "B2")
+
+    assert not AvailabilityIndex.remove_stay('U12swan', check_in, check_out, "B2")
+    assert AvailabilityIndex.remove_stay('U12swan', check_in, check_out, "B1")
+    assert AvailabilityIndex.is_available('U12swan', check_in, check_out)
+    assert not AvailabilityIndex.occupied_nights
+
+
+def test_portfolio_search_matches_per_apartment_checks(pythonia, records):
+    AvailabilityIndex, catalogue = pythonia.AvailabilityIndex, pythonia.apartment.availaible_apartments
+    apartment_ids = sorted(catalogue)
+    for number, apartment_id in enumerate(apartment_ids[::2]):
+        assert AvailabilityIndex.add_stay(apartment_id, date(2030, 4, 1 + number % 5), date(2030, 4, 8), f"B{number}")
+
+    check_in, check_out = date(2030, 4, 6), date(2030, 4, 9)
+    for guests in (1, 3, 6, 9):
+        results = AvailabilityIndex.search_available(check_in, check_out, guests)
+        expected = {apartment_id for apartment_id in apartment_ids
+                    if AvailabilityIndex.is_available(apartment_id, check_in, check_out)
+                    and guests <= catalogue[apartment_id].get_capacity() + 4}
+        assert {result['apartment_id'] for result in results} == expected
+        assert len(expected) < len(apartment_ids)
+        rates = [result['rate_per_night'] for result in results]
+        assert rates == sorted(rates)
+        for result in results:
+            extra_guests = max(0, guests - result['capacity'])
+            assert result['extra_beds'] == (extra_guests + 1) // 2
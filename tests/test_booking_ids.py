@@ -0,0 +1,42 @@
+import json
+import threading
+
+
+def test_numbers_resume_above_the_reserved_block_after_restart(pythonia):
+    allocator = pythonia.BookingIdAllocator
+    drawn = [allocator.allocate() for _ in range(5)]
+    assert drawn == sorted(set(drawn))
+
+    allocator.reset()  # What a restart sees: only the state file
+    assert allocator.allocate() > max(drawn)
+    with open(allocator.state_file) as file:
+        assert json.load(file)['high_water_mark'] > max(drawn)
+
+
+def test_numbers_are_unique_across_threads(pythonia):
+    allocator = pythonia.BookingIdAllocator
+    allocator.block_size = 50
+    drawn = []
+    lock = threading.Lock()
+
+    def draw():
+        numbers = [allocator.allocate() for _ in range(200)]
+        with lock:
+            drawn.extend(numbers)
+
+    threads = [threading.Thread(target=draw) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(set(drawn)) == 800
+
+
+def test_observe_reads_the_number_after_the_separator(pythonia):
+    allocator = pythonia.BookingIdAllocator
+    # 12 guests and 120 nights overflow the two-digit fields in front of the number
+    allocator.observe("BKU12031212001011-4321")
+    assert allocator.allocate() == 4322
+    allocator.observe("BID001")
+    allocator.observe("ORD000007")
+    assert allocator.allocate() == 4323
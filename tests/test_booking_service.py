@@ -0,0 +1,21 @@
+import asyncio
+from http import HTTPStatus
+
+
+def get(service, target):
+    return asyncio.run(service.dispatch('GET', target, b''))
+
+
+def test_statistics_rejects_a_bad_k_with_400(pythonia, records):
+    service = pythonia.BookingService(pythonia.BookingEngine(records), workers=1)
+    try:
+        for target in ("/statistics?k=abc", "/statistics?k=0"):
+            status, payload = get(service, target)
+            assert status == HTTPStatus.BAD_REQUEST
+            assert payload['error']
+
+        status, payload = get(service, "/statistics?k=2")
+        assert status == HTTPStatus.OK
+        assert len(payload['top_guests']) <= 2 and len(payload['top_products']) <= 2
+    finally:
+        service.executor.shutdown(wait=True)
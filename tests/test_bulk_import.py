@@ -0,0 +1,45 @@
+import csv
+
+
+def write_requests(filename, requests):
+    with open(filename, 'w', newline='') as file:
+        writer = csv.DictWriter(file, fieldnames=['guest_id', 'apartment_id', 'check_in', 'check_out',
+                                                  'number_of_guests', 'items', 'redeem_points'])
+        writer.writeheader()
+        writer.writerows(requests)
+
+
+def test_booking_the_ledger_refuses_is_rejected_before_anything_is_saved(pythonia, records, monkeypatch):
+    RewardLedger, BulkBookingImporter = pythonia.RewardLedger, pythonia.BulkBookingImporter
+    spender, other = list(records.guests.values())[:2]
+    spender.total_reward_points_earned = 200
+    accept = BulkBookingImporter._accept
+
+    def accept_then_spend_elsewhere(self, request, pending_points):
+        booking = accept(self, request, pending_points)
+        if booking.guest is spender:
+            # Another desk spends the points before the batch is flushed
+            RewardLedger.record(spender, 'redeem', 200, "front desk")
+        return booking
+
+    monkeypatch.setattr(BulkBookingImporter, '_accept', accept_then_spend_elsewhere)
+    write_requests("block.csv", [
+        dict(guest_id=spender.get_guest_id(), apartment_id='U12swan', check_in="01/03/2030",
+             check_out="03/03/2030", number_of_guests=1, items="", redeem_points=200),
+        dict(guest_id=other.get_guest_id(), apartment_id='U13swan', check_in="01/03/2030",
+             check_out="03/03/2030", number_of_guests=1, items="1 x SI2", redeem_points=0),
+    ])
+    result = BulkBookingImporter(pythonia.BookingEngine(records)).run("block.csv")
+
+    assert result['imported'] == 1 and result['rejected'] == 1
+    with open(result['report_file'], newline='') as file:
+        assert list(csv.reader(file))[1][:2] == ['2', "Not enough points available"]
+    assert pythonia.AvailabilityIndex.is_available('U12swan', pythonia.datetime(2030, 3, 1),
+                                                   pythonia.datetime(2030, 3, 3))
+    reloaded = pythonia.Records()
+    assert reloaded.load_orders()
+    saved = {booking.guest.get_guest_id() for booking in reloaded.bookings.values()
+             if booking.booking_id.startswith("BKU")}
+    assert saved == {other.get_guest_id()}
+    assert RewardLedger.balance(spender.get_guest_id()) == 0
+    assert not RewardLedger.audit()
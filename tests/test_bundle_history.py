@@ -0,0 +1,17 @@
+from datetime import date
+
+
+def test_bundle_history_selects_date_ranges_in_booking_order(pythonia):
+    history = pythonia.BundleBookingHistory()
+    for booking_id, booked in [("B-3", "15/03/2025"), ("B-1", "31/01/2025"), ("B-4", "01/04/2025"),
+                               ("B-2", "01/02/2025"), ("B-5", "15/03/2025 18:00")]:
+        history.append({'booking_id': booking_id, 'booking_date': booked})
+
+    assert [booking['booking_id'] for booking in history] == ["B-1", "B-2", "B-3", "B-5", "B-4"]
+    bookings, month_keys = history.select("01/02/2025", "15/03/2025")
+    assert [booking['booking_id'] for booking in bookings] == ["B-2", "B-3", "B-5"]
+    assert [history.month_label(key) for key in month_keys] == ["February 2025", "March 2025", "March 2025"]
+    assert len(history.select(end=date(2025, 1, 31))[0]) == 1
+    assert len(history.select(start="02/04/2025")[0]) == 0
+    assert {history.month_label(key): count for key, count in history.monthly_totals.items()} == {
+        "January 2025": 1, "February 2025": 1, "March 2025": 2, "April 2025": 1}
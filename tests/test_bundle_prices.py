@@ -0,0 +1,26 @@
+def test_price_edit_reprices_only_the_bundles_containing_the_item(pythonia, records, monkeypatch):
+    Bundle = pythonia.Bundle
+    item = pythonia.supplementary_items.available_supplementary_items['SI19']
+    assert Bundle.available_bundles
+    containing = {bundle_id for bundle_id, bundle in Bundle.available_bundles.items() if 'SI19' in bundle.components}
+    assert containing and containing != set(Bundle.available_bundles)
+    before = {bundle_id: bundle.get_price() for bundle_id, bundle in Bundle.available_bundles.items()}
+
+    calculated = []
+    calculate = Bundle.calculate_bundle_price
+
+    def counting_calculate(components, discount_rate=0.8):
+        calculated.append(dict(components))
+        return calculate(components, discount_rate)
+
+    monkeypatch.setattr(Bundle, 'calculate_bundle_price', staticmethod(counting_calculate))
+    assert {bundle_id: bundle.get_price() for bundle_id, bundle in Bundle.available_bundles.items()} == before
+    assert not calculated
+
+    item.price = item.get_price() + 10
+    assert set(Bundle.reprice_bundles_for('SI19')) == containing
+    assert len(calculated) == len(containing)
+    for bundle_id, bundle in Bundle.available_bundles.items():
+        rise = 10 * bundle.components.get('SI19', 0) * bundle.discount_rate
+        assert abs(bundle.get_price() - (before[bundle_id] + rise)) < 1e-9
+    assert len(calculated) == len(containing)
@@ -0,0 +1,47 @@
+def book(pythonia, records, check_in, check_out):
+    engine = pythonia.BookingEngine(records)
+    guest_id = next(iter(records.guests))
+    hold = engine.hold(dict(guest_id=guest_id, apartment_id='U12swan', check_in=check_in,
+                            check_out=check_out, number_of_guests=1))
+    confirmed = engine.confirm(hold['hold_id'])
+    assert confirmed['status'] == 'confirmed', confirmed
+    return engine, confirmed['booking_id']
+
+
+def totals(stats):
+    return ({key: round(value, 2) for key, value in stats['guest_totals'].items() if value},
+            {key: value for key, value in stats['product_quantities'].items() if value})
+
+
+def test_cancelled_booking_is_left_out_of_every_rebuild(pythonia, records):
+    OrderStatistics = pythonia.OrderStatistics
+    assert records.load_orders()
+    before = totals(OrderStatistics.summarise(OrderStatistics.iter_orders_file()))
+    OrderStatistics.rebuild(OrderStatistics.iter_orders_file())
+
+    book(pythonia, records, "01/03/2030", "03/03/2030")
+    engine, booking_id = book(pythonia, records, "10/03/2030", "14/03/2030")
+    kept = totals(OrderStatistics.summarise(OrderStatistics.iter_orders_file()))
+    assert kept != before
+    assert engine.cancel(booking_id)['status'] == 'cancelled'
+
+    rebuilt = OrderStatistics.summarise(OrderStatistics.iter_orders_file())
+    assert totals(rebuilt) != kept
+    assert totals(rebuilt) == totals(OrderStatistics.running)
+    store = pythonia.ColumnarOrderStore.load()
+    assert round(sum(store.total_cost), 2) == round(sum(rebuilt['guest_totals'].values()), 2)
+
+    reloaded = pythonia.Records()
+    assert reloaded.load_orders()
+    assert booking_id not in reloaded.bookings
+    assert booking_id not in {booking_id for _, _, booking_id, _ in pythonia.OrderRows.read()}
+
+
+def test_cancellation_changes_the_orders_signature(pythonia, records):
+    assert records.load_orders()
+    engine, booking_id = book(pythonia, records, "01/03/2030", "03/03/2030")
+    signature = pythonia.OrderRows.signature()
+    store = pythonia.ColumnarOrderStore.load()
+    assert engine.cancel(booking_id)['status'] == 'cancelled'
+    assert pythonia.OrderRows.signature() != signature
+    assert pythonia.ColumnarOrderStore.load() is not store
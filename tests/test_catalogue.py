@@ -0,0 +1,69 @@
+import os
+
+
+def test_reload_forgets_bundles_from_the_previous_catalogue(pythonia, records):
+    Bundle = pythonia.Bundle
+    assert 'B1' in Bundle.available_bundles
+    old_name = Bundle.available_bundles['B1'].get_name()
+
+    with open("products_small.csv", 'w') as file:
+        file.write("U12swan,Unit 12 Swan Building,300.00,3\n")
+        file.write("SI1,Car Park,25.00,Secure parking\n")
+        file.write("B9,Weekend Saver,U12swan,SI1,0.8\n")
+    records.load_catalogue("products_small.csv")
+
+    assert set(Bundle.available_bundles) == {'B9'}
+    assert Bundle.find_bundle(old_name) is None
+    assert set(Bundle.price_cache) == {'B9'}
+    assert {bundle_id for ids in Bundle.component_index.values() for bundle_id in ids} == {'B9'}
+    assert Bundle.available_bundles['B9'].get_price() == Bundle.price_cache['B9']
+
+
+def test_price_edits_are_journalled_with_two_decimals(pythonia, records):
+    items = pythonia.supplementary_items
+    item = items.available_supplementary_items['SI1']
+    item.set_price(31.5)
+    assert items.save_supplementary_items_to_csv(changed_ids=['SI1'])
+
+    delta = pythonia.CatalogueDelta
+    assert delta.read_journal("products.csv")[-1][:4] == ['PUT', 'SI1', item.get_name(), "31.50"]
+
+    assert delta.compact("products.csv")
+    assert delta.wait_for_compaction(timeout=10)
+    assert not os.path.exists(delta.journal_path("products.csv"))
+    with open("products.csv") as file:
+        assert f"SI1, {item.get_name()}, 31.50, " in file.read()
+
+
+def test_apartment_edits_round_trip_through_the_full_class(pythonia, records):
+    apartment = pythonia.apartment
+    unit = apartment.availaible_apartments['U12swan']
+    assert records.products['U12swan'] is unit
+    assert hasattr(apartment, 'load_apartments_from_csv')
+
+    unit.set_price(222.5)
+    assert apartment.save_apartments_to_csv(changed_ids=['U12swan'])
+    assert apartment.load_apartments_from_csv()
+    assert apartment.availaible_apartments['U12swan'].get_price() == 222.5
+
+    reloaded = pythonia.Records()
+    reloaded.read_products()
+    assert reloaded.products['U12swan'].get_price() == 222.5
+
+
+def test_single_pass_load_fills_the_class_registries(pythonia, records):
+    apartment, Bundle = pythonia.apartment, pythonia.Bundle
+    counts = records.load_catalogue()
+    assert counts['apartments'] == len(apartment.availaible_apartments) > 0
+    assert counts['items'] == len(pythonia.supplementary_items.available_supplementary_items) > 0
+    assert counts['bundles'] == len(Bundle.available_bundles) > 0
+    assert not counts['skipped']
+    for registry in (apartment.availaible_apartments, Bundle.available_bundles):
+        assert all(records.products[product_id] is product for product_id, product in registry.items())
+
+    bundle = Bundle.available_bundles['B1']
+    price = bundle.get_price()
+    apartment.availaible_apartments['U12swan'].set_price(400)
+    assert apartment.save_apartments_to_csv(changed_ids=['U12swan'])
+    assert apartment.load_apartments_from_csv()
+    assert bundle.get_price() > price
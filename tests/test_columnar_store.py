@@ -0,0 +1,30 @@
+import pytest
+
+ROWS = [
+    ["01/01/2025 09:00", "G1", "10/01/2025", "12/01/2025", "2", "2", "2 x U12swan", "1 x SI2", "500.00", "50"],
+    ["15/01/2025 10:00", "G2", "03/02/2025", "06/02/2025", "3", "1", "3 x U13swan", "600.00", "60"],
+    ["20/02/2025 11:00", "G1", "01/03/2025", "02/03/2025", "1", "2", "1 x U12swan", "2 x SI2", "250.50", "25"],
+    ["G2", "1 x B1", "900.00", "90", "01/03/2025"],
+]
+
+
+@pytest.mark.parametrize('numpy', [True, False])
+def test_column_aggregates_match_the_rows(pythonia, monkeypatch, numpy):
+    if not numpy:
+        monkeypatch.setattr(pythonia, 'np', None)
+    store = pythonia.ColumnarOrderStore.from_rows(ROWS)
+    assert len(store) == 4
+
+    assert store.guest_totals() == pytest.approx({"G1": 750.5, "G2": 1500.0})
+    assert store.product_quantities() == {"U12swan": 3, "SI2": 3, "U13swan": 3, "B1": 1}
+    assert store.summarise(1)['top_guests'] == [("G2", 1500.0)]
+    # Bundle rows have no check-in date and count in their booking month
+    assert store.monthly_revenue() == pytest.approx({2025 * 12: 500.0, 2025 * 12 + 1: 600.0, 2025 * 12 + 2: 1150.5})
+    assert store.monthly_revenue(by_check_in=False) == pytest.approx(
+        {2025 * 12: 1100.0, 2025 * 12 + 1: 250.5, 2025 * 12 + 2: 900.0})
+    assert store.monthly_revenue("01/02/2025", "28/02/2025") == pytest.approx({2025 * 12 + 1: 600.0})
+
+    assert store.guest_orders("G1") == [0, 2]
+    assert store.guest_orders("G9") == []
+    assert store.order_products(2) == [("U12swan", 1), ("SI2", 2)]
+    assert store.product_orders("SI2") == [0, 2]
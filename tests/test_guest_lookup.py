@@ -0,0 +1,33 @@
+def test_guests_are_found_by_id_name_and_approximate_name(pythonia):
+    Guest = pythonia.Guest
+    alexandra = Guest("Alexandra", "Smithson", "12/03/1985")
+    alexander = Guest("Alexander", "Smith", "04/07/1990")
+    Guest("Beatrice", "Moreau", "21/11/1979")
+
+    assert Guest.find(alexandra.get_guest_id()) is alexandra
+    assert Guest.find("  alexander   SMITH ") is alexander
+    assert Guest.find("Alex Smith") is None
+
+    # Partial and misspelt names
+    assert Guest.search("alexandra smithsn")[0][1] is alexandra
+    assert Guest.search("alexander smth")[0][1] is alexander
+    assert [guest for _, guest in Guest.search("moreau")] == [Guest.guest_data["B21-11-1979Mo21"]]
+    assert Guest.search("zzzz") == []
+
+
+def test_re_registering_a_guest_moves_them_in_the_indexes(pythonia):
+    Guest = pythonia.Guest
+    old = Guest("Chris", "Taylor", "01/02/1990")
+    renamed = Guest("Chris", "Tay", "01/02/1990")
+    assert renamed.get_guest_id() == old.get_guest_id()
+
+    assert Guest.find("chris tay") is renamed
+    assert Guest.find("chris taylor") is None
+    assert all(guest is renamed for _, guest in Guest.search("chris taylor"))
+
+
+def test_records_find_guest_uses_the_name_index(pythonia, records):
+    guest = next(iter(records.guests.values()))
+    assert records.find_guest(guest.get_full_name().upper()) is guest
+    assert records.find_guest(guest.get_guest_id()) is guest
+    assert records.find_guest("Nobody Here") is None
@@ -0,0 +1,34 @@
+import threading
+
+
+def test_deferred_history_loads_once_on_first_use(pythonia, records):
+    loads = []
+    started, release = threading.Event(), threading.Event()
+
+    def slow_load(filename):
+        loads.append(filename)
+        started.set()
+        release.wait(5)
+        return records.load_orders(filename)
+
+    records.defer_orders("orders.csv", slow_load)
+    assert not loads and not records.bookings
+
+    # A second reader waits for the load in progress instead of starting another
+    first = threading.Thread(target=records.count_guest_bookings, args=("G001",))
+    first.start()
+    assert started.wait(5)
+    counts = []
+    second = threading.Thread(target=lambda: counts.append(records.count_guest_bookings("G001")))
+    second.start()
+    second.join(0.2)
+    assert second.is_alive()
+    release.set()
+    first.join(5)
+    second.join(5)
+
+    assert loads == ["orders.csv"]
+    assert counts == [1]
+    assert {"BID001", "BID002", "BID003"} <= set(records.bookings)
+    assert records.ensure_orders_loaded()
+    assert loads == ["orders.csv"]
@@ -0,0 +1,47 @@
+import os
+
+import pytest
+
+
+FIELDS = dict(quantity=2, price_per_unit=15.0, total_price=30.0)
+
+
+def test_line_item_reads_like_the_dict_it_replaces(pythonia):
+    line = pythonia.SupplementaryLineItem(**FIELDS)
+    legacy = dict(FIELDS)
+
+    assert line == legacy and dict(line) == legacy
+    assert len(line) == len(legacy) and list(line) == list(legacy)
+    assert line['quantity'] == legacy['quantity']
+    assert line.get('name') is None and line.get('name', '-') == '-'
+    assert 'name' not in line and 'quantity' in line
+    with pytest.raises(KeyError):
+        line['name']
+
+    line['name'] = legacy['name'] = "Breakfast"
+    line.update(quantity=3)
+    legacy.update(quantity=3)
+    assert line == legacy and sorted(line.items()) == sorted(legacy.items())
+    assert line.pop('name') == legacy.pop('name') and line == legacy
+    del line['total_price']
+    del legacy['total_price']
+    assert line == legacy and line.setdefault('total_price', 45.0) == legacy.setdefault('total_price', 45.0)
+
+
+def test_line_item_rejects_fields_it_does_not_have(pythonia):
+    line = pythonia.ApartmentLineItem(length_of_stay=2)
+    with pytest.raises(KeyError):
+        line['colour'] = "blue"
+    with pytest.raises(KeyError):
+        del line['rate_per_night']
+    assert not hasattr(line, '__dict__')
+
+
+def test_memory_benchmark_leaves_booking_numbers_alone(pythonia, records):
+    allocator = pythonia.BookingIdAllocator
+    next_number = allocator._next
+    result = pythonia.benchmark_booking_memory(count=200, orders_per_guest=20)
+
+    assert result['bookings'] == 200 and result['slots_bytes'] > 0
+    assert allocator._next == next_number
+    assert not os.path.exists(allocator.state_file)
@@ -0,0 +1,25 @@
+import logging
+
+
+def test_progress_messages_stay_out_of_the_root_log_file(pythonia, records, tmp_path):
+    handler = logging.FileHandler(tmp_path / "root.log")
+    logging.getLogger().addHandler(handler)
+    try:
+        pythonia.set_output_mode('verbose')
+        assert records.load_orders()
+        assert pythonia.supplementary_items.save_supplementary_items_to_csv(changed_ids=['SI1'])
+        pythonia.write_sample_guests("guests_copy.csv")
+    finally:
+        logging.getLogger().removeHandler(handler)
+        handler.close()
+    assert (tmp_path / "root.log").read_text() == ""
+
+
+def test_save_messages_follow_the_output_mode(pythonia, capsys):
+    pythonia.set_output_mode('quiet')
+    pythonia.write_sample_guests("guests_quiet.csv")
+    assert capsys.readouterr().out == ""
+
+    pythonia.set_output_mode('normal')
+    pythonia.write_sample_guests("guests_normal.csv")
+    assert "guests_normal.csv" in capsys.readouterr().out
@@ -0,0 +1,68 @@
+import os
+
+
+ROWS = [
+    ["01/11/2024 09:00", "G1", "20/11/2024", "22/11/2024", "2", "2", "2 x U12swan", "400.00", "40"],
+    ["02/11/2024 09:00", "G2", "21/11/2024", "22/11/2024", "1", "1", "1 x U13swan", "190.70", "19"],
+]
+
+
+def test_rows_are_read_back_in_order(pythonia):
+    journal = pythonia.OrderJournal
+    assert journal.append_many(ROWS, "orders_test.csv") == 2
+    assert list(journal.read_rows("orders_test.csv")) == ROWS
+
+
+def test_torn_tail_is_truncated(pythonia):
+    journal = pythonia.OrderJournal
+    journal.append_many(ROWS, "orders_test.csv")
+    path = journal.journal_path("orders_test.csv")
+    intact_size = os.path.getsize(path)
+    with open(path, 'ab') as file:
+        file.write(b"57:deadbeef:01/11/2024")  # A record cut short by a crash
+
+    assert journal.read_journal("orders_test.csv") == ROWS
+    assert os.path.getsize(path) == intact_size
+
+
+def test_compaction_folds_the_journal_into_the_snapshot(pythonia):
+    journal = pythonia.OrderJournal
+    journal.append_many(ROWS, "orders_test.csv")
+    assert journal.compact("orders_test.csv")
+    assert not os.path.exists(journal.journal_path("orders_test.csv"))
+    assert list(journal.read_rows("orders_test.csv")) == ROWS
+
+
+def test_interrupted_compaction_is_completed(pythonia):
+    journal = pythonia.OrderJournal
+    journal.append_many(ROWS[1:], "orders_test.csv")
+    with open("orders_test.csv", 'w', newline='') as file:
+        file.write(",".join(ROWS[0]) + "\r\n")
+    # Crash after the journal was retired but before the new snapshot was moved in
+    with open("orders_test.csv.tmp", 'w', newline='') as file:
+        file.write("".join(",".join(row) + "\r\n" for row in ROWS))
+    os.replace(journal.journal_path("orders_test.csv"), journal.journal_path("orders_test.csv") + ".applied")
+
+    assert list(journal.read_rows("orders_test.csv")) == ROWS
+    assert not os.path.exists("orders_test.csv.tmp")
+
+
+def test_interrupted_snapshot_write_is_rolled_back(pythonia):
+    journal = pythonia.OrderJournal
+    journal.append_many(ROWS, "orders_test.csv")
+    with open("orders_test.csv.tmp", 'w') as file:
+        file.write("half a snapsh")
+
+    assert list(journal.read_rows("orders_test.csv")) == ROWS
+    assert not os.path.exists("orders_test.csv.tmp")
+
+
+def test_appends_from_other_threads_survive_compaction(pythonia, monkeypatch):
+    from concurrent.futures import ThreadPoolExecutor
+
+    OrderJournal = pythonia.OrderJournal
+    monkeypatch.setattr(OrderJournal, 'compact_every', 7)
+    rows = [[str(number), *ROWS[0][1:]] for number in range(200)]
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        assert sum(pool.map(lambda row: OrderJournal.append(row, "orders_test.csv"), rows)) == 200
+    assert sorted(OrderJournal.read_rows("orders_test.csv"), key=lambda row: int(row[0])) == rows
@@ -0,0 +1,116 @@
+ORDER = ["01/11/2024 09:00", "G1", "20/11/2024", "22/11/2024", "2", "2", "2 x U12swan", "400.00", "40"]
+
+
+def test_rows_are_classified_by_the_header_above_them(pythonia):
+    OrderRows = pythonia.OrderRows
+    rows = [
+        ["booking_id", "guest_id", "apartment_id", "check_in_date"],
+        ["BID001", "G001", "U12swan", "2024-11-20"],
+        ORDER,                                        # Written before IDs were stored
+        ["G1", "1 x B1", "500.00", "50", "01/11/2024"],
+        OrderRows.HEADER,
+        ["X-77", *ORDER],                             # The ID does not have to look like one
+        ["G1", "1 x B1", "500.00", "50", "01/11/2024"],
+    ]
+    records = [(position, kind, booking_id) for position, kind, booking_id, _ in OrderRows.iter_records(rows)]
+    assert records == [
+        (2, 'legacy', "BID001"),
+        (3, 'order', "ORD000003"),
+        (4, 'bundle', None),
+        (6, 'order', "X-77"),
+        (7, 'bundle', None),
+    ]
+
+
+def test_header_is_written_once_before_the_first_booking_id(pythonia, records):
+    OrderRows = pythonia.OrderRows
+    guest_id = next(iter(records.guests))
+    row = [ORDER[0], guest_id, *ORDER[2:]]
+    bookings = [pythonia.Booking.from_order_row(row) for _ in range(2)]
+    assert OrderRows.header_for("orders.csv") == [OrderRows.HEADER]
+
+    assert records.save_bookings(bookings[:1]) == 1
+    assert records.save_bookings(bookings[1:]) == 1
+    rows = list(pythonia.OrderJournal.read_rows("orders.csv"))
+    assert rows.count(OrderRows.HEADER) == 1
+    assert OrderRows.header_for("orders.csv") == []
+
+    reloaded = pythonia.Records()
+    assert reloaded.load_orders("orders.csv")
+    assert {booking.booking_id for booking in bookings} <= set(reloaded.bookings)
+
+
+def test_parallel_chunks_know_whether_they_follow_the_header(pythonia, records):
+    guest_id = next(iter(records.guests))
+    rows = []
+    for number in range(300):
+        day = number % 25 + 1
+        stay = [f"{day:02d}/01/2025 09:00", guest_id, f"{day:02d}/0{number % 9 + 1}/2025",
+                f"{day + 2:02d}/0{number % 9 + 1}/2025", "2", "1", "2 x U12swan", "400.00", "40"]
+        if number == 150:
+            rows.append(pythonia.OrderRows.HEADER)
+        rows.append([f"BK-{number}", *stay] if number >= 150 else stay)
+    pythonia.OrderJournal.append_many(rows, "orders_big.csv")
+    assert pythonia.OrderJournal.compact("orders_big.csv")
+
+    sequential = pythonia.Records()
+    assert sequential.load_orders("orders_big.csv")
+    pythonia.ParallelOrderLoader.min_chunk_size = 1024
+    assert len(pythonia.ParallelOrderLoader.split("orders_big.csv", 4)) == 4
+    parallel = pythonia.Records()
+    assert pythonia.ParallelOrderLoader.load(parallel, "orders_big.csv", workers=4)
+
+    assert list(parallel.bookings) == list(sequential.bookings)
+    assert "ORD000001" in parallel.bookings and "BK-299" in parallel.bookings
+
+
+def test_compaction_moves_the_header_to_the_top_and_keeps_every_id(pythonia, monkeypatch):
+    OrderRows, OrderJournal = pythonia.OrderRows, pythonia.OrderJournal
+    with open("orders_test.csv", 'w', newline='') as file:
+        file.write("booking_id,guest_id,apartment_id,check_in_date\r\n")
+        file.write("BID001,G001,U12swan,2024-11-20\r\n")
+        file.write(",".join(ORDER) + "\r\n")
+    OrderJournal.append_many(OrderRows.header_for("orders_test.csv") + [["X-77", *ORDER]], "orders_test.csv")
+    before = [record[1:3] for record in OrderRows.read("orders_test.csv")]
+
+    assert OrderJournal.compact("orders_test.csv")
+    assert OrderRows.starts_with_header("orders_test.csv")
+    assert [record[1:3] for record in OrderRows.read("orders_test.csv")] == before
+    assert before == [('legacy', "BID001"), ('order', "ORD000003"), ('order', "X-77")]
+
+    # Later writers only look at the first line, never the history
+    OrderRows._headed.clear()
+    monkeypatch.setattr(OrderJournal, 'read_snapshot', None)
+    assert OrderRows.header_for("orders_test.csv") == []
+
+
+def test_parallel_loader_builds_the_same_records_as_load_orders(pythonia, records):
+    from .test_cancellations import book
+
+    for week in range(6):
+        book(pythonia, records, f"{week * 4 + 1:02d}/03/2030", f"{week * 4 + 3:02d}/03/2030")
+    engine, booking_id = book(pythonia, records, "01/05/2030", "04/05/2030")
+    assert engine.cancel(booking_id)['status'] == 'cancelled'
+    # Part of the history in the snapshot, the rest still in the journal
+    assert pythonia.OrderJournal.compact("orders.csv")
+    book(pythonia, records, "01/06/2030", "03/06/2030")
+
+    def load(loader):
+        pythonia.AvailabilityIndex.clear()
+        loaded = pythonia.Records()
+        assert loader(loaded)
+        stays = {apartment_id: pythonia.AvailabilityIndex.get_stays(apartment_id)
+                 for apartment_id in pythonia.AvailabilityIndex.booked_stays}
+        bookings = {booking_id: (type(booking.guest).__name__, booking.get_final_cost(),
+                                 booking.check_in_date, booking.check_out_date)
+                    for booking_id, booking in loaded.bookings.items()}
+        return bookings, stays, {guest_id: loaded.count_guest_bookings(guest_id) for guest_id in records.guests}
+
+    sequential = load(lambda loaded: loaded.load_orders("orders.csv"))
+    pythonia.ParallelOrderLoader.min_chunk_size = 64
+    parallel = load(lambda loaded: pythonia.ParallelOrderLoader.load(loaded, "orders.csv", workers=2))
+
+    assert parallel == sequential
+    assert booking_id not in sequential[0]
+    assert {"BID001", "BID002", "BID003"} <= set(sequential[0])
+    assert len(sequential[0]) == 10
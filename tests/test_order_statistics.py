@@ -0,0 +1,80 @@
+import os
+import random
+
+
+def test_live_totals_follow_confirmations_and_cancellations(pythonia):
+    OrderStatistics = pythonia.OrderStatistics
+    OrderStatistics.reset()
+    random.seed(8)
+    confirmed = []
+    for number in range(400):
+        record = (f"G{random.randrange(30)}", float(random.randrange(50, 900)),
+                  [(f"U{random.randrange(12)}", random.randrange(1, 8)), ("SI1", 1)])
+        OrderStatistics.record(*record)
+        confirmed.append(record)
+        if number % 3 == 0:
+            OrderStatistics.record(*confirmed.pop(random.randrange(len(confirmed))), sign=-1)
+
+    expected = OrderStatistics.summarise(confirmed, k=5)
+    report = OrderStatistics.report(k=5)
+    assert [key for key, _ in report['top_guests']] == [key for key, _ in expected['top_guests']]
+    assert report['top_products'] == expected['top_products']
+    assert len(OrderStatistics.heaps['guest_totals']) <= 2 * 30 + 64 + 1
+
+
+def test_cancelling_a_leader_lets_the_runner_up_through(pythonia):
+    OrderStatistics = pythonia.OrderStatistics
+    OrderStatistics.reset()
+    OrderStatistics.record("G1", 900.0, [("U1", 5)])
+    OrderStatistics.record("G2", 500.0, [("U2", 3)])
+    OrderStatistics.record("G3", 100.0, [("U3", 1)])
+    assert OrderStatistics.current_top('guest_totals', 1) == [("G1", 900.0)]
+
+    OrderStatistics.record("G1", 900.0, [("U1", 5)], sign=-1)
+    assert OrderStatistics.current_top('guest_totals', 2) == [("G2", 500.0), ("G3", 100.0)]
+    assert OrderStatistics.current_top('product_quantities', 1) == [("U2", 3)]
+
+
+def test_statistics_are_persisted_at_shutdown_not_per_booking(pythonia):
+    OrderStatistics = pythonia.OrderStatistics
+    system = pythonia.PythoniaSystem()
+    system.records.ensure_orders_loaded()
+    OrderStatistics.report(source=OrderStatistics.iter_orders_file)
+    guest_id = next(iter(system.records.guests))
+    hold = system.engine.hold(dict(guest_id=guest_id, apartment_id='U12swan', check_in="01/03/2030",
+                                   check_out="03/03/2030", number_of_guests=1))
+    assert system.engine.confirm(hold['hold_id'])['status'] == 'confirmed'
+    assert not os.path.exists(OrderStatistics.state_file)
+    live = OrderStatistics.report()['guest_totals'][guest_id]
+
+    system.shutdown()
+    assert OrderStatistics.load_state()
+    assert OrderStatistics.running['guest_totals'][guest_id] == live
+
+
+def test_live_totals_match_a_rebuild_from_the_orders_file(pythonia, records):
+    OrderStatistics, Booking = pythonia.OrderStatistics, pythonia.Booking
+    assert records.load_orders()
+    OrderStatistics.rebuild(OrderStatistics.iter_orders_file())
+    engine = pythonia.BookingEngine(records)
+    guest = next(iter(records.guests.values()))
+
+    hold = engine.hold(dict(guest_id=guest.get_guest_id(), apartment_id='U13swan', check_in="01/03/2030",
+                            check_out="04/03/2030", number_of_guests=1))
+    assert engine.confirm(hold['hold_id'])['status'] == 'confirmed'
+    legacy_id = next(booking_id for booking_id in records.bookings if booking_id.startswith('BID'))
+    assert engine.cancel(legacy_id)['status'] == 'cancelled'
+
+    bundle = pythonia.Bundle.available_bundles['B1']
+    booking = Booking(guest, "10/03/2030", "12/03/2030", "01/02/2030 10:00", 1, 2, bundle.apartment_id)
+    booking.add_apartment_line(bundle.apartment_id)
+    booking.bundle_info = {'bundle_id': 'B1', 'bundle_name': bundle.get_name()}
+    OrderStatistics.record_booking(booking)
+    bundle.save_bundle_order(booking)
+
+    rebuilt = OrderStatistics.summarise(OrderStatistics.iter_orders_file())
+    live = OrderStatistics.report()
+    for kind in OrderStatistics.STAT_KINDS:
+        assert ({key: round(value, 2) for key, value in live[kind].items() if value}
+                == {key: round(value, 2) for key, value in rebuilt[kind].items() if value})
+    assert live['product_quantities']['B1'] == 1
@@ -0,0 +1,42 @@
+import csv
+
+import pytest
+
+
+def write_orders(filename, guest_id, orders):
+    with open(filename, 'w', newline='') as file:
+        for booking_date, points in orders:
+            csv.writer(file).writerow([f"{booking_date} 09:00", guest_id, "20/11/2024", "22/11/2024", "2", "1",
+                                       "2 x U12swan", f"{points * 10:.2f}", str(points)])
+
+
+def test_points_accrue_per_period_and_old_points_expire_once(pythonia, records):
+    RewardLedger, RewardBatchJob = pythonia.RewardLedger, pythonia.RewardBatchJob
+    guest = next(guest for guest in records.guests.values() if guest.opening_reward_points)
+    guest_id = guest.get_guest_id()
+    opening = guest.opening_reward_points
+    write_orders("orders_2020.csv", guest_id, [("15/01/2020", 300)])
+    write_orders("orders_2025.csv", guest_id, [("01/06/2025", 50), ("01/02/2026", 70)])
+    RewardLedger.record_batch([(guest, 'earn', 300, "old stay"), (guest, 'earn', 50, "new stay"),
+                               (guest, 'redeem', opening - 20, "discount")])
+
+    shards = ["orders_2020.csv", "orders_2025.csv"]
+    results = RewardBatchJob.run("01/01/2025", "31/12/2025", shards=shards, workers=1, apply=True)
+    assert results[guest_id] == {'earned': 50, 'redeemed': 0, 'expired': 300, 'expiring': 300, 'balance': 70}
+    assert RewardLedger.history(guest_id)[-1][2:4] == ['expire', '-300']
+    assert RewardLedger.balance(guest_id) == 70
+    assert not RewardLedger.audit()
+
+    again = RewardBatchJob.run("01/01/2025", "31/12/2025", shards=shards, workers=1, apply=True)
+    assert again[guest_id]['expiring'] == 0
+    assert RewardLedger.balance(guest_id) == 70
+
+
+def test_reward_batch_runs_from_the_command_line(pythonia, monkeypatch):
+    monkeypatch.setattr(pythonia.sys, 'argv', ["pythonia", "--rewards-batch", "01/01/2025", "31/12/2025"])
+    monkeypatch.setattr('builtins.input', lambda *args: pytest.fail("the batch fell through to the menu"))
+    pythonia.main()
+    with open("reward_reconciliation.csv", newline='') as file:
+        rows = list(csv.reader(file))
+    assert rows[0] == ['guest_id', 'earned', 'redeemed', 'expired', 'balance']
+    assert len(rows) > 1
@@ -0,0 +1,31 @@
+import pytest
+
+
+def test_ledger_balances_survive_a_replay(pythonia, records):
+    RewardLedger = pythonia.RewardLedger
+    guest = next(guest for guest in records.guests.values() if guest.opening_reward_points)
+    guest_id, opening = guest.get_guest_id(), guest.opening_reward_points
+    assert guest.get_total_reward_points_earned() == opening
+
+    assert RewardLedger.record(guest, 'earn', 40, "BK-1") == opening + 40
+    assert RewardLedger.record_batch([(guest, 'redeem', 30, "BK-2"), (guest, 'earn', 5, "BK-2")]) == [
+        opening + 10, opening + 15]
+    assert guest.get_total_reward_points_earned() == opening + 15
+    assert [row[2] for row in RewardLedger.history(guest_id)] == ['opening', 'earn', 'redeem', 'earn']
+
+    RewardLedger.balances = None
+    assert RewardLedger.balance(guest_id) == opening + 15
+    assert not RewardLedger.audit()
+
+
+def test_refused_batch_writes_nothing(pythonia, records):
+    RewardLedger = pythonia.RewardLedger
+    guest = next(iter(records.guests.values()))
+    balance = guest.get_total_reward_points_earned()
+
+    with pytest.raises(ValueError):
+        RewardLedger.record_batch([(guest, 'earn', 10, "BK-1"), (guest, 'redeem', balance + 11, "BK-1")])
+    with pytest.raises(ValueError):
+        RewardLedger.record(guest, 'earn', -5)
+    assert guest.get_total_reward_points_earned() == balance
+    assert RewardLedger.history(guest.get_guest_id()) == []
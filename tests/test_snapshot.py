@@ -0,0 +1,34 @@
+from .test_cancellations import book
+
+
+def test_snapshot_restores_current_groups_from_closed_sections(pythonia, records):
+    BinarySnapshot = pythonia.BinarySnapshot
+    assert records.load_orders()
+    BinarySnapshot.capture_guests(records, BinarySnapshot.source_signature('guests'))
+    BinarySnapshot.capture_catalogue(records, BinarySnapshot.source_signature('catalogue'))
+    assert BinarySnapshot.save()
+
+    sections = BinarySnapshot.read()
+    assert sections and all(type(section) is bytes for section in sections.values())
+
+    restored = pythonia.Records()
+    assert BinarySnapshot.restore(restored) == {'catalogue', 'guests', 'orders'}
+    assert set(restored.guests) == set(records.guests)
+    assert set(restored.products) == set(records.products)
+
+
+def test_cancellation_invalidates_the_orders_group(pythonia, records):
+    BinarySnapshot = pythonia.BinarySnapshot
+    ColumnarOrderStore = pythonia.ColumnarOrderStore
+    assert records.load_orders()
+    engine, booking_id = book(pythonia, records, "10/03/2030", "14/03/2030")
+    assert BinarySnapshot.save()
+    booked = len(ColumnarOrderStore.load().total_cost)
+
+    assert engine.cancel(booking_id)['status'] == 'cancelled'
+    assert 'orders' not in BinarySnapshot.restore(pythonia.Records())
+
+    assert BinarySnapshot.save()
+    ColumnarOrderStore.cache.clear()
+    assert 'orders' in BinarySnapshot.restore(pythonia.Records())
+    assert len(ColumnarOrderStore.load().total_cost) == booked - 1
@@ -0,0 +1,134 @@
+import os
+
+
+def open_database(pythonia):
+    records = pythonia.SQLiteRecords()
+    assert records.read_products()
+    assert records.read_guests()
+    assert records.load_orders()
+    return records
+
+
+def touch(filename):
+    stat = os.stat(filename)
+    os.utime(filename, ns=(stat.st_atime_ns, stat.st_mtime_ns + 5_000_000_000))
+
+
+def test_bookings_and_guests_saved_to_the_database_survive_a_reimport(pythonia):
+    records = open_database(pythonia)
+    imported = records.count_bookings()
+    engine = pythonia.BookingEngine(records)
+    guest_id = next(iter(records.guests))
+    hold = engine.hold(dict(guest_id=guest_id, apartment_id='U12swan', check_in="01/03/2030",
+                            check_out="03/03/2030", number_of_guests=1))
+    booking_id = engine.confirm(hold['hold_id'])['booking_id']
+    guest = pythonia.Guest("Ada", "Lovelace", "10/12/1990", 25)
+    records.guests[guest.get_guest_id()] = guest
+    assert records.save_guests_to_csv()
+    records.close()
+
+    touch("orders.csv")
+    touch("guests.csv")
+    reopened = open_database(pythonia)
+    assert reopened.count_bookings() == imported + 1
+    assert reopened.get_booking(booking_id).get_final_cost() > 0
+    assert guest.get_guest_id() in reopened.guests
+    assert pythonia.AvailabilityIndex.is_available('U12swan', "02/03/2030", "03/03/2030") is False
+    reopened.close()
+
+
+def test_cancelled_bookings_are_removed_by_the_reimport(pythonia):
+    records = open_database(pythonia)
+    booking_id = records.get_booking_ids()[0]
+    pythonia.CancellationLog.record(booking_id, "G001", "test")
+    records.close()
+
+    reopened = open_database(pythonia)
+    assert not reopened.has_booking(booking_id)
+    reopened.close()
+
+
+def test_assigning_a_booking_stores_it(pythonia):
+    records = open_database(pythonia)
+    guest_id = next(iter(records.guests))
+    booking = pythonia.Booking.from_order_row(
+        ["01/11/2024 09:00", guest_id, "20/11/2031", "22/11/2031", "2", "2", "2 x U12swan", "400.00", "40"])
+    records.bookings[booking.booking_id] = booking
+    records.bookings[booking.booking_id] = booking
+    records.close()
+
+    reopened = open_database(pythonia)
+    assert reopened.has_booking(booking.booking_id)
+    assert reopened.connection.execute(
+        "SELECT COUNT(*) FROM stays WHERE booking_id = ?", (booking.booking_id,)).fetchone()[0] == 1
+    reopened.close()
+
+
+def stay(guest_id, booked, check_in, check_out):
+    return [f"{booked} 09:00", guest_id, check_in, check_out, "2", "1", "2 x U12swan", "400.00", "40"]
+
+
+def test_guest_bookings_are_paged_by_booking_date(pythonia):
+    records = open_database(pythonia)
+    guest_id = next(iter(records.guests))
+    # Booked in the opposite order to their check-in dates
+    rows = [stay(guest_id, "05/01/2030", "01/02/2031", "03/02/2031"),
+            stay(guest_id, "01/01/2030", "01/06/2031", "03/06/2031"),
+            stay(guest_id, "03/01/2030", "01/04/2031", "03/04/2031")]
+    bookings = [pythonia.Booking.from_order_row(row) for row in rows]
+    assert records.save_bookings(bookings) == 3
+
+    every = [booking.booking_id for booking in records.get_guest_bookings(guest_id)]
+    ours = [booking.booking_id for booking in bookings]
+    assert [booking_id for booking_id in every if booking_id in ours] == [ours[1], ours[2], ours[0]]
+    pages = [booking.booking_id for page in range(1, len(every) + 1)
+             for booking in records.get_guest_bookings(guest_id, page, page_size=1)]
+    assert pages == every
+    plan = records.connection.execute(
+        "EXPLAIN QUERY PLAN SELECT booking_id FROM orders WHERE guest_id = ? ORDER BY booked_on, rowid",
+        (guest_id,)).fetchall()
+    assert any("idx_orders_guest_booked" in row[-1] for row in plan)
+    records.close()
+
+
+def test_older_databases_gain_the_booking_date_column(pythonia):
+    import sqlite3
+    connection = sqlite3.connect("pythonia.db")
+    connection.executescript("""
+        CREATE TABLE orders (booking_id TEXT PRIMARY KEY, guest_id TEXT NOT NULL, check_in_ordinal INTEGER,
+                             check_out_ordinal INTEGER, total_cost REAL, reward_points INTEGER,
+                             format TEXT NOT NULL, data TEXT NOT NULL);
+        CREATE INDEX idx_orders_guest ON orders (guest_id, check_in_ordinal);
+    """)
+    connection.execute("INSERT INTO orders VALUES ('BK1', 'G1', 1, 2, 400.0, 40, 'order', ?)",
+                       (pythonia.json.dumps(stay("G1", "05/01/2030", "01/02/2031", "03/02/2031")),))
+    connection.commit()
+    connection.close()
+
+    records = pythonia.SQLiteRecords()
+    assert records.connection.execute("SELECT booked_on FROM orders WHERE booking_id = 'BK1'").fetchone() == (
+        pythonia.to_date_ordinal("05/01/2030"),)
+    indexes = {row[1] for row in records.connection.execute("PRAGMA index_list(orders)")}
+    assert "idx_orders_guest_booked" in indexes and "idx_orders_guest" not in indexes
+    records.close()
+
+
+def test_database_can_be_used_from_service_worker_threads(pythonia):
+    from concurrent.futures import ThreadPoolExecutor
+
+    records = open_database(pythonia)
+    engine = pythonia.BookingEngine(records)
+    guest_id = next(iter(records.guests))
+    expected = records.count_bookings()
+
+    def book(day):
+        hold = engine.hold(dict(guest_id=guest_id, apartment_id='U12swan', check_in=f"{day:02d}/04/2030",
+                                check_out=f"{day + 1:02d}/04/2030", number_of_guests=1))
+        return engine.confirm(hold['hold_id'])['booking_id']
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        assert list(pool.map(len, [records.bookings] * 4)) == [expected] * 4
+        booking_ids = list(pool.map(book, range(1, 17, 2)))
+        assert all(pool.map(records.bookings.__contains__, booking_ids))
+    assert records.count_bookings() == expected + len(booking_ids)
+    records.close()
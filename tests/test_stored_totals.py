@@ -0,0 +1,17 @@
+def test_loaded_orders_keep_the_total_they_were_sold_for(pythonia, records):
+    engine = pythonia.BookingEngine(records)
+    guest_id = next(iter(records.guests))
+    hold = engine.hold(dict(guest_id=guest_id, apartment_id='U12swan', check_in="01/03/2030",
+                            check_out="03/03/2030", number_of_guests=1))
+    confirmed = engine.confirm(hold['hold_id'])
+    sold_for = records.bookings[confirmed['booking_id']].get_final_cost()
+
+    pythonia.apartment.availaible_apartments['U12swan'].set_price(999)
+    reloaded = pythonia.Records()
+    assert reloaded.load_orders()
+    booking = reloaded.bookings[confirmed['booking_id']]
+    assert booking.get_final_cost() == round(sold_for, 2)
+    assert booking.to_order_row()[-2] == f"{sold_for:.2f}"
+
+    (_, total_cost, _), = pythonia.OrderStatistics.iter_bookings([booking])
+    assert total_cost == round(sold_for, 2)